@@ -22,11 +22,18 @@ A seperate solution could employ a Parametric approaches (Example: Gumbel Method
 4) plot of 'Mean Surge + Tide','Mean Surge','Mean Tide'
 5) plot of 'Median Surge + Tide','Median Surge','Median Tide'
 
+## Quick look (optional)
+Set 'sample_iterations' to use a seeded random sample of iterations instead of all of them.
+Only the rows of the sampled iterations are read, through the byte-offset iteration index of
+cli/iteration_index.py (built once and saved next to the csv file). The mean curves are then plotted with 95% confidence bands and their standard errors are printed.
+The same seed picks the same iterations as --sample_iterations in the cli tools.
 
 """
 
 
 
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 
@@ -37,13 +44,32 @@ import matplotlib.pyplot as plt
 
 file1 = r"C:\Users\Becca.LAPTOP-SSI4KM18\Desktop\ERDC\G2CRM\Studies\Fox Point\Trenton_Fox_Point_Storm_Mod_08052021\Outputs\Trenton_Fox_Point_Storm_Mod_08052021_-_default\Without Project Plan\fox_Stg_freq_08182021\ModeledAreaStormDetail_NoSLC_fox_Stg_freq_08182021.csv"
 
-# Pull Iteration, Days from Start, Storm Surge, and Tide Data. 
+# Columns of Iteration, Days from Start, Storm Surge, and Tide Data. 
 # ****User needs to verify that the columns being used in python are correct***
-data = np.genfromtxt(file1, skip_header = 1, usecols = (0,3,16,17), delimiter = ',')
+data_columns = (0,3,16,17)
+
+# Optional quick look: number of iterations to sample (e.g. 100) or None to use all iterations
+sample_iterations = None
+sample_seed = 0
 
 
 #### Rest of the code should run without any user modifications ####
 
+if sample_iterations:
+    # read only the rows of the sampled iterations (same iterations as --sample_iterations in the cli tools)
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "cli"))
+    import iteration_index
+    import utils
+    blocks = iteration_index.load_index(file1)["blocks"]
+    num_iterations = max(blocks)
+    iterations = utils.sample_iterations(range(1,num_iterations+1), sample_iterations, sample_seed)
+    data = iteration_index.read_iterations(file1, [x for x in iterations if x in blocks], usecols = list(data_columns)).to_numpy(dtype = float)
+else:
+    data = np.genfromtxt(file1, skip_header = 1, usecols = data_columns, delimiter = ',')
+    # Total Number of Iteration  
+    num_iterations = int(np.amax(data[:,0]))
+    iterations = list(range(1,num_iterations+1))
+
 # Days to Years (Round up)
 data[:,1] = np.ceil(data[:,1]/365)
 
@@ -53,9 +79,6 @@ Surge_Tide = np.transpose(np.array( [data[:,2] + data[:,3]]))
 # Append Storm + Tide array to the "data" matrix
 data = np.append(data, Surge_Tide, axis=1)
 
-# Total Number of Iteration  
-num_iterations = int(np.amax(data[:,0]))
-
 # Number of years covered in the G2CRM iterations (this value can be wrong if a low number of iterations are run)
 num_year = int(np.amax(data[:,1]) - 1)
 
@@ -68,8 +91,8 @@ axs[0].title.set_text('Surge + Tide')
 axs[0].set_ylabel('Stage (ft)')
 axs[1].title.set_text('Surge')
 
-# loop for all iterations
-for j in range(1,num_iterations+1):
+# loop for all (sampled) iterations
+for j in iterations:
     
     #temp matrix with all data from the current iteration
     iter_temp = data[data[:,0]==j,:]
@@ -124,7 +147,7 @@ for j in range(1,num_iterations+1):
     axs[1].plot(surge_year[:,2], surge_year[:,1])
     
     # store the temporary recurrence intervals into a permanent matrix. This will be used to calculate the mean & median stage freq curve
-    if j == 1:
+    if j == iterations[0]:
         Final_Stage = temp_year[:,1]
         Final_Surge_Stage= surge_year[:,1]
     else:
@@ -140,6 +163,17 @@ Mean_Stage_Surge_Curve = np.mean(Final_Surge_Stage,1)
 Median_Stage_Curve = np.median(Final_Stage,1)
 Median_Stage_Surge_Curve = np.median(Final_Surge_Stage,1)
 
+# Standard error of the mean stage freq curves when iterations are sampled (finite population correction)
+flag_sampled = len(iterations) < num_iterations
+if flag_sampled:
+    correction = 1 - len(iterations)/num_iterations
+    SE_Stage_Curve = np.std(Final_Stage,1,ddof=1)*np.sqrt(correction/len(iterations))
+    SE_Stage_Surge_Curve = np.std(Final_Surge_Stage,1,ddof=1)*np.sqrt(correction/len(iterations))
+    print('Stage freq curves estimated from %d of %d iterations' % (len(iterations), num_iterations))
+    print('Recurrence Interval, Mean Surge + Tide, SE, Mean Surge, SE')
+    for row in np.c_[temp_year[:,2], Mean_Stage_Curve, SE_Stage_Curve, Mean_Stage_Surge_Curve, SE_Stage_Surge_Curve]:
+        print(', '.join('%.3f' % x for x in np.asarray(row).ravel()))
+
 plt.ylabel('Stage (ft)')
 plt.xlabel('Recurrence Interval (years)')
 
@@ -150,9 +184,12 @@ plt.close
 fig
 plt.plot(temp_year[:,2],Mean_Stage_Curve)
 plt.plot(temp_year[:,2],Median_Stage_Curve)
+if flag_sampled:
+    x, y, se = [np.asarray(v).ravel() for v in (temp_year[:,2], Mean_Stage_Curve, SE_Stage_Curve)]
+    plt.fill_between(x, y - 1.96*se, y + 1.96*se, alpha = 0.3)
 plt.ylabel('Stage (ft)')
 plt.xlabel('Recurrence Interval (years)')
-plt.legend(['Mean','Median'])
+plt.legend(['Mean','Median'] + (['Mean 95% CI'] if flag_sampled else []))
 plt.title('Stage Frequency Curve (Tide + Surge)')
 plt.show()
 plt.close
@@ -161,9 +198,12 @@ plt.close
 fig
 plt.plot(temp_year[:,2],Mean_Stage_Surge_Curve)
 plt.plot(temp_year[:,2],Median_Stage_Surge_Curve)
+if flag_sampled:
+    x, y, se = [np.asarray(v).ravel() for v in (temp_year[:,2], Mean_Stage_Surge_Curve, SE_Stage_Surge_Curve)]
+    plt.fill_between(x, y - 1.96*se, y + 1.96*se, alpha = 0.3)
 plt.ylabel('Stage (ft)')
 plt.xlabel('Recurrence Interval (years)')
-plt.legend(['Mean','Median'])
+plt.legend(['Mean','Median'] + (['Mean 95% CI'] if flag_sampled else []))
 plt.title('Stage Frequency Curve (Surge Only)')
 plt.show()
 plt.close
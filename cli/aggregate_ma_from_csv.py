@@ -1,7 +1,11 @@
 """
-v1.1
+v1.2
 
 Concatenate data vertically for files with the same format.
+Accepts gzip/zstd compressed csv files (*.csv.gz, *.csv.zst).
+Use --profile to save a time/memory report per stage next to the output.
+Known G2CRM columns are read with the compact dtypes of utils.schemas.
+Use --shard i/N to aggregate part of the files on each node (see sharding.py).
 
 python aggregate_ma_from_csv.py --help
 
@@ -9,6 +13,8 @@ python aggregate_ma_from_csv.py --help
 import argparse
 import pandas as pd
 import utils
+import instrumentation
+import sharding
 
 def get_parser():
     parser = argparse.ArgumentParser(description="Aggregate data from different CSV files")
@@ -27,20 +33,44 @@ def get_parser():
         '--contains', 
         nargs='+', 
         help='Unique str identifier e.g. FWOP')
+    instrumentation.add_profile_argument(parser)
+    sharding.add_shard_argument(parser)
     return parser
 
 
-def main(input_folder: str, output_file: str, contains: str):
+def tag_data(data: pd.DataFrame, file: str) -> pd.DataFrame:
+    """Add ModelArea, SLC and Alternative columns derived from the file name"""
+    data["ModelArea"] = utils.derive_ma_code(file)
+    data["SLC"] = utils.derive_slc(file)
+    data["Alternative"] = utils.derive_alt(file)
+    return data
+
+
+def main(input_folder: str, output_file: str, contains: str, profiler: instrumentation.Profiler = None,
+    shard: tuple = None):
+
+    profiler = profiler or instrumentation.Profiler()
 
     # Get list of files
-    files = utils.full_paths_by_type(input_folder, "csv", contains)
+    with profiler.stage("discover") as record:
+        files = utils.full_paths_by_type(input_folder, "csv", contains)
+        total_files = len(files)
+        selected = sharding.select_files(files, shard, sharding.relative_key(input_folder))
+        files = [file for position, file in selected]
+        record["rows"] = len(files)
+    rows_by_file = []
+    data = pd.DataFrame() # no files in this shard
     
     flag_first_file = True
     # iterate through all files
 
     for i, file in zip(range(len(files)), files):
         print(f"{str(i+1).zfill(2)}/{len(files)} - Loading {utils.remove_path(file)}")
-        working_data = pd.read_csv(file)
+        with profiler.stage("read_csv", file) as record:
+            with utils.open_data(file) as f:
+                working_data = pd.read_csv(f, **utils.csv_read_args(file))
+            record["rows"] = len(working_data)
+        rows_by_file.append(len(working_data))
 
         # create empty df
         if flag_first_file:
@@ -53,19 +83,23 @@ def main(input_folder: str, output_file: str, contains: str):
             flag_first_file = False
 
         # merging files
-        working_data = pd.read_csv(file)
-        working_data["ModelArea"] = utils.derive_ma_code(file)
-        working_data["SLC"] = utils.derive_slc(file)
-        working_data["Alternative"] = utils.derive_alt(file)
+        working_data = tag_data(working_data, file)
 
-        data = data.append(working_data)
+        with profiler.stage("append", file) as record:
+            data = data.append(working_data)
+            record["rows"] = len(working_data)
 
     # export to csv
     # print(data)
-    data.to_csv(output_file, index=False)
+    with profiler.stage("write") as record:
+        data.to_csv(sharding.shard_path(output_file, shard), index=False)
+        sharding.write_shard_index(output_file, shard, total_files, [(x[0], rows) for x, rows in zip(selected, rows_by_file)])
+        record["rows"] = len(data)
     print(f"Saved aggregated data to {output_file}")
 
 
 if __name__ == "__main__":
     args, random = get_parser().parse_known_args()
-    main(args.input_folder[0], args.output_file[0], args.contains[0])
\ No newline at end of file
+    profiler = instrumentation.Profiler(args.profile)
+    main(args.input_folder[0], args.output_file[0], args.contains[0], profiler, args.shard)
+    profiler.write_report(sharding.shard_path(args.output_file[0], args.shard))
\ No newline at end of file
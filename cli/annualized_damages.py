@@ -0,0 +1,236 @@
+"""
+v1.0
+
+Damage by year and equivalent annual damages (EAD) from IterationYear_ files.
+
+Every IterationYear file of the input folder (one per SLC/model area/
+alternative, utils.derive_*) is read into an iterations x years array of
+value_column (iterations or years without a row have no damages). The arrays
+are stacked into one (files, iterations, years) array, padded with NaN where
+studies have fewer iterations or a shorter period, so the statistics of all
+combinations are computed together in single numpy calls:
+
+    by year        mean and percentiles over iterations
+    by iteration   present value at base_year of the yearly damages, damages
+                   of year y discounted by (1 + rate)^-(y - base_year)
+    EAD            present value x capital recovery factor over the period of
+                   analysis (base_year to the last year), mean and percentiles
+                   over iterations
+
+value_column must hold undiscounted damages (e.g. TotalLoss, not TotalLossPV).
+
+Output:
+    output_file             SLC, ModelArea, Alternative, Year, Iterations,
+                            DiscountFactor, Mean, P<percentile>...
+    <output_file>_EAD.csv   SLC, ModelArea, Alternative, FirstYear, LastYear,
+                            Iterations, PresentValue_Mean, EAD_Mean, EAD_P<percentile>...
+
+python annualized_damages.py --help
+python annualized_damages.py --input_folder "C:/Runs" --output_file "C:/AnnualDamages.csv" --discount_rate 2.5
+python annualized_damages.py --input_folder "C:/Runs" --output_file "C:/AnnualDamages.csv" --discount_rate 2.5
+    --value_column ValueLossStructure --percentiles 10 50 90 --base_year 2030 --threads 4
+
+Changelog:
+
+19OCT2026 v1.0
+"""
+import argparse
+import os
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+import numpy as np
+import pandas as pd
+import utils
+import instrumentation
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description="Damage by year and equivalent annual damages from IterationYear files")
+    parser.add_argument(
+        '-i',
+        '--input_folder',
+        help='Path to input folder containing IterationYear_ files')
+    parser.add_argument(
+        '-o',
+        '--output_file',
+        help='Path to output file for damage by year, EAD is saved to <output_file>_EAD.csv')
+    parser.add_argument(
+        '-c',
+        '--contains',
+        nargs='+',
+        default=[],
+        help='Unique str identifier e.g. FWOP, Intermediate, MA01, etc.')
+    parser.add_argument(
+        '-r',
+        '--discount_rate',
+        type=float,
+        help='Discount rate in percentage')
+    parser.add_argument(
+        '--base_year',
+        type=int,
+        help='Year damages are discounted to (default: first year of all files)')
+    parser.add_argument(
+        '--value_column',
+        default='TotalLoss',
+        help='Undiscounted damage column of the IterationYear files')
+    parser.add_argument(
+        '--year_column',
+        default='Year',
+        help='Year column of the IterationYear files')
+    parser.add_argument(
+        '-p',
+        '--percentiles',
+        nargs='+',
+        type=float,
+        default=[5, 50, 95],
+        help='Percentiles over iterations')
+    parser.add_argument(
+        '--threads',
+        type=int,
+        default=1,
+        help='Number of files read concurrently')
+    instrumentation.add_profile_argument(parser)
+    return parser
+
+
+def year_array(path: str, value_column: str, year_column: str) -> Tuple[np.ndarray, int]:
+    """(iterations x years array of value_column, first year) of an IterationYear file"""
+    with utils.open_data(path) as f:
+        data = pd.read_csv(f, **utils.csv_read_args(path, ["Iteration", year_column, value_column]))
+    if data.empty:
+        return np.zeros((0, 0)), 0
+    iterations = data["Iteration"].to_numpy() - 1
+    first_year = int(data[year_column].min())
+    years = data[year_column].to_numpy() - first_year
+    shape = (int(iterations.max()) + 1, int(years.max()) + 1)
+    # bincount sums duplicate (iteration, year) rows
+    flat = np.bincount(iterations * shape[1] + years, data[value_column].to_numpy(), shape[0] * shape[1])
+    return flat.reshape(shape), first_year
+
+
+def stack_arrays(arrays: List[Tuple[np.ndarray, int]]) -> Tuple[np.ndarray, np.ndarray]:
+    """(files x iterations x years array padded with NaN, years)"""
+    arrays = [(x, first_year) for x, first_year in arrays if x.size]
+    first = min(first_year for x, first_year in arrays)
+    last = max(first_year + x.shape[1] for x, first_year in arrays)
+    stacked = np.full((len(arrays), max(x.shape[0] for x, first_year in arrays), last - first), np.nan)
+    for i, (x, first_year) in enumerate(arrays):
+        stacked[i, :x.shape[0], first_year - first:first_year - first + x.shape[1]] = x
+    return stacked, np.arange(first, last)
+
+
+def capital_recovery_factor(rate: float, years: np.ndarray) -> np.ndarray:
+    """Annual payment per unit of present value over 'years' years"""
+    years = np.asarray(years, dtype=float)
+    if rate == 0:
+        return 1 / years
+    return rate / (1 - (1 + rate) ** -years)
+
+
+def annualize(stacked: np.ndarray, years: np.ndarray, discount_rate: float, base_year: int, percentiles: List[float]) -> dict:
+    """Statistics of all files at once, discount_rate in percentage"""
+    rate = discount_rate / 100
+    valid_years = ~np.isnan(stacked).all(axis=1) # (files, years)
+    valid_iterations = ~np.isnan(stacked).all(axis=2) # (files, iterations)
+
+    discount_factor = (1 + rate) ** -(years - base_year).astype(float)
+    present_value = np.where(valid_iterations, np.nansum(stacked * discount_factor, axis=2), np.nan)
+    last_year = years[valid_years.shape[1] - 1 - np.argmax(valid_years[:, ::-1], axis=1)]
+    ead = present_value * capital_recovery_factor(rate, last_year - base_year + 1)[:, np.newaxis]
+
+    # NaN slices (padded years/iterations) only warn
+    with np.errstate(all="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return {
+            "valid_years": valid_years,
+            "first_year": years[np.argmax(valid_years, axis=1)],
+            "last_year": last_year,
+            "iterations": valid_iterations.sum(axis=1),
+            "year_iterations": (~np.isnan(stacked)).sum(axis=1),
+            "discount_factor": discount_factor,
+            "year_mean": np.nanmean(stacked, axis=1),
+            "year_percentiles": np.nanpercentile(stacked, percentiles, axis=1),
+            "present_value_mean": np.nanmean(present_value, axis=1),
+            "ead_mean": np.nanmean(ead, axis=1),
+            "ead_percentiles": np.nanpercentile(ead, percentiles, axis=1)}
+
+
+def percentile_column(prefix: str, q: float) -> str:
+    return f"{prefix}P{q:g}"
+
+
+def year_table(keys: List[Tuple[str, str, str]], years: np.ndarray, stats: dict, percentiles: List[float]) -> pd.DataFrame:
+    """Long table, one row per file and year of its period"""
+    files, year_index = np.nonzero(stats["valid_years"])
+    data = pd.DataFrame({
+        "SLC": [keys[i][0] for i in files],
+        "ModelArea": [keys[i][1] for i in files],
+        "Alternative": [keys[i][2] for i in files],
+        "Year": years[year_index],
+        "Iterations": stats["year_iterations"][files, year_index],
+        "DiscountFactor": stats["discount_factor"][year_index],
+        "Mean": stats["year_mean"][files, year_index]})
+    for j, q in enumerate(percentiles):
+        data[percentile_column("", q)] = stats["year_percentiles"][j, files, year_index]
+    return data
+
+
+def ead_table(keys: List[Tuple[str, str, str]], stats: dict, percentiles: List[float]) -> pd.DataFrame:
+    data = pd.DataFrame(keys, columns=["SLC", "ModelArea", "Alternative"])
+    data["FirstYear"] = stats["first_year"]
+    data["LastYear"] = stats["last_year"]
+    data["Iterations"] = stats["iterations"]
+    data["PresentValue_Mean"] = stats["present_value_mean"]
+    data["EAD_Mean"] = stats["ead_mean"]
+    for j, q in enumerate(percentiles):
+        data[percentile_column("EAD_", q)] = stats["ead_percentiles"][j]
+    return data
+
+
+def main(input_folder: str, output_file: str, discount_rate: float, contains: List[str] = [], base_year: int = None,
+    value_column: str = "TotalLoss", year_column: str = "Year", percentiles: List[float] = [5, 50, 95], threads: int = 1,
+    profiler: instrumentation.Profiler = None):
+
+    profiler = profiler or instrumentation.Profiler()
+    with profiler.stage("discover") as record:
+        files = utils.full_paths_by_type(input_folder, "csv", ["IterationYear"] + list(contains))
+        record["rows"] = len(files)
+
+    with profiler.stage("read_csv") as record:
+        with ThreadPoolExecutor(max_workers=max(threads, 1)) as executor:
+            arrays = list(executor.map(lambda file: year_array(file, value_column, year_column), files))
+        for i, (file, (x, first_year)) in enumerate(zip(files, arrays)):
+            print(f"{str(i+1).zfill(2)}/{len(files)} - {utils.remove_path(file)}: {x.shape[0]} iterations, {x.shape[1]} years")
+        files = [file for file, (x, first_year) in zip(files, arrays) if x.size]
+        arrays = [x for x in arrays if x[0].size]
+        record["rows"] = sum(x.size for x, first_year in arrays)
+    if not files:
+        print(f"No IterationYear files with data in {input_folder}")
+        return
+
+    with profiler.stage("annualize") as record:
+        stacked, years = stack_arrays(arrays)
+        base_year = years[0] if base_year is None else base_year
+        stats = annualize(stacked, years, discount_rate, base_year, percentiles)
+        record["rows"] = stacked.size
+
+    keys = [(utils.derive_slc(file), utils.derive_ma_code(file), utils.derive_alt(file)) for file in files]
+    with profiler.stage("write") as record:
+        by_year = year_table(keys, years, stats, percentiles)
+        by_year.to_csv(output_file, index=False)
+        ead = ead_table(keys, stats, percentiles)
+        ead.to_csv(os.path.splitext(output_file)[0] + "_EAD.csv", index=False)
+        record["rows"] = len(by_year) + len(ead)
+
+    for row in ead.itertuples():
+        print(f"    {row.SLC} {row.ModelArea} {row.Alternative} EAD {row.EAD_Mean:,.2f}")
+    print(f"Saved damage by year to {output_file} and EAD to {os.path.splitext(output_file)[0]}_EAD.csv")
+
+
+if __name__ == "__main__":
+    args, random = get_parser().parse_known_args()
+    profiler = instrumentation.Profiler(args.profile)
+    main(args.input_folder, args.output_file, args.discount_rate, args.contains, args.base_year, args.value_column,
+        args.year_column, args.percentiles, args.threads, profiler)
+    profiler.write_report(args.output_file)
@@ -0,0 +1,195 @@
+"""
+v1.1
+
+Time the cli tools on synthetic G2CRM outputs (generate_synthetic_outputs.py)
+at several data sizes and compare against stored baselines.
+
+Each tool runs 'repeat' times per size and the fastest wall time is kept.
+Expected outputs are removed before and checked after every run - a tool that
+raises or does not write its outputs is a failed case, recorded as null and
+not timed.
+Results are saved to benchmark_results.json in the output folder. With
+--save_baseline the results become the new baseline, otherwise tools slower
+than baseline * (1 + tolerance) are reported as regressions. The script exits
+with status 1 when a case failed or regressed.
+
+python benchmark_tools.py --help
+python benchmark_tools.py --output_folder "C:/benchmark" --sizes tiny small --save_baseline
+python benchmark_tools.py --output_folder "C:/benchmark" --sizes tiny small
+
+Changelog:
+
+19OCT2026 v1.0
+19OCT2026 v1.1 - Check tool outputs, exit with status 1 on failed cases and regressions
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import traceback
+import utils
+import generate_synthetic_outputs
+import summarize_runs
+import discount_by_structure
+import multiple_discount_by_structure
+import aggregate_ma_from_csv
+import calculate_cumulative_damage_by_storm_stage
+import copy_files_to_folder
+
+baseline_file_name = "benchmark_baseline.json"
+results_file_name = "benchmark_results.json"
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description="Benchmark cli tools on synthetic G2CRM outputs")
+    parser.add_argument(
+        '-o',
+        '--output_folder',
+        help='Path to folder for synthetic data, tool outputs and results')
+    parser.add_argument(
+        '-s',
+        '--sizes',
+        nargs='+',
+        default=['tiny', 'small'],
+        help='Synthetic data sizes to benchmark e.g. tiny small medium large')
+    parser.add_argument(
+        '-r',
+        '--repeat',
+        type=int,
+        default=3,
+        help='Runs per tool and size - fastest is kept')
+    parser.add_argument(
+        '-t',
+        '--tolerance',
+        type=float,
+        default=.2,
+        help='Allowed slowdown vs baseline before flagging a regression (.2 = 20%%)')
+    parser.add_argument(
+        '--save_baseline',
+        action='store_true',
+        help='Store results as the new baseline')
+    return parser
+
+
+def benchmark_cases(data_folder: str, work_folder: str) -> dict:
+    """Tool name -> (function running it on data_folder, expected output files in work_folder)"""
+    asset_damage_files = sorted(utils.full_paths_by_type(data_folder, "csv", "AssetDamageDetail"))
+    asset_damage_file = asset_damage_files[0]
+    discounted_folder = os.path.join(work_folder, "discounted")
+    copy_folder = os.path.join(work_folder, "copied")
+    os.makedirs(discounted_folder, exist_ok=True)
+    os.makedirs(copy_folder, exist_ok=True)
+
+    def copy_files():
+        # empty the folder so every repeat copies everything
+        for file in os.listdir(copy_folder):
+            os.remove(os.path.join(copy_folder, file))
+        copy_files_to_folder.main(data_folder, copy_folder, "csv", "AssetDamageDetail")
+        # copy_files_to_folder logs failed copies instead of raising
+        copied = [x for x in os.listdir(copy_folder) if x.endswith(".csv")]
+        if len(copied) != len(asset_damage_files):
+            raise Exception(f"Copied {len(copied)} of {len(asset_damage_files)} files to {copy_folder}")
+
+    discounted_files = [os.path.join(discounted_folder, multiple_discount_by_structure.discounted_file_name(x))
+        for x in asset_damage_files]
+    return {
+        "summarize_runs": (lambda: summarize_runs.main(data_folder, os.path.join(work_folder, "summary.csv"), None),
+            [os.path.join(work_folder, "summary.csv")]),
+        "discount_by_structure": (lambda: discount_by_structure.main(
+            asset_damage_file, os.path.join(work_folder, "DiscountedDamages_single.csv"), 2.5, "20300101"),
+            [os.path.join(work_folder, "DiscountedDamages_single.csv")]),
+        "multiple_discount_by_structure": (lambda: multiple_discount_by_structure.main(
+            data_folder, discounted_folder, 2.5, "20300101"), discounted_files),
+        "aggregate_ma_from_csv": (lambda: aggregate_ma_from_csv.main(
+            discounted_folder, os.path.join(work_folder, "aggregated.csv"), "DiscountedDamages"),
+            [os.path.join(work_folder, "aggregated.csv")]),
+        "calculate_cumulative_damage_by_storm_stage": (lambda: calculate_cumulative_damage_by_storm_stage.main(
+            asset_damage_file, os.path.join(work_folder, "cumulative.csv"), None, True),
+            [os.path.join(work_folder, "cumulative.csv")]),
+        "copy_files_to_folder": (copy_files, []),
+    }
+
+
+def time_case(function, repeat: int, outputs: list = None):
+    """
+    Fastest wall time of 'repeat' runs in seconds, tool output is silenced.
+    Raises if a run does not write all outputs
+    """
+    times = []
+    for _ in range(repeat):
+        for output in outputs or []:
+            if os.path.exists(output):
+                os.remove(output)
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+        missing = [x for x in outputs or [] if not os.path.exists(x)]
+        if missing:
+            raise Exception(f"Outputs were not written: {', '.join(missing)}")
+    return min(times)
+
+
+def main(output_folder: str, sizes: list, repeat: int = 3, tolerance: float = .2, save_baseline: bool = False):
+
+    baseline_path = os.path.join(output_folder, baseline_file_name)
+    baseline = {}
+    if os.path.exists(baseline_path):
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressions = []
+    failures = []
+    for size in sizes:
+        data_folder = os.path.join(output_folder, "data", size)
+        work_folder = os.path.join(output_folder, "work", size)
+        if not os.path.exists(data_folder):
+            print(f"Generating {size} synthetic outputs")
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_synthetic_outputs.main(data_folder, size)
+        os.makedirs(work_folder, exist_ok=True)
+
+        results[size] = {}
+        for tool, (function, outputs) in benchmark_cases(data_folder, work_folder).items():
+            try:
+                seconds = time_case(function, repeat, outputs)
+            except Exception:
+                print(f"{size} - {tool} - FAILED")
+                traceback.print_exc()
+                results[size][tool] = None
+                failures.append((size, tool))
+                continue
+            results[size][tool] = seconds
+
+            base_seconds = baseline.get(size, {}).get(tool)
+            if base_seconds:
+                ratio = seconds / base_seconds
+                flag = " - REGRESSION" if ratio > 1 + tolerance else ""
+                print(f"{size} - {tool} - {seconds:.3f}s ({ratio:.2f}x baseline){flag}")
+                if flag:
+                    regressions.append((size, tool, ratio))
+            else:
+                print(f"{size} - {tool} - {seconds:.3f}s (no baseline)")
+
+    with open(os.path.join(output_folder, results_file_name), "w") as f:
+        json.dump(results, f, indent=2)
+
+    if save_baseline:
+        for size in results:
+            baseline.setdefault(size, {}).update({k: v for k, v in results[size].items() if v is not None})
+        with open(baseline_path, "w") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Saved baseline to {baseline_path}")
+
+    print(f"{len(regressions)} regressions above {tolerance:.0%} tolerance - {len(failures)} failed cases")
+    return results, regressions, failures
+
+
+if __name__ == "__main__":
+    args, random = get_parser().parse_known_args()
+    results, regressions, failures = main(args.output_folder, args.sizes, args.repeat, args.tolerance, args.save_baseline)
+    sys.exit(1 if regressions or failures else 0)
@@ -0,0 +1,147 @@
+"""
+v1.0
+
+Structure level benefits (FWOP damages minus with-project damages) from the
+DiscountedDamages_ files written by multiple_discount_by_structure.py.
+
+Files are grouped by SLC and model area (utils.derive_slc, derive_ma_code) and
+matched to their alternative with utils.derive_alt. Within a group every
+file is indexed and sorted by AssetExternalReference and aligned on the sorted
+union of assets (assets missing from a file have no damages). Benefits of all
+alternatives are then computed in one vectorized pass per group.
+
+Output columns (long table, one row per alternative and asset):
+    SLC, ModelArea, Alternative, AssetExternalReference,
+    TotalLossPV_Base, TotalLossPV_Alternative,
+    ValueLossStructurePV_Benefit, ValueLossContentsPV_Benefit, TotalLossPV_Benefit
+
+python calculate_benefits.py --help
+python calculate_benefits.py --input_folder "C:/Discounted" --output_file "C:/Benefits.csv"
+
+Changelog:
+
+19OCT2026 v1.0
+"""
+import argparse
+from typing import Dict, List, Tuple
+import numpy as np
+import pandas as pd
+import utils
+import instrumentation
+
+damage_cols = ['ValueLossStructurePV', 'ValueLossContentsPV', 'TotalLossPV']
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description="Structure level benefits from DiscountedDamages files")
+    parser.add_argument(
+        '-i',
+        '--input_folder',
+        help='Path to input folder containing DiscountedDamages_ files')
+    parser.add_argument(
+        '-o',
+        '--output_file',
+        help='Path to output file')
+    parser.add_argument(
+        '-c',
+        '--contains',
+        nargs='+',
+        default=[],
+        help='Unique str identifier e.g. Intermediate, MA01, etc.')
+    parser.add_argument(
+        '-b',
+        '--base',
+        default='FWOP',
+        help='Without project alternative benefits are measured against')
+    instrumentation.add_profile_argument(parser)
+    return parser
+
+
+def group_files(files: List[str]) -> Dict[Tuple[str, str], Dict[str, str]]:
+    """(SLC, ModelArea) -> {alternative: file}"""
+    groups = {}
+    for file in files:
+        alts = groups.setdefault((utils.derive_slc(file), utils.derive_ma_code(file)), {})
+        alt = utils.derive_alt(file)
+        if alt in alts:
+            raise Exception(f"More than one {alt} file for the same SLC and model area: {alts[alt]}, {file}")
+        alts[alt] = file
+    return groups
+
+
+def read_discounted(file: str) -> pd.DataFrame:
+    """DiscountedDamages_ file indexed and sorted by AssetExternalReference"""
+    with utils.open_data(file) as f:
+        data = pd.read_csv(f, **utils.csv_read_args(file, ['AssetExternalReference'] + damage_cols))
+    return data.groupby('AssetExternalReference')[damage_cols].sum().sort_index()
+
+
+def group_benefits(base: pd.DataFrame, alternatives: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Benefits of every alternative over base, aligned on the sorted union of assets"""
+    assets = base.index
+    for data in alternatives.values():
+        assets = assets.union(data.index)
+
+    # (alternatives, assets, damage columns)
+    base_values = base.reindex(assets, fill_value=0).to_numpy()
+    alt_values = np.stack([data.reindex(assets, fill_value=0).to_numpy() for data in alternatives.values()])
+    benefits = base_values[np.newaxis, :, :] - alt_values
+
+    n_alts, n_assets = len(alternatives), len(assets)
+    total = damage_cols.index('TotalLossPV')
+    result = pd.DataFrame({
+        'Alternative': np.repeat(list(alternatives), n_assets),
+        'AssetExternalReference': np.tile(assets.to_numpy(), n_alts),
+        'TotalLossPV_Base': np.tile(base_values[:, total], n_alts),
+        'TotalLossPV_Alternative': alt_values[:, :, total].ravel()})
+    for j, col in enumerate(damage_cols):
+        result[col + '_Benefit'] = benefits[:, :, j].ravel()
+    return result
+
+
+def main(input_folder: str, output_file: str, contains: List[str] = [], base: str = "FWOP",
+    profiler: instrumentation.Profiler = None):
+
+    profiler = profiler or instrumentation.Profiler()
+    with profiler.stage("discover") as record:
+        files = utils.full_paths_by_type(input_folder, "csv", ["DiscountedDamages"] + list(contains))
+        record["rows"] = len(files)
+
+    results = []
+    groups = group_files(files)
+    for i, ((slc, ma), alts) in enumerate(sorted(groups.items())):
+        if base not in alts:
+            print(f"{str(i+1).zfill(2)}/{len(groups)} - Skipping {slc} {ma}: no {base} file")
+            continue
+        others = sorted(alt for alt in alts if alt != base)
+        if not others:
+            print(f"{str(i+1).zfill(2)}/{len(groups)} - Skipping {slc} {ma}: no with-project alternatives")
+            continue
+        print(f"{str(i+1).zfill(2)}/{len(groups)} - {slc} {ma}: {base} vs {', '.join(others)}")
+
+        with profiler.stage("read_csv", alts[base]) as record:
+            base_data = read_discounted(alts[base])
+            alternatives = {alt: read_discounted(alts[alt]) for alt in others}
+            record["rows"] = len(base_data) + sum(len(x) for x in alternatives.values())
+        with profiler.stage("benefits", alts[base]) as record:
+            benefits = group_benefits(base_data, alternatives)
+            benefits.insert(0, 'ModelArea', ma)
+            benefits.insert(0, 'SLC', slc)
+            record["rows"] = len(benefits)
+        results.append(benefits)
+
+        for alt, total in benefits.groupby('Alternative', sort=False)['TotalLossPV_Benefit'].sum().items():
+            print(f"    {alt} TotalLossPV benefits {total:,.2f}")
+
+    with profiler.stage("write") as record:
+        data = pd.concat(results, ignore_index=True) if results else pd.DataFrame()
+        data.to_csv(output_file, index=False)
+        record["rows"] = len(data)
+    print(f"Saved benefits to {output_file}")
+
+
+if __name__ == "__main__":
+    args, random = get_parser().parse_known_args()
+    profiler = instrumentation.Profiler(args.profile)
+    main(args.input_folder, args.output_file, args.contains, args.base, profiler)
+    profiler.write_report(args.output_file)
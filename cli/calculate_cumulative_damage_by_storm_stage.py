@@ -1,16 +1,39 @@
 """
-v 1.0
+v 1.1
 
 Calculate cumulative damage by storm stage based on G2CRM AssetDamageDetail file
 
   python calculate_cumulative_damage_by_storm_stage.py --help
 
+Changelog
+
+v 1.1 19OCT2026
+Input file can be gzip/zstd compressed (*.csv.gz, *.csv.zst)
+Added --profile option to report time and memory per stage
+Added --from_warehouse option to read from a warehouse.py database
+Input file can be a G2CRM output sqlite file with an AssetDamageDetail table
+Only the Iteration, MaxStormStage and TotalLossPV columns are parsed
+Added --sample_iterations quick-look mode - estimates from a seeded sample of
+iterations with standard errors and 95% confidence intervals per storm stage
+Added --cache_dir option to reuse the output of an identical earlier run (see result_cache.py)
+
 """
 
 import argparse
 import pandas as pd
 import math
 import numpy as np
+import utils
+import instrumentation
+import warehouse
+import sqlite_outputs
+import iteration_index
+import result_cache
+
+
+input_columns = ["Iteration", "MaxStormStage", "TotalLossPV"]
+# code read by main - editing any of them invalidates cached results
+cache_sources = [__file__, utils.__file__, warehouse.__file__, sqlite_outputs.__file__, iteration_index.__file__]
 
 
 def get_parser():
@@ -35,6 +58,21 @@ def get_parser():
         '--integer', 
         action='store_true',
         help='Calculate whole max storm surge values only')
+    parser.add_argument(
+        '--from_warehouse',
+        help='Path to warehouse.py sqlite file - read the rows ingested from input_file from it')
+    parser.add_argument(
+        '-s',
+        '--sample_iterations',
+        type=int,
+        help='Optional - quick-look estimate from this many randomly picked iterations')
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=0,
+        help='Random seed used to pick the sampled iterations')
+    instrumentation.add_profile_argument(parser)
+    result_cache.add_cache_argument(parser)
     return parser
 
 
@@ -45,13 +83,41 @@ def calculate_totallosspv(data: pd.DataFrame, iter: int, storm_stage: int):
     return working_data["TotalLossPV"].sum()
 
 
-def main(input_file: str, output_file: str, linspace: int, integer: bool):
+def main(input_file: str, output_file: str, linspace: int, integer: bool, 
+    profiler: instrumentation.Profiler = None, from_warehouse: str = None,
+    sample_iterations: int = None, seed: int = 0, cache: result_cache.ResultCache = None):
 
     if linspace and integer: raise Exception("-int and -l tags are mututally exclusive")
+    profiler = profiler or instrumentation.Profiler()
+
+    if cache:
+        params = {"input_file": utils.remove_path(input_file), "linspace": linspace, "integer": integer,
+            "sample_iterations": sample_iterations, "seed": seed}
+        with profiler.stage("cache_fetch", input_file):
+            cache_key = cache.key("calculate_cumulative_damage_by_storm_stage", params, [from_warehouse or input_file],
+                cache_sources)
+            if cache.fetch(cache_key, [output_file]):
+                print(f"Saved outputs to {output_file} (cached)")
+                return
 
     print(f"Calculating damages using data from {input_file}")
-    data = pd.read_csv(input_file)
-    data = data[["Iteration", "MaxStormStage", "TotalLossPV"]]
+    with profiler.stage("read_csv", input_file) as record:
+        if sample_iterations and not from_warehouse:
+            data, iters, no_iters = iteration_index.read_sample(input_file, sample_iterations, seed, input_columns)
+        elif from_warehouse:
+            data = warehouse.query_file(from_warehouse, "AssetDamageDetail", input_file, input_columns)
+        elif utils.derive_extension(input_file) == "sqlite":
+            data = sqlite_outputs.read_table(input_file, "AssetDamageDetail", input_columns,
+                dtypes={col: utils.schemas["AssetDamageDetail"][col] for col in input_columns})
+        else:
+            with utils.open_data(input_file) as f:
+                data = pd.read_csv(f, **utils.csv_read_args(input_file, input_columns))
+            data = data[input_columns]
+        if sample_iterations and from_warehouse:
+            no_iters = int(data["Iteration"].max())
+            iters = utils.sample_iterations(range(1, no_iters+1), sample_iterations, seed)
+            data = data[data["Iteration"].isin(iters)]
+        record["rows"] = len(data)
     
     if integer:
         storm_stages = np.arange(round(data["MaxStormStage"].min())-1,math.ceil(data["MaxStormStage"].max())+1, 1)
@@ -60,26 +126,47 @@ def main(input_file: str, output_file: str, linspace: int, integer: bool):
     else:
         storm_stages = np.arange(round(data["MaxStormStage"].min())-1,math.ceil(data["MaxStormStage"].max())+1, .5)
 
-    iters = range(1, data["Iteration"].max()+1)
+    if not sample_iterations:
+        iters = range(1, data["Iteration"].max()+1)
 
     storm_stage_damages = []
+    storm_stage_errors = []
     no_storm_stage_values = len(storm_stages)
-    for j, storm_stage in zip(range(no_storm_stage_values), storm_stages):
-        
-        # logging to console
-        print(
-            f"{str(j+1).zfill(2)}/{no_storm_stage_values} - Calculating damages for MaxStormStage = {storm_stage}", 
-            end="\n" if j+1==no_storm_stage_values else "\r")
-
-        working_iters = []
-        for i in iters:
-            working_iters.append(calculate_totallosspv(data, i, storm_stage))
-        storm_stage_damages.append(np.mean(working_iters))
-        
+    with profiler.stage("storm_stage_damages", input_file) as record:
+        for j, storm_stage in zip(range(no_storm_stage_values), storm_stages):
+            
+            # logging to console
+            print(
+                f"{str(j+1).zfill(2)}/{no_storm_stage_values} - Calculating damages for MaxStormStage = {storm_stage}", 
+                end="\n" if j+1==no_storm_stage_values else "\r")
+
+            working_iters = []
+            for i in iters:
+                working_iters.append(calculate_totallosspv(data, i, storm_stage))
+            storm_stage_damages.append(np.mean(working_iters))
+            if sample_iterations:
+                working_iters = np.array(working_iters)
+                storm_stage_errors.append(utils.sample_standard_error(
+                    working_iters.sum(), (working_iters**2).sum(), len(iters), no_iters))
+        record["rows"] = len(data) * no_storm_stage_values
  
     print(f"Saving outputs to {output_file}")
-    pd.DataFrame(np.c_[storm_stages, storm_stage_damages], columns=["MaxStormStage", "CumulativeTotalLossPV"]).to_csv(output_file, index=False)
+    with profiler.stage("write", input_file) as record:
+        output = pd.DataFrame(np.c_[storm_stages, storm_stage_damages], columns=["MaxStormStage", "CumulativeTotalLossPV"])
+        if sample_iterations:
+            print(f"Estimated from {len(iters)} of {no_iters} iterations")
+            output["CumulativeTotalLossPV_SE"] = storm_stage_errors
+            output["CumulativeTotalLossPV_CILow"] = output["CumulativeTotalLossPV"] - utils.confidence_z*output["CumulativeTotalLossPV_SE"]
+            output["CumulativeTotalLossPV_CIHigh"] = output["CumulativeTotalLossPV"] + utils.confidence_z*output["CumulativeTotalLossPV_SE"]
+        output.to_csv(output_file, index=False)
+        record["rows"] = no_storm_stage_values
+    if cache:
+        with profiler.stage("cache_store", input_file):
+            cache.store(cache_key, [output_file], "calculate_cumulative_damage_by_storm_stage")
 
 if __name__ == "__main__":
     args, random = get_parser().parse_known_args()
-    main(args.input_file[0], args.output_file[0], args.linspace, args.integer)
\ No newline at end of file
+    profiler = instrumentation.Profiler(args.profile)
+    main(args.input_file[0], args.output_file[0], args.linspace, args.integer, profiler, args.from_warehouse,
+        args.sample_iterations, args.seed, result_cache.from_args(args))
+    profiler.write_report(args.output_file[0])
\ No newline at end of file
@@ -0,0 +1,229 @@
+"""
+v1.2
+
+Monte Carlo convergence diagnostics of G2CRM runs.
+
+Streams AssetDamageDetail (or IterationYear, ...) files once in chunks, sums
+value_column (default TotalLossPV) by iteration and keeps a Welford running
+mean and variance of the iteration totals. Only the running statistics of the
+current file are held in memory. Iterations without rows (e.g. no damages)
+count as zero, including those after the last row of the file - the number
+of iterations is --iterations when given, else the 'Number of Iterations' of
+the finished prn file in the same run folder, else the last iteration in the file.
+Rows must be grouped by iteration as written by G2CRM.
+
+Outputs:
+    output_file            one row per file: iterations, mean, std, relative
+                           standard error and the iteration count at which the
+                           relative standard error fell below --target for good
+                           (or the projected count if it never did)
+    <output_file>_curves   convergence curves - running mean, standard error,
+                           relative standard error and 95% confidence interval
+                           every --step iterations
+
+python convergence_diagnostics.py --help
+python convergence_diagnostics.py --input_folder "C:/Runs" --output_file "C:/Convergence.csv"
+    --contains AssetDamageDetail FWOP --target 0.01
+python convergence_diagnostics.py --input_folder "C:/Runs" --output_file "C:/Convergence.csv"
+    --contains IterationYear --value_column <damage column>
+
+Changelog:
+
+19OCT2026 v1.0
+19OCT2026 v1.1 - Trailing iterations without rows count as zero, added --iterations option
+19OCT2026 v1.2 - Says when a file falls back to its last iteration because its prn is missing or unfinished
+"""
+import argparse
+import csv
+import math
+import os
+from typing import Iterator, List, Tuple
+import pandas as pd
+import utils
+import instrumentation
+import summarize_runs
+
+# file prefix -> default column summed by iteration
+value_columns = {"AssetDamageDetail": "TotalLossPV"}
+iteration_column = "Iteration"
+
+# rows per chunk while streaming csv files
+chunksize = 200000
+
+curve_columns = ["File", "Iterations", "Mean", "Std", "SE", "RelativeSE", "CILow", "CIHigh"]
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description="Monte Carlo convergence diagnostics of G2CRM runs")
+    parser.add_argument(
+        '-i',
+        '--input_folder',
+        help='Path to input folder containing AssetDamageDetail/IterationYear files')
+    parser.add_argument(
+        '-o',
+        '--output_file',
+        help='Path to summary output file - curves are saved to <output_file>_curves.csv')
+    parser.add_argument(
+        '-c',
+        '--contains',
+        nargs='+',
+        default=["AssetDamageDetail"],
+        help='Unique str identifier e.g. AssetDamageDetail FWOP')
+    parser.add_argument(
+        '-v',
+        '--value_column',
+        help='Column summed by iteration (default TotalLossPV for AssetDamageDetail files)')
+    parser.add_argument(
+        '-n',
+        '--iterations',
+        type=int,
+        help='Number of iterations of the runs (default: from the prn file of each run folder)')
+    parser.add_argument(
+        '-t',
+        '--target',
+        type=float,
+        default=0.01,
+        help='Target relative standard error of the mean e.g. 0.01 for 1%%')
+    parser.add_argument(
+        '-s',
+        '--step',
+        type=int,
+        default=1,
+        help='Write a convergence curve row every step iterations')
+    instrumentation.add_profile_argument(parser)
+    return parser
+
+
+class RunningStats:
+    """Welford running mean and variance"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    @property
+    def standard_error(self) -> float:
+        return self.std / math.sqrt(self.count) if self.count else 0.0
+
+    @property
+    def relative_standard_error(self) -> float:
+        if self.mean == 0:
+            return 0.0 if self.m2 == 0 else math.inf
+        return self.standard_error / abs(self.mean)
+
+
+def iteration_totals(path: str, value_column: str, iterations: int = None) -> Iterator[Tuple[int, float]]:
+    """
+    Yield (iteration, sum of value_column) in iteration order, 0 for iterations
+    without rows up to 'iterations' (the last iteration in the file if None)
+    """
+    current, total = 0, 0.0
+    with utils.open_data(path) as f:
+        for chunk in pd.read_csv(f, chunksize=chunksize, **utils.csv_read_args(path, [iteration_column, value_column])):
+            sums = chunk.groupby(iteration_column, sort=False)[value_column].sum()
+            for iteration, value in sums.items():
+                if iteration == current:
+                    total += value
+                    continue
+                if iteration < current:
+                    raise Exception(f"Iteration {iteration} is not contiguous in {path}")
+                if current:
+                    yield current, total
+                for missing in range(current + 1, iteration):
+                    yield missing, 0.0
+                current, total = int(iteration), value
+    if current:
+        yield current, total
+    for missing in range(current + 1, (iterations or 0) + 1):
+        yield missing, 0.0
+
+
+def diagnose(path: str, value_column: str, target: float, step: int, curve_writer, iterations: int = None) -> dict:
+    """Stream path once, write its convergence curve rows and return its summary"""
+    stats = RunningStats()
+    converged_at = None
+    file_name = utils.remove_path(path)
+    for iteration, total in iteration_totals(path, value_column, iterations):
+        stats.add(total)
+        rse = stats.relative_standard_error
+        if stats.count > 1 and rse <= target:
+            converged_at = converged_at or stats.count
+        else:
+            converged_at = None # must stay below target
+        if stats.count % step == 0:
+            curve_writer.writerow(curve_row(file_name, stats))
+    if stats.count % step:
+        curve_writer.writerow(curve_row(file_name, stats))
+
+    # iterations needed for the target if it was not reached: (std / (target * mean))^2
+    projected = math.ceil((stats.std / (target * abs(stats.mean)))**2) if stats.mean else None
+    return {
+        "File": file_name,
+        "ValueColumn": value_column,
+        "Iterations": stats.count,
+        "Mean": stats.mean,
+        "Std": stats.std,
+        "SE": stats.standard_error,
+        "RelativeSE": stats.relative_standard_error,
+        "TargetRelativeSE": target,
+        "ConvergedAtIteration": converged_at,
+        "ProjectedIterations": projected,
+        "Path": path}
+
+
+def curve_row(file_name: str, stats: RunningStats) -> list:
+    se = stats.standard_error
+    return [file_name, stats.count, stats.mean, stats.std, se, stats.relative_standard_error,
+        stats.mean - utils.confidence_z*se, stats.mean + utils.confidence_z*se]
+
+
+def main(input_folder: str, output_file: str, contains: List[str] = ["AssetDamageDetail"], value_column: str = None,
+    target: float = 0.01, step: int = 1, profiler: instrumentation.Profiler = None, iterations: int = None):
+
+    profiler = profiler or instrumentation.Profiler()
+    with profiler.stage("discover") as record:
+        files = utils.full_paths_by_type(input_folder, "csv", contains)
+        record["rows"] = len(files)
+
+    curves_file = os.path.splitext(output_file)[0] + "_curves.csv"
+    summaries = []
+    with open(curves_file, "w", newline="") as f:
+        curve_writer = csv.writer(f)
+        curve_writer.writerow(curve_columns)
+        for i, file in enumerate(files):
+            column = value_column or value_columns.get(utils.derive_prefix(file))
+            if column is None:
+                raise Exception(f"Use --value_column to choose the column of {utils.remove_path(file)} to diagnose")
+            print(f"{str(i+1).zfill(2)}/{len(files)} - Streaming {utils.remove_path(file)}")
+            file_iterations = iterations or summarize_runs.run_iterations(file)
+            if file_iterations is None:
+                print(f"No finished prn file next to {utils.remove_path(file)}, iterations end at its last iteration")
+            with profiler.stage("diagnose", file) as record:
+                summary = diagnose(file, column, target, step, curve_writer, file_iterations)
+                record["rows"] = summary["Iterations"]
+            summaries.append(summary)
+            print(f"Mean {column} {summary['Mean']:,.2f}, relative SE {summary['RelativeSE']:.4f} after {summary['Iterations']} iterations - "
+                + (f"below {target} from iteration {summary['ConvergedAtIteration']}" if summary['ConvergedAtIteration']
+                else f"about {summary['ProjectedIterations']} iterations needed for {target}"))
+
+    pd.DataFrame(summaries).to_csv(output_file, index=False)
+    print(f"Saved summary to {output_file} and curves to {curves_file}")
+
+
+if __name__ == "__main__":
+    args, random = get_parser().parse_known_args()
+    profiler = instrumentation.Profiler(args.profile)
+    main(args.input_folder, args.output_file, args.contains, args.value_column, args.target, args.step, profiler,
+        args.iterations)
+    profiler.write_report(args.output_file)
@@ -1,5 +1,5 @@
 """
-v1.3
+v1.7
 
 Copies files located in subdirectories of a master input folder based
 on name and file extension.
@@ -11,13 +11,42 @@ Changelog:
 23FEB2021 - v1.3
 Added skip logging option
 
+19OCT2026 - v1.4
+Existing files are indexed in a dict instead of searched in a list
+Added --threads option to copy files with a bounded thread pool
+
+19OCT2026 - v1.5
+Added --sync mode. A manifest (copy_files_to_folder_manifest.json) of source
+size/mtime/md5 is kept in the output folder. Only new or changed sources are
+copied, via a .part temp file renamed on completion, so an interrupted run
+resumes without redoing completed files. --link hard-links instead of copying
+when source and output are on the same filesystem.
+
+19OCT2026 - v1.6
+Added --compress option (gzip or zstd) to compress files while copying. zstd
+falls back to gzip if the zstandard package is not installed. Already
+compressed sources (*.csv.gz, *.csv.zst) are copied as is.
+Added --profile option to report time and memory per stage
+Added --shard i/N option to copy part of the files on each node (see
+sharding.py). Files are sharded by name so a name is only copied once. Each
+shard keeps its own sync manifest and log.
+
+19OCT2026 - v1.7
+--sync copies a name found in several subfolders only once, like the default mode
+--link no longer leaves a .part file when the output is already a hard link of the source
+
 """
 import argparse
 import utils
+import instrumentation
+import sharding
 import re
 import datetime
 import shutil
 import os
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 
 def get_parser():
@@ -42,55 +71,293 @@ def get_parser():
         '--contains', 
         nargs='+', 
         help='Unique str identifier e.g. FWOP, S1, Intermediate, etc.')
+    parser.add_argument(
+        '-t', 
+        '--threads', 
+        type=int,
+        default=1,
+        help='Number of files copied concurrently (default 1 - serial copy)')
+    parser.add_argument(
+        '-s', 
+        '--sync', 
+        action='store_true',
+        help='Only copy new or changed files using a manifest in the output folder')
+    parser.add_argument(
+        '-l', 
+        '--link', 
+        action='store_true',
+        help='Sync mode only - hard link instead of copying when on the same filesystem')
+    parser.add_argument(
+        '-z', 
+        '--compress', 
+        choices=['gzip', 'zstd'],
+        help='Compress copied files with gzip or zstd')
+    instrumentation.add_profile_argument(parser)
+    sharding.add_shard_argument(parser)
     return parser
 
 
-def main(input_folder: str, output_folder: str, extension: str, contains: str, print_log: bool = True):
+manifest_file_name = "copy_files_to_folder_manifest.json"
+# save the manifest after this many completed copies in sync mode
+manifest_save_interval = 50
+
+
+def load_manifest(output_folder: str, shard: tuple = None) -> dict:
+    """Load sync manifest - source path -> {size, mtime, md5, dest}"""
+    manifest_path = sharding.shard_path(os.path.join(output_folder, manifest_file_name), shard)
+    if not os.path.exists(manifest_path):
+        if shard is None:
+            return {}
+        # first run of a shard starts from the entries of its files in the folder manifest
+        return {k: v for k, v in load_manifest(output_folder).items() if sharding.select_files([k], shard, utils.remove_meta)}
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+def save_manifest(output_folder: str, manifest: dict, shard: tuple = None):
+    """Write manifest through a temp file so it is never left half written"""
+    manifest_path = sharding.shard_path(os.path.join(output_folder, manifest_file_name), shard)
+    with open(manifest_path + ".part", "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(manifest_path + ".part", manifest_path)
+
+
+def file_md5(path: str) -> str:
+    md5 = hashlib.md5()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024*1024), b""):
+            md5.update(block)
+    return md5.hexdigest()
+
+
+def compress_file(file: str, copy_path: str, compression: str):
+    """Stream file into a compressed copy"""
+    with open(file, "rb") as src, utils.open_data(copy_path, "wb", compression) as dst:
+        shutil.copyfileobj(src, dst, 1024*1024)
+    shutil.copystat(file, copy_path)
+
+
+def sync_file(file: str, copy_path: str, link: bool = False, compression: str = None):
+    """
+    Copy file to copy_path.part then rename to copy_path. Returns md5 of the
+    source data. With link=True a hard link is attempted first and copying is
+    only used if linking fails (e.g. different filesystem). Data is compressed
+    while copying if compression is given (link is then ignored).
+    """
+    temp_path = copy_path + ".part"
+    if os.path.exists(temp_path):
+        os.remove(temp_path) # leftover from an interrupted run
+    if link and compression is None:
+        try:
+            os.link(file, temp_path)
+            if os.path.exists(copy_path) and os.path.samefile(temp_path, copy_path):
+                os.remove(temp_path) # already linked, renaming onto the same file would keep both names
+            else:
+                os.replace(temp_path, copy_path)
+            return file_md5(copy_path)
+        except OSError:
+            pass
+
+    md5 = hashlib.md5()
+    with open(file, "rb") as src, utils.open_data(temp_path, "wb", compression) as dst:
+        for block in iter(lambda: src.read(1024*1024), b""):
+            md5.update(block)
+            dst.write(block)
+    shutil.copystat(file, temp_path)
+    os.replace(temp_path, copy_path)
+    return md5.hexdigest()
+
 
-    logger = utils.LogManager(os.path.join(output_folder, "copy_files_to_folder.log"))
+def copy_files(copy_jobs: list, threads: int = 1, copy_function=shutil.copy2):
+    """
+    Copy (source, destination) pairs with copy_function. Uses a pool of at most
+    'threads' workers when threads > 1. Yields (source, destination, result, 
+    exception or None) as each copy finishes
+    """
+    if threads <= 1:
+        for file, copy_path in copy_jobs:
+            try:
+                yield file, copy_path, copy_function(file, copy_path), None
+            except Exception as e:
+                yield file, copy_path, None, e
+        return
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = {executor.submit(copy_function, file, copy_path): (file, copy_path) for file, copy_path in copy_jobs}
+        for future in as_completed(futures):
+            file, copy_path = futures[future]
+            error = future.exception()
+            yield file, copy_path, None if error else future.result(), error
+
+
+def file_unchanged(file: str, stat: os.stat_result, entry: dict, output_folder: str) -> bool:
+    """
+    Sync mode - compare source against its manifest entry. A source with the
+    same size but a new mtime is hashed and considered unchanged if the md5
+    matches (e.g. touched or re-copied by G2CRM without changes)
+    """
+    if entry is None or not os.path.exists(output_folder + "\\" + entry["dest"]):
+        return False
+    if entry["size"] != stat.st_size:
+        return False
+    if entry["mtime"] == stat.st_mtime:
+        return True
+    if entry["md5"] is not None and entry["md5"] == file_md5(file):
+        entry["mtime"] = stat.st_mtime
+        return True
+    return False
+
+
+def is_aggregated(no_meta_file: str) -> bool:
+    """Combined/aggregated outputs are never copied"""
+    return bool(re.search("ombined", no_meta_file) or re.search("ggregate", no_meta_file))
+
+
+def select_sources(file_list: list, existed_files: dict = None) -> list:
+    """
+    Sources the default (non sync) mode copies - the first file of each name
+    (without path and timestamp) that is not in existed_files, skipping
+    combined/aggregated files
+    """
+    names = set(existed_files or {})
+    selected = []
+    for file in file_list:
+        no_meta_file = utils.remove_meta(file)
+        if no_meta_file in names or is_aggregated(no_meta_file):
+            continue
+        names.add(no_meta_file)
+        selected.append(file)
+    return selected
+
+
+def main(input_folder: str, output_folder: str, extension: str, contains: str, print_log: bool = True, threads: int = 1,
+    sync: bool = False, link: bool = False, compress: str = None, profiler: instrumentation.Profiler = None,
+    shard: tuple = None):
+
+    profiler = profiler or instrumentation.Profiler()
+
+    logger = utils.LogManager(sharding.shard_path(os.path.join(output_folder, "copy_files_to_folder.log"), shard))
 
     if print_log: print(f"Copying files to {output_folder}")
-    file_list = utils.full_paths_by_type(input_folder, extension, contains)
+    if compress == "zstd" and utils.zstandard is None:
+        logger.log_warning("zstandard package is not installed - compressing with gzip")
+        compress = "gzip"
+    compress_extension = {v: k for k, v in utils.compression_extensions.items()}.get(compress)
+    with profiler.stage("discover") as record:
+        file_list = utils.full_paths_by_type(input_folder, extension, contains)
+        file_list = [file for position, file in sharding.select_files(file_list, shard, utils.remove_meta)]
+
+        # get output folder files list - name without meta -> name in folder
+        existed_files = {utils.remove_meta(x): utils.remove_path(x) for x in utils.full_paths_by_type(output_folder, extension, ".")}
+        record["rows"] = len(file_list)
+
+    # create new file path suffix
+    now = str(datetime.datetime.now())[:19]
+    now = now.replace("-","")
+    now = now.replace(":","")
+    now = now.replace(" ","-")
 
-    # get output folder files list
-    existed_files_with_meta = utils.full_paths_by_type(output_folder, extension, ".")
-    existed_files_without_path = list(map(utils.remove_path, existed_files_with_meta))
-    existed_files = list(map(utils.remove_meta, existed_files_with_meta))
+    manifest = load_manifest(output_folder, shard) if sync else {}
+    # sync mode - name in folder -> source file it was copied from
+    dest_sources = {entry["dest"]: source for source, entry in manifest.items()}
+    for dest in dest_sources:
+        existed_files.setdefault(utils.remove_meta(dest), dest)
+    stats = {}
 
     skip_count = 0
-    copy_count = 0
-    for i, file in zip(range(len(file_list)), file_list):
-        if utils.remove_meta(file) in existed_files: # check if file is already copied
-            existed_index = existed_files.index(utils.remove_meta(file))
+    copy_jobs = []
+    for i, file in enumerate(file_list):
+        no_meta_file = utils.remove_meta(file)
+        # same name from a different subfolder is only copied once
+        duplicate = no_meta_file in existed_files and not sync
+        if sync:
+            stats[file] = os.stat(file)
+            entry = manifest.get(file)
+            existed_path = output_folder + "\\" + existed_files.get(no_meta_file, "")
+            if entry is None and no_meta_file in existed_files:
+                duplicate = dest_sources.get(existed_files[no_meta_file], file) != file
+            if entry is None and not duplicate and no_meta_file in existed_files and os.path.exists(existed_path):
+                # copied by a run without manifest - adopt it if it matches
+                entry = {"dest": existed_files[no_meta_file], "size": None, "mtime": None, "md5": None}
+                existed_stat = os.stat(existed_path)
+                if (existed_stat.st_size, existed_stat.st_mtime) == (stats[file].st_size, stats[file].st_mtime):
+                    entry["size"], entry["mtime"] = existed_stat.st_size, existed_stat.st_mtime
+                manifest[file] = entry
+                dest_sources[entry["dest"]] = file
+
+        if sync and file_unchanged(file, stats[file], manifest.get(file), output_folder):
             if print_log:
-                logger.log_info(f"{str(i+1).zfill(2)}/{len(file_list)} - File in folder - {file} as {existed_files_without_path[existed_index]}")
+                logger.log_info(f"{str(i+1).zfill(2)}/{len(file_list)} - Unchanged - {file} as {manifest[file]['dest']}")
             skip_count += 1
-        elif re.search("ombined", utils.remove_meta(file)) or re.search("ggregate", utils.remove_meta(file)):
+        elif duplicate: # check if file is already copied
+            if print_log:
+                logger.log_info(f"{str(i+1).zfill(2)}/{len(file_list)} - File in folder - {file} as {existed_files[no_meta_file]}")
+            skip_count += 1
+        elif is_aggregated(no_meta_file):
             if print_log:
                 logger.log_info(f"{str(i+1).zfill(2)}/{len(file_list)} - Skipping over aggregated file - {utils.remove_path(file)}")
             skip_count += 1
+        elif sync and file in manifest:
+            # changed file - overwrite the previous copy
+            copy_path = output_folder + "\\" + manifest[file]["dest"]
+            if print_log:
+                logger.log_info(f"{str(i+1).zfill(2)}/{len(file_list)} - Updating - {file} to {utils.remove_path(copy_path)}")
+            copy_jobs.append((file, copy_path))
         else:
-            # create new file path
-            now = str(datetime.datetime.now())[:19]
-            now = now.replace("-","")
-            now = now.replace(":","")
-            now = now.replace(" ","-")
             copy_path = output_folder + "\\" + utils.remove_extension(utils.remove_path(file))
             if not utils.timestamp_inplace(utils.remove_path(file)):
                 copy_path += ("_" + now)
             copy_path += ("." + extension)
+            if utils.derive_compression(file):
+                copy_path += ("." + file.split(".")[-1]) # keep source compression
+            elif compress:
+                copy_path += ("." + compress_extension)
 
             if print_log:
                 logger.log_info(f"{str(i+1).zfill(2)}/{len(file_list)} - Copying - {file} to {utils.remove_path(copy_path)}")
+            copy_jobs.append((file, copy_path))
+            existed_files[no_meta_file] = utils.remove_path(copy_path)
+            dest_sources[existed_files[no_meta_file]] = file
 
-            shutil.copy2(file, copy_path)
-            copy_count += 1
+    def copy_function(file, copy_path):
+        # compress only plain sources going to a compressed destination
+        compression = None if utils.derive_compression(file) else utils.derive_compression(copy_path)
+        if sync:
+            return sync_file(file, copy_path, link, compression)
+        if compression:
+            return compress_file(file, copy_path, compression)
+        return shutil.copy2(file, copy_path)
+
+    copy_count = 0
+    error_count = 0
+    with profiler.stage("copy") as record:
+        try:
+            for file, copy_path, result, error in copy_files(copy_jobs, threads, copy_function):
+                if error is None:
+                    copy_count += 1
+                    if sync:
+                        manifest[file] = {
+                            "dest": utils.remove_path(copy_path), "size": stats[file].st_size, 
+                            "mtime": stats[file].st_mtime, "md5": result}
+                        if copy_count % manifest_save_interval == 0:
+                            save_manifest(output_folder, manifest, shard)
+                else:
+                    error_count += 1
+                    logger.log_warning(f"Failed to copy {file} to {copy_path} - {error}")
+        finally:
+            # completed copies are kept in the manifest even when interrupted
+            if sync:
+                save_manifest(output_folder, manifest, shard)
+        record["rows"] = copy_count
 
     if print_log:
-        logger.log_info(f"Copied {copy_count} files - skipped {skip_count} files - total {len(file_list)} files")
+        logger.log_info(f"Copied {copy_count} files - skipped {skip_count} files - failed {error_count} files - total {len(file_list)} files")
         logger.log_info(f"All files were saved to {output_folder}")
 
 
 if __name__ == "__main__":
     args, random = get_parser().parse_known_args()
-    main(args.input_folder[0], args.output_folder[0], args.extension[0], args.contains)
\ No newline at end of file
+    profiler = instrumentation.Profiler(args.profile)
+    main(args.input_folder[0], args.output_folder[0], args.extension[0], args.contains, threads=args.threads,
+        sync=args.sync, link=args.link, compress=args.compress, profiler=profiler, shard=args.shard)
+    profiler.write_report(sharding.shard_path(os.path.join(args.output_folder[0], "copy_files_to_folder.csv"), args.shard))
\ No newline at end of file
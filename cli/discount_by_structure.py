@@ -1,5 +1,5 @@
 """
-v1.0
+v1.5
 
 Recalculate present value of damages using a specified discount rate.
 
@@ -12,26 +12,70 @@ Changelog
 
 v1.0 19OCT2020
 
+v1.1 19OCT2026
+Input file can be gzip/zstd compressed (*.csv.gz, *.csv.zst)
+Added --profile option to report time and memory per stage
+Split main into read/discount/pivot functions reused by discount_pipeline.py
+Added --from_warehouse option to read from a warehouse.py database
+Input file can be a G2CRM output sqlite file - read in chunks from its AssetDamageDetail table
+Only needed columns are read (with compact dtypes) unless WorkingCalculations_ are saved
+Added --sample_iterations quick-look mode - mean damages of a seeded sample of
+iterations with standard errors and 95% confidence intervals
+
+v1.2 19OCT2026
+Added --cache_dir option to reuse outputs of identical earlier runs (see result_cache.py)
+Added --sparse_iterations option - PV damages per asset and iteration as a long
+table of the nonzero pairs from one groupby, --binary saves it as compressed .npz
+
+v1.3 19OCT2026
+WorkingCalculations_ files are opt-in with --working_calcs, so by default only
+the columns used to discount are read
+--sparse_iterations never saves the dense WorkingCalculations_ file
+Cached results also depend on the warehouse, sqlite_outputs and iteration_index code
+
+v1.4 19OCT2026
+WorkingCalculations_ files are saved by default again, as in v1.2 - --working_calcs
+is replaced by --skip_working_calcs to read only the columns used to discount
+--sample_iterations skips WorkingCalculations_ by default, like --sparse_iterations
+
+v1.5 19OCT2026
+The AssetDamageDetail table of a sqlite file is read with the schema dtypes of the csv files
+
 """
 import argparse
+import numpy as np
 import pandas as pd
 import utils
 import os
 import math
+import instrumentation
+import warehouse
+import sqlite_outputs
+import iteration_index
+import result_cache
 
 # setting flag_mean_pivot as True results in only mean output 
 # for each asset rather than damages per Iteration
 flag_mean_pivot = True
-# save calculation step as WorkingCalculations_ file
+# save calculation step as WorkingCalculations_ file (unless --skip_working_calcs)
 flag_save_working_calcs = True
 
+discount_cols = ['ValueLossStructure', 'ValueLossContents', 'TotalLoss']
+# columns used to discount - the only ones read unless WorkingCalculations_ are saved
+input_columns = ['Time', 'Iteration', 'AssetExternalReference'] + discount_cols
+# table read when input_file is a G2CRM output sqlite file
+sqlite_table = "AssetDamageDetail"
+pv_cols = ['ValueLossStructurePV', 'ValueLossContentsPV', 'TotalLossPV']
+# code read by main - editing any of them invalidates cached results
+cache_sources = [__file__, utils.__file__, warehouse.__file__, sqlite_outputs.__file__, iteration_index.__file__]
+
 
 def get_parser():
     parser = argparse.ArgumentParser(description="Discount from AssetDamageDetailFile")
     parser.add_argument(
         '-i',
         '--input_file',
-        help='Path to input folder containing AssetDamageDetailFile')
+        help='Path to AssetDamageDetail csv file or G2CRM output sqlite file with an AssetDamageDetail table')
     parser.add_argument(
         '-o', 
         '--output_file', 
@@ -45,6 +89,33 @@ def get_parser():
         '-b', 
         '--base_timestamp',
         help='Base timestamp in format YYYYMMDD')
+    parser.add_argument(
+        '--from_warehouse',
+        help='Path to warehouse.py sqlite file - read the rows ingested from input_file from it')
+    parser.add_argument(
+        '-s',
+        '--sample_iterations',
+        type=int,
+        help='Optional - quick-look estimate from this many randomly picked iterations')
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=0,
+        help='Random seed used to pick the sampled iterations')
+    parser.add_argument(
+        '--sparse_iterations',
+        action='store_true',
+        help='Save PV damages per asset and iteration, only nonzero pairs, instead of means per asset')
+    parser.add_argument(
+        '--binary',
+        action='store_true',
+        help='With --sparse_iterations - save a compressed .npz file instead of csv (read with read_sparse)')
+    parser.add_argument(
+        '--skip_working_calcs',
+        action='store_true',
+        help='Do not save the WorkingCalculations_ file, only the columns used to discount are read (always skipped with --sparse_iterations and --sample_iterations)')
+    instrumentation.add_profile_argument(parser)
+    result_cache.add_cache_argument(parser)
     return parser
 
 
@@ -54,32 +125,47 @@ def calculate_discount_factor(timestamp, base_timestamp, discount_rate):
     return (1/(1+discount_rate)**((timestamp - base_timestamp).days/365))
 
 
-def main(input_file: str, output_file: str, discount_rate: float, base_timestamp: str) -> None:
-    # print(f"Reading from {input_file}")
+def read_asset_damage_detail(input_file: str, from_warehouse: str = None, columns: list = None) -> pd.DataFrame:
+    """
+    Read AssetDamageDetail csv file, the AssetDamageDetail table of a G2CRM
+    output sqlite file, or the rows ingested from input_file into a warehouse.py database.
+    Only 'columns' are read if given (all columns otherwise)
+    """
+    if from_warehouse:
+        return warehouse.query_file(from_warehouse, "AssetDamageDetail", input_file, columns, parse_dates=['Time'])
+    if utils.derive_extension(input_file) == "sqlite":
+        # same dtypes as csv_read_args gives the csv files
+        dtypes = {k: v for k, v in utils.schemas.get(sqlite_table, {}).items() if v != "datetime"}
+        return sqlite_outputs.read_table(input_file, sqlite_table, columns, dtypes, parse_dates=['Time'])
+    read_args = utils.csv_read_args(input_file, columns)
+    read_args["parse_dates"] = ['Time']
+    with utils.open_data(input_file) as f:
+        return pd.read_csv(f, low_memory=False, **read_args)
+
 
+def discount_damages(data: pd.DataFrame, discount_rate: float, base_timestamp: str) -> pd.DataFrame:
+    """Add DiscountFactor_Script and *PV_Script columns. discount_rate in percentage"""
     discount_rate = discount_rate / 100
-    discount_cols = ['ValueLossStructure', 'ValueLossContents', 'TotalLoss']
     base_timestamp = pd.Timestamp(base_timestamp)
-    output_folder = utils.folder_path(output_file)
-
-    data = pd.read_csv(input_file, parse_dates=['Time'], low_memory=False)
 
     data["DiscountFactor_Script"] = data["Time"].apply(lambda x: calculate_discount_factor(x, base_timestamp, discount_rate))
 
     # Calculate discount factor and new struct/contents/total damages
     for col in discount_cols:
         data[col+"PV_Script"] = data["DiscountFactor_Script"]*data[col]
+    return data
 
-    # Output intermediate calculations
-    if flag_save_working_calcs:
-        data.to_csv(os.path.join(output_folder,"WorkingCalculations_" + utils.remove_meta(input_file) + ".csv"), index=False)
+
+def pv_by_asset(data: pd.DataFrame, mean_pivot: bool = None) -> pd.DataFrame:
+    """Aggregate discounted damages by asset (and Iteration if mean_pivot is False)"""
+    mean_pivot = flag_mean_pivot if mean_pivot is None else mean_pivot
 
     # aggregate data for each asset
     pv_data = data.pivot_table(values=['ValueLossStructurePV_Script', 'ValueLossContentsPV_Script',
        'TotalLossPV_Script'], index=['AssetExternalReference', 'Iteration'], aggfunc="sum")
 
     # calculate mean damages for each asset
-    if flag_mean_pivot:
+    if mean_pivot:
         pv_data = pv_data.pivot_table(values=['ValueLossStructurePV_Script', 'ValueLossContentsPV_Script',
             'TotalLossPV_Script'], index=['AssetExternalReference'], aggfunc="sum")
         no_iters = max(data['Iteration'].values)
@@ -91,11 +177,165 @@ def main(input_file: str, output_file: str, discount_rate: float, base_timestamp
 
     pv_data.columns = ['ValueLossStructurePV', 'ValueLossContentsPV',
             'TotalLossPV']
+    return pv_data
+
+
+def sparse_pv_by_iteration(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Discounted damages per asset and iteration in one groupby, long table of
+    the nonzero (AssetExternalReference, Iteration) pairs sorted by both
+    """
+    pv_data = data.groupby(['AssetExternalReference', 'Iteration'])[[col+"PV_Script" for col in discount_cols]].sum()
+    pv_data.columns = pv_cols
+    pv_data = pv_data[(pv_data != 0).any(axis=1)]
+    return pv_data.reset_index()
+
+
+def sparse_path(output_file: str, binary: bool) -> str:
+    """Output file of --sparse_iterations, .npz extension when binary"""
+    return os.path.splitext(output_file)[0] + ".npz" if binary else output_file
+
+
+def write_sparse(pv_data: pd.DataFrame, output_file: str, binary: bool = False):
+    """
+    Save a sparse_pv_by_iteration table as csv, or as compressed npz arrays:
+    assets (unique references), asset (int32 index into assets), Iteration and
+    the PV columns
+    """
+    if not binary:
+        pv_data.to_csv(output_file, index=False)
+        return
+    codes, assets = pd.factorize(pv_data['AssetExternalReference'], sort=True)
+    arrays = {col: pv_data[col].to_numpy() for col in pv_cols}
+    # np.savez_compressed adds .npz unless the path already ends with it
+    np.savez_compressed(output_file, assets=np.asarray(assets, dtype=str), asset=codes.astype(np.int32),
+        Iteration=pv_data['Iteration'].to_numpy(dtype=np.int32), **arrays)
+
+
+def read_sparse(path: str) -> pd.DataFrame:
+    """sparse_pv_by_iteration table from a csv or npz file written by write_sparse"""
+    if not path.endswith(".npz"):
+        return pd.read_csv(path)
+    with np.load(path) as arrays:
+        data = pd.DataFrame({'AssetExternalReference': arrays['assets'][arrays['asset']], 'Iteration': arrays['Iteration']})
+        for col in pv_cols:
+            data[col] = arrays[col]
+    return data
+
+
+def sampled_pv_by_asset(data: pd.DataFrame, sampled: list, no_iters: int) -> pd.DataFrame:
+    """
+    Mean discounted damages by asset estimated from the sampled iterations,
+    with standard errors (_SE) and 95% confidence intervals (_CILow, _CIHigh)
+    """
+    pv_cols = [col+"PV_Script" for col in discount_cols]
+    by_iter = data.groupby(['AssetExternalReference', 'Iteration'])[pv_cols].sum()
+    sums = by_iter.groupby(level=0).sum()
+    sum_squares = (by_iter**2).groupby(level=0).sum()
+
+    pv_data = pd.DataFrame(index=sums.index)
+    for col in discount_cols:
+        mean = sums[col+"PV_Script"] / len(sampled)
+        se = utils.sample_standard_error(sums[col+"PV_Script"], sum_squares[col+"PV_Script"], len(sampled), no_iters)
+        pv_data[col+"PV"] = mean
+        pv_data[col+"PV_SE"] = se
+        pv_data[col+"PV_CILow"] = mean - utils.confidence_z*se
+        pv_data[col+"PV_CIHigh"] = mean + utils.confidence_z*se
+    return pv_data
+
+
+def sampled_total(data: pd.DataFrame, sampled: list, no_iters: int) -> tuple:
+    """Estimated mean TotalLossPV of all assets and its standard error"""
+    totals = data.groupby('Iteration')['TotalLossPV_Script'].sum()
+    return totals.sum() / len(sampled), utils.sample_standard_error(totals.sum(), (totals**2).sum(), len(sampled), no_iters)
+
+
+def working_calcs_path(input_file: str, output_folder: str) -> str:
+    return os.path.join(output_folder,"WorkingCalculations_" + utils.remove_meta(input_file) + ".csv")
+
+
+def main(input_file: str, output_file: str, discount_rate: float, base_timestamp: str, 
+    profiler: instrumentation.Profiler = None, from_warehouse: str = None,
+    sample_iterations: int = None, seed: int = 0, cache: result_cache.ResultCache = None,
+    sparse_iterations: bool = False, binary: bool = False, working_calcs: bool = None) -> None:
+    # print(f"Reading from {input_file}")
+
+    if sample_iterations and sparse_iterations:
+        raise Exception("--sample_iterations and --sparse_iterations are mutually exclusive")
+    profiler = profiler or instrumentation.Profiler()
+    if working_calcs is None:
+        # quick-look and sparse outputs skip the full per row file by default
+        working_calcs = flag_save_working_calcs and not (sample_iterations or sparse_iterations)
+    if sparse_iterations and working_calcs:
+        # the dense per row file would undo the savings of the sparse output
+        print("WorkingCalculations_ are not saved with --sparse_iterations")
+        working_calcs = False
+    if sparse_iterations:
+        output_file = sparse_path(output_file, binary)
+    output_folder = utils.folder_path(output_file)
+    # WorkingCalculations_ files keep every input column
+    columns = None if working_calcs else input_columns
+
+    output_files = [output_file] + ([working_calcs_path(input_file, output_folder)] if working_calcs else [])
+    if cache:
+        params = {"input_file": utils.remove_path(input_file), "discount_rate": discount_rate, "base_timestamp": base_timestamp,
+            "sample_iterations": sample_iterations, "seed": seed, "flag_mean_pivot": flag_mean_pivot,
+            "working_calcs": working_calcs, "sparse_iterations": sparse_iterations, "binary": binary}
+        with profiler.stage("cache_fetch", input_file):
+            cache_key = cache.key("discount_by_structure", params, [from_warehouse or input_file], cache_sources)
+            if cache.fetch(cache_key, output_files):
+                print(f"Saved data to {output_file} (cached)")
+                return
+
+    with profiler.stage("read_csv", input_file) as record:
+        if sample_iterations and not from_warehouse:
+            data, sampled, no_iters = iteration_index.read_sample(input_file, sample_iterations, seed, columns, ['Time'], sqlite_table)
+        else:
+            data = read_asset_damage_detail(input_file, from_warehouse, columns)
+            if sample_iterations:
+                no_iters = int(data['Iteration'].max())
+                sampled = utils.sample_iterations(range(1, no_iters+1), sample_iterations, seed)
+                data = data[data['Iteration'].isin(sampled)].reset_index(drop=True)
+        record["rows"] = len(data)
+
+    with profiler.stage("discount", input_file) as record:
+        data = discount_damages(data, discount_rate, base_timestamp)
+        record["rows"] = len(data)
+
+    # Output intermediate calculations
+    if working_calcs:
+        with profiler.stage("write_working_calcs", input_file) as record:
+            data.to_csv(working_calcs_path(input_file, output_folder), index=False)
+            record["rows"] = len(data)
+
+    with profiler.stage("pivot", input_file) as record:
+        if sample_iterations:
+            pv_data = sampled_pv_by_asset(data, sampled, no_iters)
+            mean, se = sampled_total(data, sampled, no_iters)
+            print(f"Estimated mean TotalLossPV from {len(sampled)} of {no_iters} iterations: "
+                f"{mean:,.2f} (SE {se:,.2f}, 95% CI {mean - utils.confidence_z*se:,.2f} to {mean + utils.confidence_z*se:,.2f})")
+        elif sparse_iterations:
+            pv_data = sparse_pv_by_iteration(data)
+        else:
+            pv_data = pv_by_asset(data)
+        record["rows"] = len(data)
 
-    pv_data.to_csv(output_file)
+    with profiler.stage("write", input_file) as record:
+        if sparse_iterations:
+            write_sparse(pv_data, output_file, binary)
+        else:
+            pv_data.to_csv(output_file)
+        record["rows"] = len(pv_data)
+    if cache:
+        with profiler.stage("cache_store", input_file):
+            cache.store(cache_key, output_files, "discount_by_structure")
     print(f"Saved data to {output_file}")
 
 
 if __name__ == "__main__":
     args, random = get_parser().parse_known_args()
-    main(args.input_file, args.output_file, args.discount_rate, args.base_timestamp)
\ No newline at end of file
+    profiler = instrumentation.Profiler(args.profile)
+    main(args.input_file, args.output_file, args.discount_rate, args.base_timestamp, profiler, args.from_warehouse,
+        args.sample_iterations, args.seed, result_cache.from_args(args), args.sparse_iterations, args.binary,
+        False if args.skip_working_calcs else None)
+    profiler.write_report(args.output_file)
\ No newline at end of file
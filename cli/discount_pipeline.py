@@ -0,0 +1,142 @@
+"""
+v1.1
+
+In-memory version of the standard workflow
+
+    copy_files_to_folder -> multiple_discount_by_structure -> aggregate_ma_from_csv
+
+Each AssetDamageDetail file is read once, discounted, aggregated by asset and
+tagged with ModelArea/SLC/Alternative. The DataFrames are passed between the
+steps and concatenated into a single output file, the same table that
+aggregate_ma_from_csv produces from DiscountedDamages_ files. Intermediate
+files are only written when requested:
+
+    --copy_folder        copy the raw files (same as copy_files_to_folder)
+    --discounted_folder  write DiscountedDamages_ files
+    --working_calcs      also write WorkingCalculations_ files to discounted_folder
+
+python discount_pipeline.py --help
+python discount_pipeline.py --input_folder "C:/Runs" --output_file "C:/Aggregated.csv"
+    --discount_rate 2.5 --base_timestamp 20300101 --contains FWOP
+
+Changelog:
+
+19OCT2026 v1.0
+19OCT2026 v1.1 - Files are selected like copy_files_to_folder - a name found in several run
+folders is discounted once and combined/aggregated files are skipped
+"""
+import argparse
+import os
+from typing import Iterator, List, Tuple
+import pandas as pd
+import utils
+import instrumentation
+import copy_files_to_folder
+import discount_by_structure
+import multiple_discount_by_structure
+import aggregate_ma_from_csv
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description="Discount and aggregate AssetDamageDetail files in memory")
+    parser.add_argument(
+        '-i',
+        '--input_folder',
+        help='Path to input folder containing AssetDamageDetail files')
+    parser.add_argument(
+        '-o',
+        '--output_file',
+        help='Path to aggregated output file')
+    parser.add_argument(
+        '-r',
+        '--discount_rate',
+        type=float,
+        help='Discount rate in percentage')
+    parser.add_argument(
+        '-b',
+        '--base_timestamp',
+        help='Base timestamp using format YYYYMMDD')
+    parser.add_argument(
+        '-c',
+        '--contains',
+        nargs='+',
+        default=[],
+        help='Unique str identifier e.g. FWOP, S1, Intermediate, etc.')
+    parser.add_argument(
+        '--copy_folder',
+        help='Optional - also copy the AssetDamageDetail files to this folder')
+    parser.add_argument(
+        '--discounted_folder',
+        help='Optional - also write DiscountedDamages_ files to this folder')
+    parser.add_argument(
+        '--working_calcs',
+        action='store_true',
+        help='Also write WorkingCalculations_ files to discounted_folder')
+    instrumentation.add_profile_argument(parser)
+    return parser
+
+
+def discounted_frames(files: List[str], discount_rate: float, base_timestamp: str, discounted_folder: str = None,
+    working_calcs: bool = False, profiler: instrumentation.Profiler = None) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """
+    Yield (DiscountedDamages_ file name, mean PV damages by asset) for each
+    AssetDamageDetail file. Only one input file is held in memory at a time
+    """
+    profiler = profiler or instrumentation.Profiler()
+    for i, file in enumerate(files):
+        print(f"{str(i+1).zfill(2)}/{len(files)} - Discounting {utils.remove_path(file)}")
+        output_name = multiple_discount_by_structure.discounted_file_name(file)
+
+        with profiler.stage("read_csv", file) as record:
+            columns = None if discounted_folder and working_calcs else discount_by_structure.input_columns
+            data = discount_by_structure.read_asset_damage_detail(file, columns=columns)
+            record["rows"] = len(data)
+        with profiler.stage("discount", file) as record:
+            data = discount_by_structure.discount_damages(data, discount_rate, base_timestamp)
+            record["rows"] = len(data)
+        if discounted_folder and working_calcs:
+            with profiler.stage("write_working_calcs", file):
+                data.to_csv(discount_by_structure.working_calcs_path(file, discounted_folder), index=False)
+        with profiler.stage("pivot", file) as record:
+            pv_data = discount_by_structure.pv_by_asset(data, mean_pivot=True)
+            record["rows"] = len(data)
+        if discounted_folder:
+            with profiler.stage("write_discounted", file):
+                pv_data.to_csv(os.path.join(discounted_folder, output_name))
+        yield output_name, pv_data
+
+
+def main(input_folder: str, output_file: str, discount_rate: float, base_timestamp: str, contains: List[str] = None,
+    copy_folder: str = None, discounted_folder: str = None, working_calcs: bool = False,
+    profiler: instrumentation.Profiler = None):
+
+    profiler = profiler or instrumentation.Profiler()
+    contains = contains or []
+    filters = ["AssetDamageDetail"] + list(contains)
+
+    if copy_folder:
+        copy_files_to_folder.main(input_folder, copy_folder, "csv", filters, profiler=profiler)
+
+    with profiler.stage("discover") as record:
+        # same files as copy_files_to_folder would copy - one per name, no combined/aggregated files
+        files = copy_files_to_folder.select_sources(utils.full_paths_by_type(input_folder, "csv", filters))
+        record["rows"] = len(files)
+
+    # tag each per-asset table like aggregate_ma_from_csv does for DiscountedDamages_ files
+    tagged = []
+    for output_name, pv_data in discounted_frames(files, discount_rate, base_timestamp, discounted_folder, working_calcs, profiler):
+        tagged.append(aggregate_ma_from_csv.tag_data(pv_data.reset_index(), output_name))
+
+    with profiler.stage("write") as record:
+        data = pd.concat(tagged, ignore_index=True) if tagged else pd.DataFrame()
+        data.to_csv(output_file, index=False)
+        record["rows"] = len(data)
+    print(f"Saved aggregated data to {output_file}")
+
+
+if __name__ == "__main__":
+    args, random = get_parser().parse_known_args()
+    profiler = instrumentation.Profiler(args.profile)
+    main(args.input_folder, args.output_file, args.discount_rate, args.base_timestamp, args.contains,
+        args.copy_folder, args.discounted_folder, args.working_calcs, profiler)
+    profiler.write_report(args.output_file)
@@ -0,0 +1,3 @@
+@echo off
+rem G2CRM post processing entry point - forwards all arguments to g2crm_post.py
+python "%~dp0g2crm_post.py" %*
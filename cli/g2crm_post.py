@@ -0,0 +1,116 @@
+"""
+v1.0
+
+Single entry point for the G2CRM post processing tools. Each subcommand runs
+an existing tool exactly as if it was started on its own, with the remaining
+arguments. Tool modules (and pandas, numpy, matplotlib) are only imported
+when their subcommand runs, so quick subcommands like 'list' start fast.
+
+python g2crm_post.py --help
+python g2crm_post.py <subcommand> --help
+python g2crm_post.py summarize --input_folder "C:/Runs" --output_file "C:/summary.csv"
+python g2crm_post.py list --input_folder "C:/Runs" --extension csv --contains AssetDamageDetail FWOP
+
+g2crm-post.bat in this folder forwards to this script.
+
+Changelog:
+
+19OCT2026 v1.0
+"""
+import argparse
+import os
+import runpy
+import sys
+
+# subcommand -> (module in this folder or script path relative to it, description)
+subcommands = {
+    "summarize": ("summarize_runs", "Summarize statistics of completed runs"),
+    "watch": ("watch_runs", "Post process runs as they finish"),
+    "copy": ("copy_files_to_folder", "Copy files from master/subfolders based on type and name"),
+    "discount": ("discount_by_structure", "Discount damages of one AssetDamageDetail file"),
+    "multiple-discount": ("multiple_discount_by_structure", "Discount all AssetDamageDetail files in a folder"),
+    "benefits": ("calculate_benefits", "Structure level benefits from DiscountedDamages files"),
+    "aggregate": ("aggregate_ma_from_csv", "Concatenate csv files with the same format"),
+    "cumulative-damage": ("calculate_cumulative_damage_by_storm_stage", "Cumulative damage by storm stage"),
+    "pipeline": ("discount_pipeline", "Copy, discount and aggregate in memory"),
+    "merge-shards": ("sharding", "Merge outputs of --shard i/N runs"),
+    "warehouse": ("warehouse", "Ingest outputs into an indexed SQLite warehouse"),
+    "storm-damages": ("storm_damage_join", "Join per-storm damages to storm stages by model area"),
+    "annualized-damages": ("annualized_damages", "Damage by year and EAD from IterationYear files"),
+    "damage-grid": ("spatial_damage_grid", "Grid binned damage maps from structure coordinates"),
+    "life-loss": ("life_loss_aggregation", "Life loss by model area, iteration and storm"),
+    "top-assets": ("top_damaged_assets", "Top-K damaged structures by model area and alternative"),
+    "convergence": ("convergence_diagnostics", "Monte Carlo convergence diagnostics by iteration count"),
+    "iteration-index": ("iteration_index", "Index iteration byte offsets of csv files, extract iterations"),
+    "cache": ("result_cache", "List, trim or clear the result cache"),
+    "generate": ("generate_synthetic_outputs", "Generate synthetic G2CRM outputs"),
+    "benchmark": ("benchmark_tools", "Benchmark the tools on synthetic outputs"),
+    "stage-frequency": (os.path.join("..", "Stg_Freq_Code_TMS_08232021.py"), "Stage frequency curves (edit file path in script)"),
+}
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        description="G2CRM post processing tools",
+        epilog="\n".join([f"  {name:<20} {description}" for name, (module, description) in subcommands.items()] +
+            [f"  {'list':<20} List files by extension and name"]),
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        'subcommand',
+        choices=list(subcommands) + ['list'],
+        metavar='subcommand',
+        help='Tool to run - see list below')
+    return parser
+
+
+def get_list_parser():
+    parser = argparse.ArgumentParser(prog="g2crm_post.py list", description="List files by extension and name")
+    parser.add_argument(
+        '-i',
+        '--input_folder',
+        help='Path to input folder')
+    parser.add_argument(
+        '-x',
+        '--extension',
+        default='csv',
+        help='File extension e.g. csv, sqlite, prn')
+    parser.add_argument(
+        '-c',
+        '--contains',
+        nargs='+',
+        default=['.'],
+        help='Unique str identifier e.g. FWOP, S1, Intermediate, etc.')
+    return parser
+
+
+def list_files(input_folder: str, extension: str, contains: list):
+    """Print matching files - only needs utils, no pandas"""
+    import utils
+    files = utils.full_paths_by_type(input_folder, extension, contains)
+    for file in files:
+        print(file)
+    print(f"{len(files)} files")
+
+
+def main(argv: list):
+    args = get_parser().parse_args(argv[:1])
+    tool_args = argv[1:]
+
+    if args.subcommand == "list":
+        list_args = get_list_parser().parse_args(tool_args)
+        list_files(list_args.input_folder, list_args.extension, list_args.contains)
+        return
+
+    target, description = subcommands[args.subcommand]
+    here = os.path.dirname(os.path.abspath(__file__))
+    sys.argv = [f"g2crm_post.py {args.subcommand}"] + tool_args
+    if target.endswith(".py"):
+        runpy.run_path(os.path.join(here, target), run_name="__main__")
+    else:
+        if here not in sys.path:
+            sys.path.insert(0, here)
+        runpy.run_module(target, run_name="__main__", alter_sys=True)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or ["--help"])
@@ -0,0 +1,315 @@
+"""
+v1.0
+
+Generate fake but realistic G2CRM outputs to develop, test and benchmark the
+cli tools without real study data. One run folder is created per
+SLC/alternative/MA combination containing:
+
+    <run name>.prn                              summary read by summarize_runs
+    AssetDamageDetail_<SLC>_<MA>_<ALT>.csv      damages per asset and storm
+    AssetRaising_<SLC>_<MA>_<ALT>.csv           raised assets
+    RemovedAssets_<SLC>_<MA>_<ALT>.csv          removed assets
+    ModeledAreaStormDetail_<SLC>_<MA>_<ALT>.csv stage per storm (Stg_Freq script)
+    IterationYear_<SLC>_<MA>_<ALT>.csv          damages per iteration and year
+    AssetLifeLoss_<SLC>_<MA>_<ALT>.csv          life loss per asset and storm
+    MapOutputs_<SLC>_<MA>_<ALT>.sqlite          AssetsAllStatistics table
+
+File names follow the conventions used by utils.derive_prefix, derive_slc,
+derive_ma_code and derive_alt. Rows are written sorted by Iteration and Time
+like G2CRM does. Output is deterministic for a given seed.
+
+python generate_synthetic_outputs.py --help
+python generate_synthetic_outputs.py --output_folder "C:/synthetic" --size small
+
+Changelog:
+
+19OCT2026 v1.0
+"""
+import argparse
+import os
+import sqlite3
+import numpy as np
+import pandas as pd
+
+# size presets - rows of AssetDamageDetail per run are roughly
+# iterations * storms_per_year * duration * assets * damaged_fraction
+sizes = {
+    "tiny": {"mas": 1, "alternatives": ["FWOP"], "slcs": ["Intermediate"], "iterations": 10, "assets": 50},
+    "small": {"mas": 2, "alternatives": ["FWOP", "S1"], "slcs": ["Intermediate"], "iterations": 50, "assets": 500},
+    "medium": {"mas": 4, "alternatives": ["FWOP", "S1", "S2"], "slcs": ["Low", "Intermediate", "High"], "iterations": 200, "assets": 2000},
+    "large": {"mas": 8, "alternatives": ["FWOP", "S1", "S2", "S3"], "slcs": ["Low", "Intermediate", "High"], "iterations": 1000, "assets": 10000},
+}
+
+duration = 50 # years per iteration
+storms_per_year = .6
+damaged_fraction = .05 # fraction of assets damaged by an average storm
+start_year = 2030
+interest_rate = 2.5
+
+asset_damage_detail_columns = [
+    "Iteration", "StormID", "Time", "AssetID", "AssetExternalReference", "MaxStormStage",
+    "ValueLossStructure", "ValueLossContents", "TotalLoss", "DiscountFactor",
+    "ValueLossStructurePV", "ValueLossContentsPV", "TotalLossPV"]
+
+# Stg_Freq_Code reads columns 0, 3, 16, 17 (Iteration, days, surge, tide)
+modeled_area_storm_detail_columns = [
+    "Iteration", "Season", "StormID", "DaysFromStartOfIteration", "Time", "ModeledAreaID", "ModeledAreaName",
+    "StormProbability", "PeakWaveHeight", "PeakWavePeriod", "StageInteriorStart", "MaxStageInterior",
+    "MaxStageExterior", "VolumeInflow", "VolumeOverflow", "VolumeRainfall", "StormSurge", "Tide", "TotalDamage"]
+
+asset_event_columns = ["Iteration", "Time", "AssetID", "AssetExternalReference"]
+
+asset_life_loss_columns = [
+    "Iteration", "StormID", "Time", "AssetID", "AssetExternalReference",
+    "LifeLossUnder65", "LifeLossOver65", "TotalLifeLoss"]
+
+iteration_year_columns = [
+    "Iteration", "Year", "NumberOfStorms", "ValueLossStructure", "ValueLossContents", "TotalLoss", "TotalLossPV"]
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description="Generate synthetic G2CRM outputs")
+    parser.add_argument(
+        '-o',
+        '--output_folder',
+        help='Path to output folder')
+    parser.add_argument(
+        '-s',
+        '--size',
+        default='small',
+        choices=list(sizes),
+        help='Size preset')
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=1,
+        help='Random seed')
+    return parser
+
+
+def make_assets(rng: np.random.Generator, no_assets: int, ma: str) -> pd.DataFrame:
+    """Structures with values and a first floor elevation. ~5% are autos (dash in reference)"""
+    asset_ids = np.arange(1, no_assets+1)
+    refs = np.array([f"{ma}-AUTO{x:06d}" if x % 20 == 0 else f"{ma}STR{x:06d}" for x in asset_ids])
+    structure_value = np.round(rng.lognormal(12, .6, no_assets), 2)
+    return pd.DataFrame({
+        "AssetID": asset_ids,
+        "AssetExternalReference": refs,
+        "StructureValue": structure_value,
+        "ContentsValue": np.round(structure_value * rng.uniform(.3, .7, no_assets), 2),
+        "FirstFloorElevation": np.round(rng.uniform(3, 12, no_assets), 2)})
+
+
+def make_storms(rng: np.random.Generator, iterations: int, ma_id: int) -> pd.DataFrame:
+    """Storms for every iteration sorted by Iteration and day"""
+    storm_counts = rng.poisson(storms_per_year * duration, iterations)
+    no_storms = storm_counts.sum()
+    days = rng.uniform(0, duration*365, no_storms)
+    iteration = np.repeat(np.arange(1, iterations+1), storm_counts)
+    order = np.lexsort((days, iteration))
+    days, iteration = days[order], iteration[order]
+    surge = np.round(rng.gumbel(2, 1.2, no_storms).clip(0), 3)
+    tide = np.round(rng.normal(1, .5, no_storms), 3)
+    time = pd.Timestamp(f"{start_year}0101") + pd.to_timedelta(days, unit="D")
+    storms = pd.DataFrame({
+        "Iteration": iteration,
+        "Season": np.where(pd.DatetimeIndex(time).month.isin([6, 7, 8, 9, 10, 11]), "Tropical", "ExtraTropical"),
+        "StormID": rng.integers(1, 1000, no_storms),
+        "DaysFromStartOfIteration": np.round(days, 4),
+        "Time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "ModeledAreaID": ma_id,
+        "ModeledAreaName": f"MA{ma_id:02d}",
+        "StormProbability": np.round(rng.uniform(0, .1, no_storms), 5),
+        "PeakWaveHeight": np.round(rng.gamma(2, 1, no_storms), 3),
+        "PeakWavePeriod": np.round(rng.uniform(4, 14, no_storms), 3),
+        "StageInteriorStart": 0.0,
+        "MaxStageInterior": np.round(surge + tide, 3),
+        "MaxStageExterior": np.round(surge + tide + rng.uniform(0, .5, no_storms), 3),
+        "VolumeInflow": np.round(rng.gamma(2, 1e5, no_storms), 1),
+        "VolumeOverflow": np.round(rng.gamma(1, 1e4, no_storms), 1),
+        "VolumeRainfall": np.round(rng.gamma(1, 1e3, no_storms), 1),
+        "StormSurge": surge,
+        "Tide": tide})
+    return storms
+
+
+def make_damages(rng: np.random.Generator, assets: pd.DataFrame, storms: pd.DataFrame) -> pd.DataFrame:
+    """Damages for the assets flooded by each storm - more assets are damaged at higher stages"""
+    no_assets = len(assets)
+    stage = storms["MaxStageInterior"].values
+    # expected number of damaged assets scales with the storm stage
+    damaged_counts = rng.binomial(no_assets, np.clip(damaged_fraction * stage / 3, 0, 1))
+    storm_index = np.repeat(np.arange(len(storms)), damaged_counts)
+    asset_index = rng.integers(0, no_assets, damaged_counts.sum())
+
+    depth = np.clip(stage[storm_index] - assets["FirstFloorElevation"].values[asset_index] / 3, .1, None)
+    damage_ratio = np.clip(depth / 10 * rng.uniform(.5, 1.5, len(depth)), 0, 1)
+    loss_structure = np.round(damage_ratio * assets["StructureValue"].values[asset_index], 2)
+    loss_contents = np.round(damage_ratio * assets["ContentsValue"].values[asset_index], 2)
+    time = pd.to_datetime(storms["Time"].values[storm_index])
+    discount_factor = 1/(1+interest_rate/100)**((time - pd.Timestamp(f"{start_year}0101")).days.values/365)
+
+    damages = pd.DataFrame({
+        "Iteration": storms["Iteration"].values[storm_index],
+        "StormID": storms["StormID"].values[storm_index],
+        "Time": storms["Time"].values[storm_index],
+        "AssetID": assets["AssetID"].values[asset_index],
+        "AssetExternalReference": assets["AssetExternalReference"].values[asset_index],
+        "MaxStormStage": stage[storm_index],
+        "ValueLossStructure": loss_structure,
+        "ValueLossContents": loss_contents,
+        "TotalLoss": np.round(loss_structure + loss_contents, 2),
+        "DiscountFactor": np.round(discount_factor, 6)})
+    for col in ["ValueLossStructure", "ValueLossContents", "TotalLoss"]:
+        damages[col+"PV"] = np.round(damages[col] * damages["DiscountFactor"], 2)
+    return damages[asset_damage_detail_columns]
+
+
+def make_iteration_years(storms: pd.DataFrame, damages: pd.DataFrame, iterations: int) -> pd.DataFrame:
+    """Storms and damages summed by iteration and year - every year of every iteration has a row"""
+    def year_of(time):
+        return start_year + (pd.DatetimeIndex(time.values) - pd.Timestamp(f"{start_year}0101")).days.values // 365
+
+    index = pd.MultiIndex.from_product([np.arange(1, iterations+1), np.arange(start_year, start_year+duration)],
+        names=["Iteration", "Year"])
+    data = damages.groupby([damages["Iteration"].values, year_of(damages["Time"])])[
+        ["ValueLossStructure", "ValueLossContents", "TotalLoss", "TotalLossPV"]].sum()
+    data.index.names = ["Iteration", "Year"]
+    data = data.reindex(index, fill_value=0).round(2)
+    data["NumberOfStorms"] = storms.groupby([storms["Iteration"].values, year_of(storms["Time"])]).size().reindex(index, fill_value=0).values
+    return data.reset_index()[iteration_year_columns]
+
+
+def make_life_loss(rng: np.random.Generator, damages: pd.DataFrame, life_loss: np.ndarray) -> pd.DataFrame:
+    """Spread the life loss of each iteration over its damaged assets - iterations without damages have none"""
+    row_iterations = damages["Iteration"].values
+    starts = np.searchsorted(row_iterations, np.arange(1, len(life_loss)+1))
+    ends = np.searchsorted(row_iterations, np.arange(1, len(life_loss)+1), side="right")
+    counts = np.where(ends > starts, life_loss.astype(np.int64), 0)
+    # damages are sorted by Iteration - pick a damaged row of the iteration for each life lost
+    rows = np.repeat(starts, counts) + (rng.random(counts.sum()) * np.repeat(ends - starts, counts)).astype(np.int64)
+    rows, lives = np.unique(rows, return_counts=True)
+    under_65 = rng.binomial(lives, .6)
+    data = damages.iloc[rows][["Iteration", "StormID", "Time", "AssetID", "AssetExternalReference"]].reset_index(drop=True)
+    data["LifeLossUnder65"] = under_65
+    data["LifeLossOver65"] = lives - under_65
+    data["TotalLifeLoss"] = lives
+    return data[asset_life_loss_columns]
+
+
+def make_asset_events(rng: np.random.Generator, assets: pd.DataFrame, iterations: int, rate: float) -> pd.DataFrame:
+    """AssetRaising / RemovedAssets style rows - rate is the expected count per iteration"""
+    counts = rng.poisson(rate, iterations)
+    asset_index = rng.integers(0, len(assets), counts.sum())
+    days = rng.uniform(0, duration*365, counts.sum())
+    iteration = np.repeat(np.arange(1, iterations+1), counts)
+    order = np.lexsort((days, iteration))
+    return pd.DataFrame({
+        "Iteration": iteration[order],
+        "Time": (pd.Timestamp(f"{start_year}0101") + pd.to_timedelta(days[order], unit="D")).strftime("%Y-%m-%d %H:%M:%S"),
+        "AssetID": assets["AssetID"].values[asset_index[order]],
+        "AssetExternalReference": assets["AssetExternalReference"].values[asset_index[order]]})[asset_event_columns]
+
+
+def prn_text(run_name: str, slc: str, alt: str, iterations: int, seed: int, no_assets: int, no_storms: int,
+    pv_damage: np.ndarray, life_loss: np.ndarray) -> str:
+    """G2CRM prn summary in the layout parse_prn expects"""
+    def stat_line(label, values):
+        return f"{label:<20}  {'Mean':>6}  {values.mean():>16,.2f}  {values.min():>16,.2f}  {values.max():>16,.2f}  {values.std():>16,.2f}"
+    lines = [
+        f"G2CRM Run on 10/19/2026 8:00:00 AM Model Version: 0.4.564.3",
+        f"Simulation Name: {run_name}",
+        "",
+        f"Plan Alternative: {alt}",
+        f"Sea Level Change: {slc}",
+        f"RunConditions: Synthetic",
+        f"Number of Iterations: {iterations}",
+        f"Seed: {seed}",
+        f"Interest Rate: {interest_rate}",
+        f"Duration: {duration}",
+        f"Basis Time: {start_year}-01-01",
+        f"Start Time: {start_year}-01-01",
+        f"GlobalSLCBasisYear: 1992",
+        f"Do Cumulative Damage Removal: True",
+        f"Do Depreciation: False",
+        f"Do Asset Raising: True",
+        f"Calculate Life Loss: True",
+        "",
+        "Assets:",
+        f"Number of Assets: {no_assets}",
+        "",
+        f"Number of Distinct Storms: {no_storms}",
+        "",
+        f"{'Result':<20}  {'Stat':>6}  {'Mean':>16}  {'Min':>16}  {'Max':>16}  {'StdDev':>16}",
+        stat_line("Total Life Loss", life_loss),
+        stat_line("Upland PV Damage", pv_damage),
+        "",
+        f"Computation Time: {iterations * 1.7:,.1f} sec",
+        "",
+        "",
+        ""]
+    return "\n".join(lines)
+
+
+def generate_run(run_folder: str, ma_id: int, slc: str, alt: str, iterations: int, no_assets: int, seed: int):
+    """Write all outputs of one G2CRM run to run_folder"""
+    os.makedirs(run_folder, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    ma = f"MA{ma_id:02d}"
+    suffix = f"{slc}_{ma}_{alt}"
+    # with project alternatives damage less
+    alt_factor = 1.0 if alt == "FWOP" else .6
+
+    assets = make_assets(np.random.default_rng(ma_id), no_assets, ma) # same structures for every run of a MA
+    storms = make_storms(rng, iterations, ma_id)
+    damages = make_damages(rng, assets, storms)
+    damages = damages.iloc[rng.random(len(damages)) < alt_factor] if alt_factor < 1 else damages
+
+    damages.to_csv(os.path.join(run_folder, f"AssetDamageDetail_{suffix}.csv"), index=False)
+    storm_damages = damages.groupby(["Iteration", "Time"])["TotalLoss"].sum()
+    storms["TotalDamage"] = storm_damages.reindex(pd.MultiIndex.from_frame(storms[["Iteration", "Time"]])).fillna(0).values
+    storms[modeled_area_storm_detail_columns].to_csv(os.path.join(run_folder, f"ModeledAreaStormDetail_{suffix}.csv"), index=False)
+    make_iteration_years(storms, damages, iterations).to_csv(os.path.join(run_folder, f"IterationYear_{suffix}.csv"), index=False)
+    make_asset_events(rng, assets, iterations, no_assets * .002).to_csv(
+        os.path.join(run_folder, f"AssetRaising_{suffix}.csv"), index=False)
+    make_asset_events(rng, assets, iterations, no_assets * .001).to_csv(
+        os.path.join(run_folder, f"RemovedAssets_{suffix}.csv"), index=False)
+
+    # MapOutputs - mean PV damage per asset
+    mean_pv = np.bincount(damages["AssetID"].values, damages["TotalLossPV"].values, no_assets+1)[1:] / iterations
+    statistics = assets[["AssetID", "AssetExternalReference", "StructureValue", "ContentsValue"]].rename(columns={"AssetID": "assetID"})
+    statistics["statisticsTypeName"] = "PVDamage"
+    statistics["MeanValue"] = np.round(mean_pv, 2)
+    mapoutputs_path = os.path.join(run_folder, f"MapOutputs_{suffix}.sqlite")
+    if os.path.exists(mapoutputs_path):
+        os.remove(mapoutputs_path)
+    conn = sqlite3.connect(mapoutputs_path)
+    statistics.to_sql("AssetsAllStatistics", conn, index=False)
+    conn.close()
+
+    pv_damage = np.bincount(damages["Iteration"].values, damages["TotalLossPV"].values, iterations+1)[1:]
+    life_loss = rng.poisson(.05 * storms_per_year * duration, iterations).astype(float)
+    asset_life_loss = make_life_loss(rng, damages, life_loss)
+    asset_life_loss.to_csv(os.path.join(run_folder, f"AssetLifeLoss_{suffix}.csv"), index=False)
+    life_loss = np.bincount(asset_life_loss["Iteration"].values, asset_life_loss["TotalLifeLoss"].values, iterations+1)[1:]
+    with open(os.path.join(run_folder, f"G2CRM_{suffix}.prn"), "w") as f:
+        f.write(prn_text(f"Synthetic_{suffix}", slc, alt, iterations, seed, no_assets, storms["StormID"].nunique(), pv_damage, life_loss))
+
+
+def main(output_folder: str, size: str = "small", seed: int = 1):
+    """Generate a study folder - output_folder/<SLC>/<ALT>/<MA>/ per run"""
+    params = sizes[size]
+    run_no = 0
+    for slc in params["slcs"]:
+        for alt in params["alternatives"]:
+            for ma_id in range(1, params["mas"]+1):
+                run_no += 1
+                run_folder = os.path.join(output_folder, slc, alt, f"MA{ma_id:02d}")
+                print(f"{str(run_no).zfill(2)} - Generating {run_folder}")
+                generate_run(run_folder, ma_id, slc, alt, params["iterations"], params["assets"], seed * 10000 + run_no)
+    print(f"Saved synthetic outputs to {output_folder}")
+
+
+if __name__ == "__main__":
+    args, random = get_parser().parse_known_args()
+    main(args.output_folder, args.size, args.seed)
@@ -0,0 +1,122 @@
+"""
+v1.2
+
+Per-stage timing and memory instrumentation for the cli tools.
+
+Each tool accepts --profile. When enabled, named stages record wall time,
+rows processed (rows/sec) and the tracemalloc peak of the stage (nested stages
+included), optionally tagged with the input file. process_peak_rss_mb is the
+peak RSS of the whole process up to the end of the stage, not of the stage. The report is saved as json and csv
+next to the tool output.
+
+Usage:
+    profiler = instrumentation.Profiler(enabled=True)
+    with profiler.stage("read_csv", file=input_file) as record:
+        data = pd.read_csv(input_file)
+        record["rows"] = len(data)
+    profiler.write_report("C:/Path to output file.csv")
+
+Changelog:
+
+19OCT2026 v1.0
+19OCT2026 v1.1 - peak_rss_mb is the peak RSS on every platform, not the current RSS outside Windows
+19OCT2026 v1.2 - Nested stages no longer reset the peak_traced_mb of the outer stage,
+peak_rss_mb renamed to process_peak_rss_mb as it is the peak of the process so far
+"""
+import contextlib
+import csv
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+try:
+    import psutil # optional - used for RSS on all platforms
+except ImportError:
+    psutil = None
+
+try:
+    import resource # unix only
+except ImportError:
+    resource = None
+
+
+report_columns = ["stage", "file", "wall_time_s", "rows", "rows_per_s", "peak_traced_mb", "process_peak_rss_mb"]
+
+
+def add_profile_argument(parser):
+    """Add the shared --profile flag to a tool's argparse parser"""
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Record time, rows/sec and peak memory per stage and save a *_profile.json/csv report')
+    return parser
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in mb, None if unavailable"""
+    # psutil only reports the peak (peak_wset) on Windows, resource has it elsewhere
+    if psutil is not None and hasattr(psutil.Process().memory_info(), "peak_wset"):
+        return psutil.Process().memory_info().peak_wset / 1e6
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on linux, bytes on macOS
+        return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+    return None
+
+
+class Profiler:
+    """Collects stage records. A disabled profiler costs (almost) nothing."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.records = []
+        # tracemalloc peak of each open stage saved before its nested stages reset it
+        self.open_peaks = []
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextlib.contextmanager
+    def stage(self, name: str, file: str = None):
+        """
+        Time a named stage. Yields a dict - set record["rows"] to the number of
+        rows processed to get rows/sec in the report
+        """
+        record = {"stage": name, "file": file, "rows": None}
+        if not self.enabled:
+            yield record
+            return
+        if self.open_peaks:
+            self.open_peaks[-1] = max(self.open_peaks[-1], tracemalloc.get_traced_memory()[1])
+        self.open_peaks.append(0)
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            wall_time = time.perf_counter() - start
+            record["wall_time_s"] = wall_time
+            record["rows_per_s"] = record["rows"] / wall_time if record["rows"] and wall_time > 0 else None
+            peak = max(self.open_peaks.pop(), tracemalloc.get_traced_memory()[1])
+            if self.open_peaks:
+                self.open_peaks[-1] = max(self.open_peaks[-1], peak)
+            record["peak_traced_mb"] = peak / 1e6
+            record["process_peak_rss_mb"] = peak_rss_mb()
+            self.records.append(record)
+
+    def write_report(self, output_path: str):
+        """
+        Save records to <output_path without extension>_profile.json and .csv.
+        Does nothing when disabled.
+        """
+        if not self.enabled:
+            return
+        report_path = os.path.splitext(output_path)[0] + "_profile"
+        with open(report_path + ".json", "w") as f:
+            json.dump(self.records, f, indent=2)
+        with open(report_path + ".csv", "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=report_columns)
+            writer.writeheader()
+            writer.writerows(self.records)
+        print(f"Saved profile report to {report_path}.json")
@@ -0,0 +1,222 @@
+"""
+v1.0
+
+Byte-offset index of the Iteration blocks of large G2CRM csv outputs
+(AssetDamageDetail, ModeledAreaStormDetail, ...) for random access.
+
+G2CRM writes the rows of each iteration contiguously. build_index scans a file
+once, checks that every iteration is one contiguous block and saves the start
+and end byte offset of each block in a sidecar file next to it
+(<file>.iterindex.json). read_iterations memory-maps the csv and parses only
+the rows of the requested iterations. The sidecar is rebuilt automatically
+when the csv size or modification time changes.
+
+Only plain (uncompressed) csv files can be indexed. The Iteration value is
+located by splitting on commas, so columns before Iteration must not contain
+quoted commas.
+
+python iteration_index.py --help
+python iteration_index.py --input_file "C:/AssetDamageDetail_High_MA01_FWOP.csv"
+python iteration_index.py --input_file "C:/AssetDamageDetail_High_MA01_FWOP.csv"
+    --iterations 17 250 --output_file "C:/Iterations.csv"
+
+Usage:
+    data = iteration_index.read_iterations(input_file, [17, 250], parse_dates=["Time"])
+    data, sampled, no_iters = iteration_index.read_sample(input_file, 100, seed=0)
+
+Changelog:
+
+19OCT2026 v1.0
+Added read_sample for --sample_iterations quick-look runs
+"""
+import argparse
+import io
+import json
+import mmap
+import os
+from typing import Dict, Iterable, List, Tuple
+import pandas as pd
+import utils
+import sqlite_outputs
+
+index_suffix = ".iterindex.json"
+iteration_column = "Iteration"
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description="Build byte-offset iteration indexes and extract iterations from csv files")
+    parser.add_argument(
+        '-i',
+        '--input_file',
+        nargs='+',
+        help='Path to csv file(s) with an Iteration column')
+    parser.add_argument(
+        '-it',
+        '--iterations',
+        nargs='+',
+        type=int,
+        default=[],
+        help='Optional - iterations to extract from input_file')
+    parser.add_argument(
+        '-o',
+        '--output_file',
+        help='Path to output file for the extracted iterations')
+    parser.add_argument(
+        '--rebuild',
+        action='store_true',
+        help='Rebuild indexes even if they are up to date')
+    return parser
+
+
+def index_path(csv_path: str) -> str:
+    return csv_path + index_suffix
+
+
+def build_index(csv_path: str) -> dict:
+    """
+    Scan csv_path and return its index:
+    {"size", "mtime", "header_end", "blocks": {iteration: [start, end, rows]}}
+    Raises an Exception if the file is compressed, has no Iteration column or
+    an iteration is not written as one contiguous block.
+    """
+    if utils.derive_compression(csv_path):
+        raise Exception(f"Cannot index compressed file {csv_path} - decompress it first")
+    stat = os.stat(csv_path)
+    blocks = {}
+    with open(csv_path, "rb") as f:
+        header = f.readline()
+        columns = header.decode("utf-8-sig").strip().split(",")
+        if iteration_column not in columns:
+            raise Exception(f"No {iteration_column} column in {csv_path}")
+        position = columns.index(iteration_column)
+        offset = len(header)
+        current, start, rows = None, offset, 0
+        for line in f:
+            fields = line.split(b",", position + 1)
+            if len(fields) > position and line.strip():
+                iteration = int(fields[position].strip(b'" \r\n'))
+                if iteration != current:
+                    if current is not None:
+                        blocks[current] = [start, offset, rows]
+                    if iteration in blocks:
+                        raise Exception(f"Iteration {iteration} is not contiguous in {csv_path} (second block at byte {offset})")
+                    current, start, rows = iteration, offset, 0
+                rows += 1
+            offset += len(line)
+        if current is not None:
+            blocks[current] = [start, offset, rows]
+    return {"size": stat.st_size, "mtime": stat.st_mtime, "header_end": len(header), "blocks": blocks}
+
+
+def save_index(csv_path: str, index: dict):
+    """Write index through a temp file so it is never left half written"""
+    path = index_path(csv_path)
+    with open(path + ".part", "w") as f:
+        json.dump(index, f)
+    os.replace(path + ".part", path)
+
+
+def load_index(csv_path: str, rebuild: bool = False) -> dict:
+    """Index from the sidecar file, (re)built and saved if missing or stale"""
+    path = index_path(csv_path)
+    if not rebuild and os.path.exists(path):
+        with open(path) as f:
+            index = json.load(f)
+        stat = os.stat(csv_path)
+        if index.get("size") == stat.st_size and index.get("mtime") == stat.st_mtime:
+            index["blocks"] = {int(k): v for k, v in index["blocks"].items()}
+            return index
+    index = build_index(csv_path)
+    save_index(csv_path, index)
+    return index
+
+
+def iteration_ranges(index: dict, iterations: Iterable[int]) -> List[Tuple[int, int]]:
+    """Sorted byte ranges of the requested iterations, adjacent blocks merged"""
+    missing = [x for x in iterations if x not in index["blocks"]]
+    if missing:
+        raise Exception(f"Iterations not found in index: {missing[:10]}")
+    ranges = []
+    for start, end in sorted(tuple(index["blocks"][x][:2]) for x in set(iterations)):
+        if ranges and ranges[-1][1] == start:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((start, end))
+    return ranges
+
+
+def read_iterations(csv_path: str, iterations: Iterable[int], rebuild: bool = False, **read_csv_args) -> pd.DataFrame:
+    """
+    Rows of the requested iterations only, parsed with pd.read_csv(**read_csv_args)
+    e.g. read_iterations(file, [1, 2, 3], **utils.csv_read_args(file, ["Iteration", "TotalLossPV"]))
+    """
+    index = load_index(csv_path, rebuild)
+    ranges = iteration_ranges(index, iterations)
+    buffer = io.BytesIO()
+    with open(csv_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            buffer.write(mapped[:index["header_end"]])
+            for start, end in ranges:
+                buffer.write(mapped[start:end])
+    buffer.seek(0)
+    return pd.read_csv(buffer, **read_csv_args)
+
+
+def read_sample(path: str, sample_size: int, seed: int = 0, columns: List[str] = None, parse_dates: List[str] = None,
+    table: str = "AssetDamageDetail") -> Tuple[pd.DataFrame, List[int], int]:
+    """
+    Rows of sample_size iterations picked with utils.sample_iterations from
+    1..max(Iteration). Returns (data, sampled iterations, number of iterations).
+    Plain csv files are read through the iteration index, sqlite files (table)
+    with an Iteration filter and compressed csv files are read and filtered.
+    Sampled iterations without rows (e.g. no damages) are in the sample but not in data.
+    """
+    dtypes = {k: v for k, v in utils.schemas.get(table, {}).items() if v != "datetime"}
+    if utils.derive_extension(path) == "sqlite":
+        conn = sqlite_outputs.connect(path)
+        no_iters = conn.execute(f'SELECT MAX({iteration_column}) FROM "{table}"').fetchone()[0] or 0
+        conn.close()
+        sampled = utils.sample_iterations(range(1, no_iters+1), sample_size, seed)
+        where = f"{iteration_column} IN ({', '.join(str(int(x)) for x in sampled)})"
+        data = sqlite_outputs.read_table(path, table, columns, dtypes, parse_dates, where)
+        return data, sampled, no_iters
+
+    read_args = utils.csv_read_args(path, columns)
+    if parse_dates:
+        read_args["parse_dates"] = parse_dates
+    if utils.derive_compression(path):
+        with utils.open_data(path) as f:
+            data = pd.read_csv(f, low_memory=False, **read_args)
+        no_iters = int(data[iteration_column].max()) if len(data) else 0
+        sampled = utils.sample_iterations(range(1, no_iters+1), sample_size, seed)
+        return data[data[iteration_column].isin(sampled)].reset_index(drop=True), sampled, no_iters
+
+    blocks = load_index(path)["blocks"]
+    no_iters = max(blocks) if blocks else 0
+    sampled = utils.sample_iterations(range(1, no_iters+1), sample_size, seed)
+    data = read_iterations(path, [x for x in sampled if x in blocks], low_memory=False, **read_args)
+    return data, sampled, no_iters
+
+
+def iteration_rows(csv_path: str) -> Dict[int, int]:
+    """Iteration -> number of rows, from the index"""
+    return {k: v[2] for k, v in load_index(csv_path)["blocks"].items()}
+
+
+def main(input_files: List[str], iterations: List[int] = [], output_file: str = None, rebuild: bool = False):
+
+    for i, input_file in enumerate(input_files):
+        index = load_index(input_file, rebuild)
+        rows = sum(x[2] for x in index["blocks"].values())
+        print(f"{str(i+1).zfill(2)}/{len(input_files)} - {utils.remove_path(input_file)}: {len(index['blocks'])} iterations, {rows} rows")
+
+    if iterations:
+        if len(input_files) > 1: raise Exception("Extract iterations from one input file at a time")
+        data = read_iterations(input_files[0], iterations, **utils.csv_read_args(input_files[0]))
+        data.to_csv(output_file, index=False)
+        print(f"Saved {len(data)} rows of {len(set(iterations))} iterations to {output_file}")
+
+
+if __name__ == "__main__":
+    args, random = get_parser().parse_known_args()
+    main(args.input_file, args.iterations, args.output_file, args.rebuild)
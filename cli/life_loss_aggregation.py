@@ -0,0 +1,173 @@
+"""
+v1.1
+
+Life loss by model area, iteration and storm from AssetLifeLoss_ files in
+bounded memory. summarize_runs only reports the study wide Total Life Loss
+mean/std of the prn file.
+
+Each AssetLifeLoss file (one per SLC/model area/alternative, utils.derive_*)
+is streamed in chunks and its life loss columns are folded into one row per
+storm (storm_damage_join.storm_damages), so memory is bounded by the number
+of storms and not by the number of asset rows. Storm totals are summed by
+iteration; iterations without life loss have no rows and count as 0. The
+number of iterations is --iterations when given, else the 'Number of
+Iterations' of the finished prn file in the same run folder, else the last iteration
+in the file. Rows with ModelArea 'All' sum the iterations of all model areas
+of an SLC and alternative.
+
+Life loss columns are all columns of the file with 'LifeLoss' in their name
+unless --value_columns is given.
+
+Output:
+    output_file                 SLC, ModelArea, Alternative, Iterations, Storms
+                                and for each life loss column Mean, StdDev, Max,
+                                P<percentile>... over iterations
+    --details                   also <output_file>_by_iteration.csv and
+                                <output_file>_by_storm.csv
+
+python life_loss_aggregation.py --help
+python life_loss_aggregation.py --input_folder "C:/Runs" --output_file "C:/LifeLoss.csv"
+python life_loss_aggregation.py --input_folder "C:/Runs" --output_file "C:/LifeLoss.csv" --contains FWOP
+    --iterations 1000 --percentiles 50 90 99 --details
+
+Changelog:
+
+19OCT2026 v1.0
+19OCT2026 v1.1 - An unfinished prn no longer stops the tool, iterations then come from the file
+"""
+import argparse
+import os
+from typing import Dict, List, Tuple
+import numpy as np
+import pandas as pd
+import utils
+import instrumentation
+import storm_damage_join
+import summarize_runs
+
+storm_keys = ["Iteration", "StormID", "Time"]
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description="Life loss by model area, iteration and storm from AssetLifeLoss files")
+    parser.add_argument(
+        '-i',
+        '--input_folder',
+        help='Path to input folder containing AssetLifeLoss_ files')
+    parser.add_argument(
+        '-o',
+        '--output_file',
+        help='Path to output file')
+    parser.add_argument(
+        '-c',
+        '--contains',
+        nargs='+',
+        default=[],
+        help='Unique str identifier e.g. FWOP, Intermediate, MA01, etc.')
+    parser.add_argument(
+        '--value_columns',
+        nargs='+',
+        help='Life loss columns (default: all columns with LifeLoss in their name)')
+    parser.add_argument(
+        '-n',
+        '--iterations',
+        type=int,
+        help='Number of iterations of the runs (default: from the prn file of each run folder)')
+    parser.add_argument(
+        '-p',
+        '--percentiles',
+        nargs='+',
+        type=float,
+        default=[5, 50, 95],
+        help='Percentiles over iterations')
+    parser.add_argument(
+        '--details',
+        action='store_true',
+        help='Also save life loss by iteration and by storm')
+    instrumentation.add_profile_argument(parser)
+    return parser
+
+
+def iteration_totals(by_storm: pd.DataFrame, value_columns: List[str], iterations: int) -> pd.DataFrame:
+    """Life loss by iteration 1..iterations, 0 for iterations without rows"""
+    totals = by_storm.groupby(level="Iteration")[value_columns].sum()
+    return totals.reindex(pd.RangeIndex(1, iterations+1, name="Iteration"), fill_value=0)
+
+
+def iteration_statistics(totals: pd.DataFrame, percentiles: List[float]) -> Dict[str, float]:
+    """Mean, StdDev, Max and percentiles of every column over iterations"""
+    values = totals.to_numpy(dtype=float)
+    stats = {"Iterations": len(values)}
+    quantiles = np.percentile(values, percentiles, axis=0) if len(values) else np.full((len(percentiles), values.shape[1]), np.nan)
+    for j, col in enumerate(totals.columns):
+        stats[col + "_Mean"] = values[:, j].mean() if len(values) else np.nan
+        stats[col + "_StdDev"] = values[:, j].std(ddof=1) if len(values) > 1 else np.nan
+        stats[col + "_Max"] = values[:, j].max() if len(values) else np.nan
+        for k, q in enumerate(percentiles):
+            stats[f"{col}_P{q:g}"] = quantiles[k, j]
+    return stats
+
+
+def main(input_folder: str, output_file: str, contains: List[str] = [], value_columns: List[str] = None,
+    iterations: int = None, percentiles: List[float] = [5, 50, 95], details: bool = False,
+    profiler: instrumentation.Profiler = None):
+
+    profiler = profiler or instrumentation.Profiler()
+    with profiler.stage("discover") as record:
+        files = utils.full_paths_by_type(input_folder, "csv", ["AssetLifeLoss"] + list(contains))
+        record["rows"] = len(files)
+
+    rows, by_iteration, by_storm = [], [], []
+    # (SLC, Alternative) -> iteration totals of each model area
+    study_totals: Dict[Tuple[str, str], List[pd.DataFrame]] = {}
+    for i, file in enumerate(files):
+        slc, ma, alt = utils.derive_slc(file), utils.derive_ma_code(file), utils.derive_alt(file)
+        header = storm_damage_join.read_columns(file)
+        columns = value_columns or [x for x in header if "LifeLoss" in x]
+        keys = [x for x in storm_keys if x in header]
+        print(f"{str(i+1).zfill(2)}/{len(files)} - {utils.remove_path(file)}")
+
+        with profiler.stage("fold", file) as record:
+            storms = storm_damage_join.storm_damages(file, columns, keys).rename(columns={"AssetRows": "Assets"})
+            record["rows"] = len(storms)
+        file_iterations = iterations or summarize_runs.run_iterations(file) or (
+            int(storms.index.get_level_values("Iteration").max()) if len(storms) else 0)
+        totals = iteration_totals(storms, columns, file_iterations)
+        study_totals.setdefault((slc, alt), []).append(totals)
+
+        tags = {"SLC": slc, "ModelArea": ma, "Alternative": alt}
+        rows.append(dict(tags, Storms=len(storms), **iteration_statistics(totals, percentiles)))
+        if details:
+            by_iteration.append(totals.reset_index().assign(**tags))
+            by_storm.append(storms.reset_index().assign(**tags))
+        summary = ", ".join(f"{col} {totals[col].mean():,.3f}" for col in columns)
+        print(f"    {len(storms)} storms with life loss over {file_iterations} iterations - mean {summary}")
+
+    for (slc, alt), totals in sorted(study_totals.items()):
+        if len(totals) < 2:
+            continue
+        # model areas of a run share iterations
+        all_totals = pd.concat(totals).groupby(level="Iteration").sum()
+        storms = sum(row["Storms"] for row in rows if row["SLC"] == slc and row["Alternative"] == alt)
+        rows.append({"SLC": slc, "ModelArea": "All", "Alternative": alt, "Storms": storms,
+            **iteration_statistics(all_totals, percentiles)})
+
+    with profiler.stage("write") as record:
+        data = pd.DataFrame(rows)
+        data.to_csv(output_file, index=False)
+        record["rows"] = len(data)
+        stem = os.path.splitext(output_file)[0]
+        tag_columns = ["SLC", "ModelArea", "Alternative"]
+        for name, parts in [("by_iteration", by_iteration), ("by_storm", by_storm)]:
+            if details and parts:
+                detail = pd.concat(parts, ignore_index=True)
+                detail[tag_columns + [x for x in detail.columns if x not in tag_columns]].to_csv(f"{stem}_{name}.csv", index=False)
+    print(f"Saved life loss statistics to {output_file}")
+
+
+if __name__ == "__main__":
+    args, random = get_parser().parse_known_args()
+    profiler = instrumentation.Profiler(args.profile)
+    main(args.input_folder, args.output_file, args.contains, args.value_columns, args.iterations, args.percentiles,
+        args.details, profiler)
+    profiler.write_report(args.output_file)
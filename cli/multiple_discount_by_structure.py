@@ -1,5 +1,5 @@
 """"
-v1.0.0
+v1.3.0
 
 A wrapper around discount_by_structure.py to automate discounting from multiple
 AssetDamageDetail files. All files must be in the same subdirectory.
@@ -10,12 +10,31 @@ Changelog:
 
 v1.0.0 - 10SEP2021
 
+v1.1.0 - 19OCT2026
+Added --profile option to report time and memory per stage and file
+Added --from_warehouse option to read from a warehouse.py database
+Added --shard i/N option to discount part of the files on each node (see sharding.py)
+Added --cache_dir option to reuse outputs of identical earlier runs (see result_cache.py)
+Added --sparse_iterations and --binary options (see discount_by_structure.py),
+saved as DiscountedIterations_ files
+
+v1.2.0 - 19OCT2026
+WorkingCalculations_ files are only saved with --working_calcs
+
+v1.3.0 - 19OCT2026
+WorkingCalculations_ files are saved by default again, --working_calcs is replaced
+by --skip_working_calcs
+
 """
 
 import os
 import utils
 import discount_by_structure
 import argparse
+import instrumentation
+import warehouse
+import sharding
+import result_cache
 
 def get_parser():
     parser = argparse.ArgumentParser(description="Discount from AssetDamageDetailFile")
@@ -36,20 +55,59 @@ def get_parser():
         '-b', 
         '--base_timestamp', 
         help='Base timestamp using format YYYYMMDD')
+    parser.add_argument(
+        '--from_warehouse',
+        help='Path to warehouse.py sqlite file - discount AssetDamageDetail files ingested from input_folder')
+    parser.add_argument(
+        '--sparse_iterations',
+        action='store_true',
+        help='Save PV damages per asset and iteration, only nonzero pairs, instead of means per asset')
+    parser.add_argument(
+        '--binary',
+        action='store_true',
+        help='With --sparse_iterations - save compressed .npz files instead of csv')
+    parser.add_argument(
+        '--skip_working_calcs',
+        action='store_true',
+        help='Do not save WorkingCalculations_ files to output_folder, only the columns used to discount are read')
+    instrumentation.add_profile_argument(parser)
+    sharding.add_shard_argument(parser)
+    result_cache.add_cache_argument(parser)
     return parser
 
 
-def main(input_folder: str, output_folder: str, discount_rate: float, base_timestamp: str):
+def discounted_file_name(file: str, sparse_iterations: bool = False) -> str:
+    """DiscountedDamages_ (DiscountedIterations_ with sparse_iterations) output name for an AssetDamageDetail file"""
+    no_meta_file_name = utils.remove_meta(file)
+    prefix = "DiscountedIterations_" if sparse_iterations else "DiscountedDamages_"
+    return prefix + no_meta_file_name.replace(utils.derive_prefix(no_meta_file_name)+"_", "") + ".csv"
+
+
+def main(input_folder: str, output_folder: str, discount_rate: float, base_timestamp: str,
+    profiler: instrumentation.Profiler = None, from_warehouse: str = None, shard: tuple = None,
+    cache: result_cache.ResultCache = None, sparse_iterations: bool = False, binary: bool = False,
+    working_calcs: bool = None):
+
+    profiler = profiler or instrumentation.Profiler()
 
     # Get list of files
-    files = utils.full_paths_by_type(input_folder, "csv", "AssetDamageDetail")
+    with profiler.stage("discover") as record:
+        if from_warehouse:
+            files = warehouse.ingested_files(from_warehouse, "AssetDamageDetail", input_folder)
+        else:
+            files = utils.full_paths_by_type(input_folder, "csv", "AssetDamageDetail")
+        files = [file for position, file in sharding.select_files(files, shard, sharding.relative_key(input_folder))]
+        record["rows"] = len(files)
 
     for file in files:
-        no_meta_file_name = utils.remove_meta(file)
-        output_file = "DiscountedDamages_" + no_meta_file_name.replace(utils.derive_prefix(no_meta_file_name)+"_", "") + ".csv"
-        discount_by_structure.main(file, os.path.join(output_folder, output_file), discount_rate, base_timestamp)
+        discount_by_structure.main(file, os.path.join(output_folder, discounted_file_name(file, sparse_iterations)), discount_rate, base_timestamp, profiler, from_warehouse,
+            cache=cache, sparse_iterations=sparse_iterations, binary=binary, working_calcs=working_calcs)
 
 
 if __name__ == "__main__":
     args, random = get_parser().parse_known_args()
-    main(args.input_folder, args.output_folder, args.discount_rate, args.base_timestamp)
\ No newline at end of file
+    profiler = instrumentation.Profiler(args.profile)
+    main(args.input_folder, args.output_folder, args.discount_rate, args.base_timestamp, profiler, args.from_warehouse, args.shard,
+        result_cache.from_args(args), args.sparse_iterations, args.binary,
+        False if args.skip_working_calcs else None)
+    profiler.write_report(sharding.shard_path(os.path.join(args.output_folder, "multiple_discount_by_structure.csv"), args.shard))
\ No newline at end of file
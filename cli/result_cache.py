@@ -0,0 +1,260 @@
+"""
+v1.1
+
+Memoized results of the cli tools. A tool run is keyed on the tool name, its
+parameters, the fingerprints of its input files and of the tool source, so
+rerunning a tool with the same inputs and parameters (e.g. a report refresh)
+copies the cached outputs instead of recomputing them.
+
+Input fingerprints are (path, size, mtime) by default, or the md5 of the
+content with --cache_hash (slower, but survives copies and touched files).
+Outputs of each run are stored in <cache_dir>/<key>/ and listed with their
+size and last use in <cache_dir>/cache_index.json. When the cache is larger
+than --cache_budget gb the least recently used entries are removed, as are
+folders missing from the index (left by interrupted runs). The index is
+updated under a lock file (cache_index.json.lock), so runs on several nodes
+(--shard) can share one cache folder.
+
+Tools with --cache_dir: discount_by_structure, multiple_discount_by_structure,
+calculate_cumulative_damage_by_storm_stage.
+
+Usage:
+    cache = result_cache.from_args(args)
+    key = cache.key("discount_by_structure", {"discount_rate": 2.5}, [input_file], [__file__])
+    if not cache.fetch(key, [output_file]):
+        ... write output_file ...
+        cache.store(key, [output_file])
+
+python result_cache.py --help
+python result_cache.py --cache_dir "C:/Cache" --list
+python result_cache.py --cache_dir "C:/Cache" --cache_budget 5
+
+Changelog:
+
+19OCT2026 v1.0
+19OCT2026 v1.1 - Lock file around index updates, unindexed folders are evicted
+"""
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import List
+
+index_file_name = "cache_index.json"
+default_budget_gb = 10
+# seconds to wait for the index lock, a lock older than this is left by a crashed run and is broken
+lock_timeout = 60
+# unindexed .part folders younger than this may still be written by another run
+orphan_age = 3600
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description="List, trim or clear the result cache of the cli tools")
+    add_cache_argument(parser)
+    parser.add_argument(
+        '--list',
+        action='store_true',
+        help='List cached results, most recently used first')
+    parser.add_argument(
+        '--clear',
+        action='store_true',
+        help='Remove all cached results')
+    return parser
+
+
+def add_cache_argument(parser: argparse.ArgumentParser):
+    """Add the shared --cache_dir, --cache_budget and --cache_hash options to a tool's parser"""
+    parser.add_argument(
+        '--cache_dir',
+        help='Optional - reuse outputs of earlier runs with the same inputs and parameters from this folder')
+    parser.add_argument(
+        '--cache_budget',
+        type=float,
+        default=default_budget_gb,
+        help='Disk budget of the cache in gb, least recently used results are removed above it')
+    parser.add_argument(
+        '--cache_hash',
+        action='store_true',
+        help='Fingerprint inputs by content md5 instead of size and modified time')
+    return parser
+
+
+def from_args(args: argparse.Namespace):
+    """ResultCache from the parsed cache options, None without --cache_dir"""
+    if not args.cache_dir:
+        return None
+    return ResultCache(args.cache_dir, args.cache_budget, args.cache_hash)
+
+
+def file_md5(path: str) -> str:
+    md5 = hashlib.md5()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024*1024), b""):
+            md5.update(block)
+    return md5.hexdigest()
+
+
+class ResultCache:
+    """Outputs of tool runs in cache_dir, bounded to budget_gb with least recently used eviction"""
+
+    def __init__(self, cache_dir: str, budget_gb: float = default_budget_gb, hash_inputs: bool = False):
+        self.cache_dir = cache_dir
+        self.budget = budget_gb * 1e9
+        self.hash_inputs = hash_inputs
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def fingerprint(self, path: str) -> list:
+        if self.hash_inputs:
+            return ["md5", file_md5(path)]
+        stat = os.stat(path)
+        return [os.path.abspath(path), stat.st_size, stat.st_mtime_ns]
+
+    def key(self, tool: str, params: dict, input_files: List[str], sources: List[str] = []) -> str:
+        """Key of a run - sources are the tool's code files, so edited tools do not reuse stale results"""
+        description = {
+            "tool": tool,
+            "params": params,
+            "inputs": [self.fingerprint(x) for x in input_files],
+            "sources": [file_md5(x) for x in sources]}
+        return hashlib.sha256(json.dumps(description, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:32]
+
+    @contextlib.contextmanager
+    def lock(self):
+        """Hold cache_index.json.lock while reading, changing and saving the index"""
+        path = os.path.join(self.cache_dir, index_file_name + ".lock")
+        start = time.time()
+        while True:
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(path) > lock_timeout:
+                        os.remove(path)
+                        continue
+                except OSError:
+                    continue # released meanwhile
+                if time.time() - start > lock_timeout:
+                    raise Exception(f"Timed out waiting for {path}")
+                time.sleep(.05)
+        try:
+            os.close(fd)
+            yield
+        finally:
+            os.remove(path)
+
+    def load_index(self) -> dict:
+        """key -> {tool, files, size, created, last_used}, entries whose folder is gone are dropped"""
+        path = os.path.join(self.cache_dir, index_file_name)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            index = json.load(f)
+        return {key: entry for key, entry in index.items() if os.path.isdir(os.path.join(self.cache_dir, key))}
+
+    def save_index(self, index: dict):
+        """Write the index through a temp file so it is never left half written"""
+        path = os.path.join(self.cache_dir, index_file_name)
+        with open(path + ".part", "w") as f:
+            json.dump(index, f, indent=1)
+        os.replace(path + ".part", path)
+
+    def fetch(self, key: str, output_files: List[str]) -> bool:
+        """Copy the cached outputs of key to output_files, False on a miss"""
+        entry = self.load_index().get(key)
+        if entry is None or len(entry["files"]) != len(output_files):
+            return False
+        cached_files = [os.path.join(self.cache_dir, key, str(i)) for i in range(len(output_files))]
+        try:
+            for cached_file, output_file in zip(cached_files, output_files):
+                shutil.copyfile(cached_file, output_file)
+        except OSError:
+            return False # evicted by another run meanwhile
+        with self.lock():
+            index = self.load_index()
+            if key in index:
+                index[key]["last_used"] = time.time()
+                self.save_index(index)
+        return True
+
+    def store(self, key: str, output_files: List[str], tool: str = None):
+        """Save output_files under key and evict least recently used entries above the budget"""
+        size = sum(os.path.getsize(x) for x in output_files)
+        if size > self.budget:
+            return
+        # copied under a unique temp name first so a partially stored entry is never fetched
+        entry_dir = os.path.join(self.cache_dir, key)
+        temp_dir = tempfile.mkdtemp(prefix=key + ".", suffix=".part", dir=self.cache_dir)
+        for i, output_file in enumerate(output_files):
+            shutil.copyfile(output_file, os.path.join(temp_dir, str(i)))
+
+        with self.lock():
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(temp_dir, entry_dir)
+            index = self.load_index()
+            now = time.time()
+            index[key] = {"tool": tool, "files": [os.path.basename(x) for x in output_files], "size": size,
+                "created": now, "last_used": now}
+            self.evict(index, keep=key)
+            self.save_index(index)
+
+    def evict(self, index: dict, keep: str = None) -> int:
+        """
+        Remove folders missing from index, then least recently used entries
+        until the cache fits the budget. Call with the lock held, returns entries removed
+        """
+        removed = 0
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name in index or not os.path.isdir(path):
+                continue
+            if name.endswith(".part") and time.time() - os.path.getmtime(path) < orphan_age:
+                continue # being stored by another run
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+
+        total = sum(entry["size"] for entry in index.values())
+        for key in sorted(index, key=lambda x: index[x]["last_used"]):
+            if total <= self.budget:
+                break
+            if key == keep:
+                continue
+            total -= index[key]["size"]
+            shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+            del index[key]
+            removed += 1
+        return removed
+
+    def clear(self):
+        with self.lock():
+            for name in os.listdir(self.cache_dir):
+                if os.path.isdir(os.path.join(self.cache_dir, name)):
+                    shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+            self.save_index({})
+
+
+def main(cache_dir: str, budget_gb: float = default_budget_gb, list_entries: bool = False, clear: bool = False):
+    cache = ResultCache(cache_dir, budget_gb)
+    if clear:
+        cache.clear()
+        print(f"Cleared {cache_dir}")
+        return
+    with cache.lock():
+        index = cache.load_index()
+        removed = cache.evict(index)
+        cache.save_index(index)
+    if list_entries:
+        for key, entry in sorted(index.items(), key=lambda x: -x[1]["last_used"]):
+            last_used = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry["last_used"]))
+            print(f"{key}  {entry['tool'] or '':<45} {entry['size']/1e6:>10,.1f} mb  {last_used}  {', '.join(entry['files'])}")
+    total = sum(entry["size"] for entry in index.values())
+    print(f"{len(index)} cached results, {total/1e9:,.2f} of {budget_gb:g} gb - {removed} removed")
+
+
+if __name__ == "__main__":
+    args, random = get_parser().parse_known_args()
+    main(args.cache_dir, args.cache_budget, args.list, args.clear)
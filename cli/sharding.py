@@ -0,0 +1,181 @@
+"""
+v1.0
+
+Deterministic sharding of the folder level tools over several machines, with
+no coordinator. summarize_runs, multiple_discount_by_structure,
+aggregate_ma_from_csv and copy_files_to_folder accept --shard i/N
+(0 <= i < N). Every node lists the same files and keeps those whose stable
+hash (md5 of the path relative to the input folder, so drive letters and
+mount points do not matter) falls in shard i.
+
+Sharded outputs do not collide on shared storage:
+    summarize_runs, aggregate_ma_from_csv
+        write <stem>.shard-i-of-N<ext> and an index of the rows written for
+        each file (<stem>.shard-i-of-N<ext>.json). Merging puts the rows back
+        in the single node file order, giving exactly the single node output.
+    multiple_discount_by_structure
+        writes one output per input file - nothing to merge.
+    copy_files_to_folder
+        shards by file name (a name is only copied once). In --sync mode each
+        shard keeps its own manifest, merged into the folder manifest.
+
+python sharding.py --help
+python summarize_runs.py --input_folder "C:/Runs" --output_file "C:/summary.csv" --shard 0/4
+python sharding.py --output_file "C:/summary.csv"
+python sharding.py --output_folder "C:/Copied"
+
+Changelog:
+
+19OCT2026 v1.0
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+from typing import Callable, List, Tuple
+import pandas as pd
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description="Merge outputs of sharded runs (--shard i/N)")
+    parser.add_argument(
+        '-o',
+        '--output_file',
+        help='Single node output file of summarize_runs/aggregate_ma_from_csv - its shards are merged into it')
+    parser.add_argument(
+        '-f',
+        '--output_folder',
+        help='copy_files_to_folder output folder - shard sync manifests are merged')
+    return parser
+
+
+def parse_shard(text: str) -> Tuple[int, int]:
+    """'i/N' -> (i, N), argparse type of --shard"""
+    match = re.fullmatch(r"\s*(\d+)\s*/\s*(\d+)\s*", text or "")
+    if not match or not 0 <= int(match.group(1)) < int(match.group(2)):
+        raise argparse.ArgumentTypeError(f"Shard must be i/N with 0 <= i < N e.g. 0/4, got {text}")
+    return int(match.group(1)), int(match.group(2))
+
+
+def add_shard_argument(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        '--shard',
+        type=parse_shard,
+        metavar='i/N',
+        help='Only process shard i of N (0 <= i < N) of the files - merge outputs with sharding.py')
+
+
+def relative_key(root: str) -> Callable[[str], str]:
+    """Shard key - path relative to root with / separators"""
+    return lambda path: os.path.relpath(path, root).replace("\\", "/")
+
+
+def file_shard(key: str, count: int) -> int:
+    return int(hashlib.md5(key.encode("utf-8")).hexdigest()[:8], 16) % count
+
+
+def select_files(files: List[str], shard: Tuple[int, int], key: Callable[[str], str]) -> List[Tuple[int, str]]:
+    """(position in files, file) of the files in shard, all files if shard is None"""
+    return [(i, file) for i, file in enumerate(files) if shard is None or file_shard(key(file), shard[1]) == shard[0]]
+
+
+def shard_path(path: str, shard: Tuple[int, int]) -> str:
+    """<stem>.shard-i-of-N<ext> - path itself if shard is None"""
+    if shard is None:
+        return path
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.shard-{shard[0]}-of-{shard[1]}{ext}"
+
+
+def write_shard_index(output_file: str, shard: Tuple[int, int], total_files: int, entries: List[Tuple[int, int]]):
+    """Save (position of file in the single node file list, rows written) for each file of the shard"""
+    if shard is None:
+        return
+    with open(shard_path(output_file, shard) + ".json", "w") as f:
+        json.dump({"shard": list(shard), "total_files": total_files, "entries": [list(x) for x in entries]}, f)
+
+
+def find_shards(path: str) -> List[str]:
+    """Shard files of path, checked to be a complete set i = 0..N-1"""
+    stem, ext = os.path.splitext(path)
+    shards = {}
+    for shard_file in glob.glob(glob.escape(stem) + ".shard-*-of-*" + ext):
+        match = re.search(r"\.shard-(\d+)-of-(\d+)" + re.escape(ext) + "$", shard_file)
+        if match:
+            shards[(int(match.group(1)), int(match.group(2)))] = shard_file
+    counts = {n for i, n in shards}
+    if not shards:
+        raise Exception(f"No shards found for {path}")
+    if len(counts) > 1:
+        raise Exception(f"Shards of different runs found for {path}: N = {sorted(counts)}")
+    count = counts.pop()
+    missing = [i for i in range(count) if (i, count) not in shards]
+    if missing:
+        raise Exception(f"Missing shards {missing} of {count} for {path}")
+    return [shards[(i, count)] for i in range(count)]
+
+
+def merge_outputs(output_file: str) -> int:
+    """Combine the csv shards of output_file in single node file order, returns rows written"""
+    slices = []
+    total_files = None
+    columns = []
+    for shard_file in find_shards(output_file):
+        with open(shard_file + ".json") as f:
+            index = json.load(f)
+        if total_files not in (None, index["total_files"]):
+            raise Exception(f"Shards listed different numbers of files ({total_files}, {index['total_files']})")
+        total_files = index["total_files"]
+        # read as text so values are written back unchanged
+        try:
+            data = pd.read_csv(shard_file, dtype=str, keep_default_na=False)
+        except pd.errors.EmptyDataError: # shard without files
+            data = pd.DataFrame()
+        start = 0
+        for position, rows in index["entries"]:
+            slices.append((position, data.iloc[start:start+rows]))
+            start += rows
+        if start != len(data):
+            raise Exception(f"Index of {shard_file} does not match its {len(data)} rows")
+        # single node column order is set by the first file
+        if not columns or any(position == 0 for position, rows in index["entries"]):
+            columns = list(data.columns)
+
+    positions = sorted(position for position, rows in slices)
+    if positions != list(range(total_files)):
+        raise Exception(f"Shards cover {len(set(positions))} of {total_files} files")
+    slices.sort(key=lambda x: x[0])
+    merged = pd.concat([x[1] for x in slices], ignore_index=True) if slices else pd.DataFrame(columns=columns)
+    merged = merged[columns + [x for x in merged.columns if x not in columns]]
+    merged.to_csv(output_file, index=False)
+    return len(merged)
+
+
+def merge_manifests(output_folder: str) -> int:
+    """Fold shard sync manifests of copy_files_to_folder into the folder manifest, returns entries"""
+    import copy_files_to_folder # imported here as copy_files_to_folder also uses this module
+    manifest = copy_files_to_folder.load_manifest(output_folder)
+    shard_files = find_shards(os.path.join(output_folder, copy_files_to_folder.manifest_file_name))
+    for shard_file in shard_files:
+        with open(shard_file) as f:
+            manifest.update(json.load(f))
+    copy_files_to_folder.save_manifest(output_folder, manifest)
+    for shard_file in shard_files:
+        os.remove(shard_file)
+    return len(manifest)
+
+
+def main(output_file: str = None, output_folder: str = None):
+    if output_file:
+        rows = merge_outputs(output_file)
+        print(f"Merged {rows} rows into {output_file}")
+    if output_folder:
+        entries = merge_manifests(output_folder)
+        print(f"Merged sync manifests - {entries} files in manifest of {output_folder}")
+
+
+if __name__ == "__main__":
+    args, random = get_parser().parse_known_args()
+    main(args.output_file, args.output_folder)
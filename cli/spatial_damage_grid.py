@@ -0,0 +1,256 @@
+"""
+v1.0
+
+Grid binned damage maps without ArcMap. Per asset PV damages are joined to
+structure coordinates from the Structures_ input files and summed into square
+grid cells, one grid per SLC and alternative (all model areas together).
+
+Damages are read from either
+    discounted  DiscountedDamages_ files (multiple_discount_by_structure.py)
+    mapoutputs  AssetsAllStatistics table of MapOutputs_ sqlite files
+                (statisticsTypeName = 'PVDamage', MeanValue)
+and matched to coordinates on AssetExternalReference = id_column of the
+Structures_ files (hash lookup with pd.Index.get_indexer). Assets without
+coordinates (e.g. autos and debris) are counted and reported. Cell indices
+are computed for all assets at once and summed with np.bincount, so millions
+of structures take seconds.
+
+The grid starts at (origin_x, origin_y), default the minimum coordinates of
+all structures snapped down to a multiple of cell_size, and is the same for
+every SLC and alternative so grids can be compared or subtracted.
+
+Output:
+    output_file     long table of non-empty cells - SLC, Alternative, Row,
+                    Column, X, Y (cell center), Structures, DamagedStructures,
+                    Damage. Row 0 is the northern most row.
+    --ascii_grid    also writes <output_file>_<SLC>_<ALT>.asc ESRI ASCII grids
+                    of Damage (empty cells are NODATA) that load in any GIS
+
+python spatial_damage_grid.py --help
+python spatial_damage_grid.py --input_folder "C:/Discounted" --structures_folder "C:/Model/Inputs"
+    --output_file "C:/DamageGrid.csv" --cell_size 500 --ascii_grid
+python spatial_damage_grid.py --input_folder "C:/Runs" --source mapoutputs --structures_folder "C:/Model/Inputs"
+    --output_file "C:/DamageGrid.csv" --cell_size 1000 --contains Intermediate
+
+Changelog:
+
+19OCT2026 v1.0
+"""
+import argparse
+import os
+from typing import Dict, List, Tuple
+import numpy as np
+import pandas as pd
+import utils
+import instrumentation
+import sqlite_outputs
+
+nodata = -9999
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description="Grid binned damage maps from per asset damages and structure coordinates")
+    parser.add_argument(
+        '-i',
+        '--input_folder',
+        help='Path to input folder containing DiscountedDamages_ files or MapOutputs_ sqlite files')
+    parser.add_argument(
+        '-s',
+        '--structures_folder',
+        help='Path to folder containing Structures_ input files')
+    parser.add_argument(
+        '-o',
+        '--output_file',
+        help='Path to output csv file')
+    parser.add_argument(
+        '--cell_size',
+        type=float,
+        help='Grid cell size in the units of the structure coordinates')
+    parser.add_argument(
+        '--origin',
+        nargs=2,
+        type=float,
+        metavar=('X', 'Y'),
+        help='Lower left corner of the grid (default: minimum coordinates snapped to cell_size)')
+    parser.add_argument(
+        '--source',
+        choices=['discounted', 'mapoutputs'],
+        default='discounted',
+        help='Damages from DiscountedDamages_ files or MapOutputs_ AssetsAllStatistics')
+    parser.add_argument(
+        '-c',
+        '--contains',
+        nargs='+',
+        default=[],
+        help='Unique str identifier e.g. FWOP, Intermediate, MA01, etc.')
+    parser.add_argument(
+        '--value_column',
+        default='TotalLossPV',
+        help='Damage column of DiscountedDamages_ files')
+    parser.add_argument(
+        '--id_column',
+        default='Name',
+        help='Column of the Structures_ files matching AssetExternalReference')
+    parser.add_argument(
+        '--x_column',
+        default='X',
+        help='X coordinate column of the Structures_ files')
+    parser.add_argument(
+        '--y_column',
+        default='Y',
+        help='Y coordinate column of the Structures_ files')
+    parser.add_argument(
+        '--ascii_grid',
+        action='store_true',
+        help='Also write an ESRI ASCII grid per SLC and alternative')
+    instrumentation.add_profile_argument(parser)
+    return parser
+
+
+def read_structures(files: List[str], id_column: str, x_column: str, y_column: str) -> pd.DataFrame:
+    """Coordinates indexed by structure id, the first file listing an id wins"""
+    parts = []
+    for file in files:
+        with utils.open_data(file) as f:
+            parts.append(pd.read_csv(f, usecols=[id_column, x_column, y_column], dtype={id_column: str}))
+    data = pd.concat(parts, ignore_index=True).dropna()
+    data = data.drop_duplicates(id_column).set_index(id_column)
+    return data.rename(columns={x_column: "X", y_column: "Y"})
+
+
+def read_damages(file: str, source: str, value_column: str) -> pd.DataFrame:
+    """AssetExternalReference, Damage of a DiscountedDamages_ or MapOutputs_ file"""
+    if source == 'mapoutputs':
+        data = sqlite_outputs.read_table(file, "AssetsAllStatistics", ["AssetExternalReference", "MeanValue"],
+            where="statisticsTypeName = ?", params=("PVDamage",))
+        return data.rename(columns={"MeanValue": "Damage"})
+    with utils.open_data(file) as f:
+        data = pd.read_csv(f, **utils.csv_read_args(file, ["AssetExternalReference", value_column]))
+    return data.rename(columns={value_column: "Damage"})
+
+
+def group_files(files: List[str]) -> Dict[Tuple[str, str], List[str]]:
+    """(SLC, Alternative) -> files of all model areas"""
+    groups = {}
+    for file in files:
+        groups.setdefault((utils.derive_slc(file), utils.derive_alt(file)), []).append(file)
+    return groups
+
+
+class Grid:
+    """Square cells of cell_size from (x0, y0), covering the given coordinates"""
+
+    def __init__(self, x: np.ndarray, y: np.ndarray, cell_size: float, origin: Tuple[float, float] = None):
+        self.cell_size = cell_size
+        if origin is None:
+            origin = (np.floor(x.min() / cell_size) * cell_size, np.floor(y.min() / cell_size) * cell_size)
+        self.x0, self.y0 = origin
+        self.columns = max(int(np.floor((x.max() - self.x0) / cell_size)) + 1, 1)
+        self.rows = max(int(np.floor((y.max() - self.y0) / cell_size)) + 1, 1)
+
+    def cell_index(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Flat row major cell index (row 0 at the top), -1 outside the grid"""
+        column = np.floor((x - self.x0) / self.cell_size).astype(np.int64)
+        row = self.rows - 1 - np.floor((y - self.y0) / self.cell_size).astype(np.int64)
+        inside = (column >= 0) & (column < self.columns) & (row >= 0) & (row < self.rows)
+        return np.where(inside, row * self.columns + column, -1)
+
+    def write_ascii(self, path: str, values: np.ndarray):
+        header = (f"ncols {self.columns}\nnrows {self.rows}\nxllcorner {self.x0}\nyllcorner {self.y0}\n"
+            f"cellsize {self.cell_size}\nNODATA_value {nodata}\n")
+        with open(path, "w") as f:
+            f.write(header)
+            np.savetxt(f, values.reshape(self.rows, self.columns), fmt="%.2f")
+
+
+def bin_damages(grid: Grid, cells: np.ndarray, damage: np.ndarray) -> Dict[str, np.ndarray]:
+    """Structures, damaged structures and damage per cell (flat arrays of all cells)"""
+    inside = cells >= 0
+    cells, damage = cells[inside], damage[inside]
+    size = grid.rows * grid.columns
+    return {
+        "Structures": np.bincount(cells, minlength=size),
+        "DamagedStructures": np.bincount(cells, damage > 0, minlength=size).astype(np.int64),
+        "Damage": np.bincount(cells, damage, minlength=size)}
+
+
+def cell_table(grid: Grid, binned: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """Non-empty cells as a long table"""
+    cells = np.flatnonzero(binned["Structures"])
+    row, column = np.divmod(cells, grid.columns)
+    return pd.DataFrame({
+        "Row": row,
+        "Column": column,
+        "X": grid.x0 + (column + .5) * grid.cell_size,
+        "Y": grid.y0 + (grid.rows - row - .5) * grid.cell_size,
+        "Structures": binned["Structures"][cells],
+        "DamagedStructures": binned["DamagedStructures"][cells],
+        "Damage": binned["Damage"][cells]})
+
+
+def main(input_folder: str, structures_folder: str, output_file: str, cell_size: float, origin: Tuple[float, float] = None,
+    source: str = 'discounted', contains: List[str] = [], value_column: str = 'TotalLossPV', id_column: str = 'Name',
+    x_column: str = 'X', y_column: str = 'Y', ascii_grid: bool = False, profiler: instrumentation.Profiler = None):
+
+    profiler = profiler or instrumentation.Profiler()
+    with profiler.stage("read_structures") as record:
+        structure_files = utils.full_paths_by_type(structures_folder, "csv", "Structures")
+        if not structure_files:
+            raise Exception(f"No Structures_ files in {structures_folder}")
+        structures = read_structures(structure_files, id_column, x_column, y_column)
+        record["rows"] = len(structures)
+    grid = Grid(structures["X"].to_numpy(), structures["Y"].to_numpy(), cell_size, origin)
+    # every structure is binned once, damages then only look up their cell
+    structure_cells = grid.cell_index(structures["X"].to_numpy(), structures["Y"].to_numpy())
+    print(f"{len(structures)} structures, grid of {grid.rows} x {grid.columns} cells of {cell_size:g}")
+
+    with profiler.stage("discover") as record:
+        if source == 'mapoutputs':
+            files = utils.full_paths_by_type(input_folder, "sqlite", ["MapOutputs"] + list(contains), compressed=False)
+        else:
+            files = utils.full_paths_by_type(input_folder, "csv", ["DiscountedDamages"] + list(contains))
+        groups = group_files(files)
+        record["rows"] = len(files)
+
+    results = []
+    for i, ((slc, alt), group) in enumerate(sorted(groups.items())):
+        print(f"{str(i+1).zfill(2)}/{len(groups)} - {slc} {alt}: {len(group)} files")
+        with profiler.stage("read_damages", group[0]) as record:
+            damages = pd.concat([read_damages(file, source, value_column) for file in group], ignore_index=True)
+            record["rows"] = len(damages)
+
+        with profiler.stage("bin", group[0]) as record:
+            position = structures.index.get_indexer(damages["AssetExternalReference"].astype(str))
+            matched = position >= 0
+            # structures without damages still count in Structures
+            damage = np.bincount(position[matched], damages["Damage"].to_numpy()[matched], len(structures))
+            binned = bin_damages(grid, structure_cells, damage)
+            cells = cell_table(grid, binned)
+            cells.insert(0, 'Alternative', alt)
+            cells.insert(0, 'SLC', slc)
+            record["rows"] = len(cells)
+        results.append(cells)
+
+        if not matched.all():
+            print(f"    {(~matched).sum()} assets without coordinates, {damages['Damage'].to_numpy()[~matched].sum():,.2f} damages not mapped")
+        if (structure_cells < 0).any():
+            print(f"    {(structure_cells < 0).sum()} structures outside the grid")
+        print(f"    {binned['Damage'].sum():,.2f} damages in {len(cells)} cells")
+
+        if ascii_grid:
+            values = np.where(binned["Structures"] > 0, binned["Damage"], nodata)
+            grid.write_ascii(f"{os.path.splitext(output_file)[0]}_{slc}_{alt}.asc", values)
+
+    with profiler.stage("write") as record:
+        data = pd.concat(results, ignore_index=True) if results else pd.DataFrame()
+        data.to_csv(output_file, index=False)
+        record["rows"] = len(data)
+    print(f"Saved damage grid to {output_file}")
+
+
+if __name__ == "__main__":
+    args, random = get_parser().parse_known_args()
+    profiler = instrumentation.Profiler(args.profile)
+    main(args.input_folder, args.structures_folder, args.output_file, args.cell_size, args.origin, args.source,
+        args.contains, args.value_column, args.id_column, args.x_column, args.y_column, args.ascii_grid, profiler)
+    profiler.write_report(args.output_file)
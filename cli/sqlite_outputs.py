@@ -0,0 +1,83 @@
+"""
+v1.0
+
+Read tables straight from G2CRM output sqlite databases (e.g. the
+AssetDamageDetail table) instead of exporting them to csv first. Rows are
+pulled with cursor.fetchmany in batches and converted to typed DataFrame
+chunks, so large tables can be processed chunk by chunk.
+
+Usage:
+    for chunk in sqlite_outputs.iter_chunks(db_path, "AssetDamageDetail", ["Iteration", "TotalLossPV"]):
+        ...
+    data = sqlite_outputs.read_table(db_path, "AssetDamageDetail", parse_dates=["Time"])
+
+Changelog:
+
+19OCT2026 v1.0
+"""
+import os
+import pathlib
+import sqlite3
+from typing import Dict, Iterator, List
+import pandas as pd
+
+# rows fetched per fetchmany call
+chunk_rows = 100000
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    """Read only connection - G2CRM outputs are never modified"""
+    uri = pathlib.Path(os.path.abspath(db_path)).as_uri() + "?mode=ro"
+    return sqlite3.connect(uri, uri=True)
+
+
+def list_tables(db_path: str) -> List[str]:
+    conn = connect(db_path)
+    tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name")]
+    conn.close()
+    return tables
+
+
+def iter_chunks(db_path: str, table: str, columns: List[str] = None, dtypes: Dict[str, str] = None,
+    parse_dates: List[str] = None, where: str = None, params: tuple = (), chunk_rows: int = chunk_rows) -> Iterator[pd.DataFrame]:
+    """
+    Yield DataFrames of at most chunk_rows rows from table.
+    columns - columns to select (all if None)
+    dtypes - column -> dtype applied to every chunk e.g. {"Iteration": "int32"}
+    parse_dates - columns converted with pd.to_datetime
+    where/params - optional SQL filter e.g. where="Iteration <= ?", params=(100,)
+    """
+    if table not in list_tables(db_path):
+        raise Exception(f"Table {table} not found in {db_path}")
+    select = ", ".join(f'"{col}"' for col in columns) if columns else "*"
+    sql = f'SELECT {select} FROM "{table}"' + (f" WHERE {where}" if where else "")
+
+    conn = connect(db_path)
+    try:
+        cursor = conn.execute(sql, params)
+        names = [x[0] for x in cursor.description]
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                break
+            chunk = pd.DataFrame.from_records(rows, columns=names)
+            if dtypes:
+                chunk = chunk.astype({k: v for k, v in dtypes.items() if k in chunk.columns})
+            for col in parse_dates or []:
+                chunk[col] = pd.to_datetime(chunk[col])
+            yield chunk
+    finally:
+        conn.close()
+
+
+def read_table(db_path: str, table: str, columns: List[str] = None, dtypes: Dict[str, str] = None,
+    parse_dates: List[str] = None, where: str = None, params: tuple = ()) -> pd.DataFrame:
+    """Whole table (or filtered rows) as one DataFrame, read in chunks"""
+    chunks = list(iter_chunks(db_path, table, columns, dtypes, parse_dates, where, params))
+    if not chunks:
+        conn = connect(db_path)
+        select = ", ".join(f'"{col}"' for col in columns) if columns else "*"
+        empty = pd.read_sql(f'SELECT {select} FROM "{table}" LIMIT 0', conn)
+        conn.close()
+        return empty
+    return pd.concat(chunks, ignore_index=True)
@@ -0,0 +1,172 @@
+"""
+v1.0
+
+Per-storm damage vs stage tables. Joins a storm level table
+(ModeledAreaStormDetail_, ModeledAreaStorm_ or StormEvent_) with the damages
+of an asset table (AssetDamageDetail_ or AssetStormDetail_) on
+(Iteration, StormID, Time), for every model area of the input folder. A storm
+can be sampled more than once in an iteration, so Time is part of the key when
+both tables have it; it is compared as text.
+
+Files are matched by SLC, model area and alternative (utils.derive_*). The
+asset table is streamed in chunks and its damage columns are summed by storm
+into a hash table (one row per storm, with the number of asset rows). The
+storm table is then streamed in chunks, joined to it and written out chunk by
+chunk, so neither table is loaded at once. Storms without damages get 0.
+StormSurgePlusTide is added when the storm table has StormSurge and Tide.
+The storm table must have one row per storm occurrence (one model area per
+file).
+
+Output: StormDamages_<SLC>_<MA>_<ALT>.csv in output_folder for each model area
+
+python storm_damage_join.py --help
+python storm_damage_join.py --input_folder "C:/Runs/FWOP" --output_folder "C:/StormDamages"
+python storm_damage_join.py --input_folder "C:/Runs/FWOP" --output_folder "C:/StormDamages"
+    --storm_prefix StormEvent --damage_prefix AssetStormDetail --damage_columns TotalLoss
+
+Changelog:
+
+19OCT2026 v1.0
+"""
+import argparse
+import os
+from typing import Dict, List, Tuple
+import pandas as pd
+import utils
+import instrumentation
+
+storm_prefixes = ["ModeledAreaStormDetail", "ModeledAreaStorm", "StormEvent"]
+damage_prefixes = ["AssetDamageDetail", "AssetStormDetail"]
+# summed by storm when present in the asset table and --damage_columns is not given
+default_damage_columns = ["ValueLossStructure", "ValueLossContents", "TotalLoss", "TotalLossPV"]
+join_keys = ["Iteration", "StormID"]
+optional_join_keys = ["Time"]
+
+# rows per chunk while streaming csv files
+chunksize = 200000
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description="Join per-storm damages to storm stages for every model area")
+    parser.add_argument(
+        '-i',
+        '--input_folder',
+        help='Path to input folder containing storm and asset damage tables of one or more runs')
+    parser.add_argument(
+        '-o',
+        '--output_folder',
+        help='Path to output folder for StormDamages_ files')
+    parser.add_argument(
+        '-c',
+        '--contains',
+        nargs='+',
+        default=[],
+        help='Unique str identifier e.g. FWOP, S1, Intermediate, etc.')
+    parser.add_argument(
+        '--storm_prefix',
+        choices=storm_prefixes,
+        default=storm_prefixes[0],
+        help='Storm level table')
+    parser.add_argument(
+        '--damage_prefix',
+        choices=damage_prefixes,
+        default=damage_prefixes[0],
+        help='Asset level table with damages by storm')
+    parser.add_argument(
+        '--damage_columns',
+        nargs='+',
+        help='Columns of the asset table summed by storm (default: ' + ", ".join(default_damage_columns) + ' when present)')
+    instrumentation.add_profile_argument(parser)
+    return parser
+
+
+def read_columns(path: str) -> List[str]:
+    with utils.open_data(path, 'rt') as f:
+        return f.readline().strip().split(",")
+
+
+def group_key(path: str) -> Tuple[str, str, str]:
+    return utils.derive_slc(path), utils.derive_ma_code(path), utils.derive_alt(path)
+
+
+def match_files(files: List[str], storm_prefix: str, damage_prefix: str) -> Dict[Tuple[str, str, str], Dict[str, str]]:
+    """(SLC, ModelArea, Alternative) -> {prefix: file} for groups with both tables"""
+    groups = {}
+    for file in files:
+        prefix = utils.derive_prefix(file)
+        if prefix in (storm_prefix, damage_prefix):
+            groups.setdefault(group_key(file), {})[prefix] = file
+    return {key: group for key, group in groups.items() if len(group) == 2}
+
+
+def storm_damages(path: str, damage_columns: List[str], keys: List[str] = join_keys) -> pd.DataFrame:
+    """Damage columns summed by keys with the number of asset rows, folded over chunks"""
+    parts = []
+    read_args = utils.csv_read_args(path, keys + damage_columns)
+    read_args["parse_dates"] = None # Time is a join key, kept as text like in the storm table
+    with utils.open_data(path) as f:
+        for chunk in pd.read_csv(f, chunksize=chunksize, **read_args):
+            grouped = chunk.groupby(keys)
+            part = grouped[damage_columns].sum()
+            part["AssetRows"] = grouped.size()
+            parts.append(part)
+    if not parts:
+        return pd.DataFrame(columns=damage_columns + ["AssetRows"], index=pd.MultiIndex.from_tuples([], names=keys))
+    # a storm can be split over two chunks
+    return pd.concat(parts).groupby(level=list(range(len(keys)))).sum()
+
+
+def join_storms(storm_file: str, damages: pd.DataFrame, output_file: str, tags: Dict[str, str]) -> Tuple[int, int]:
+    """Stream storm_file, join damages and write output_file, returns (storms, storms with damages)"""
+    storms = matched = 0
+    header = True
+    with utils.open_data(storm_file) as f:
+        for chunk in pd.read_csv(f, chunksize=chunksize, **utils.csv_read_args(storm_file)):
+            joined = chunk.join(damages, on=damages.index.names)
+            matched += int(joined["AssetRows"].notna().sum())
+            joined[list(damages.columns)] = joined[list(damages.columns)].fillna(0)
+            if "StormSurge" in joined.columns and "Tide" in joined.columns:
+                joined["StormSurgePlusTide"] = joined["StormSurge"] + joined["Tide"]
+            for i, (col, value) in enumerate(tags.items()):
+                joined.insert(i, col, value)
+            joined.to_csv(output_file, mode="w" if header else "a", header=header, index=False)
+            header = False
+            storms += len(chunk)
+    return storms, matched
+
+
+def main(input_folder: str, output_folder: str, contains: List[str] = [], storm_prefix: str = storm_prefixes[0],
+    damage_prefix: str = damage_prefixes[0], damage_columns: List[str] = None, profiler: instrumentation.Profiler = None):
+
+    profiler = profiler or instrumentation.Profiler()
+    with profiler.stage("discover") as record:
+        files = utils.full_paths_by_type(input_folder, "csv", ["."] + list(contains))
+        groups = match_files(files, storm_prefix, damage_prefix)
+        record["rows"] = len(groups)
+    if not groups:
+        print(f"No model area with both {storm_prefix} and {damage_prefix} files in {input_folder}")
+
+    for i, ((slc, ma, alt), group) in enumerate(sorted(groups.items())):
+        damage_file, storm_file = group[damage_prefix], group[storm_prefix]
+        damage_header, storm_header = read_columns(damage_file), read_columns(storm_file)
+        columns = damage_columns or [x for x in default_damage_columns if x in damage_header]
+        keys = join_keys + [x for x in optional_join_keys if x in damage_header and x in storm_header]
+        print(f"{str(i+1).zfill(2)}/{len(groups)} - Joining {utils.remove_path(storm_file)} and {utils.remove_path(damage_file)}")
+
+        with profiler.stage("storm_damages", damage_file) as record:
+            damages = storm_damages(damage_file, columns, keys)
+            record["rows"] = len(damages)
+        output_file = os.path.join(output_folder, f"StormDamages_{slc}_{ma}_{alt}.csv")
+        with profiler.stage("join", storm_file) as record:
+            storms, matched = join_storms(storm_file, damages, output_file, {"SLC": slc, "ModelArea": ma, "Alternative": alt})
+            record["rows"] = storms
+        if matched < len(damages):
+            print(f"    {len(damages) - matched} storms with damages are not in {utils.remove_path(storm_file)}")
+        print(f"    {storms} storms, {matched} with damages - saved to {output_file}")
+
+
+if __name__ == "__main__":
+    args, random = get_parser().parse_known_args()
+    profiler = instrumentation.Profiler(args.profile)
+    main(args.input_folder, args.output_folder, args.contains, args.storm_prefix, args.damage_prefix, args.damage_columns, profiler)
+    profiler.write_report(os.path.join(args.output_folder, "storm_damage_join.csv"))
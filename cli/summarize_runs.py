@@ -1,10 +1,10 @@
 """
-Summarize runs v1.3
+Summarize runs v1.5
 
 Summarize basic statistics from completed G2CRM runs and output to a csv file. 
 The program travels down the subdirectories of a master input folder and search
 for an output *.prn file. Each path where a *.prn file is located is assumed to
-be a finished run output folder. Requires custom package "utils" v1.8.
+be a finished run output folder. Requires custom package "utils" v1.9.
 
 The tool can be used via a CLI. Run --help for possible arguments:
   python summarize_runs.py --help
@@ -23,6 +23,19 @@ Add number of affected structures
 v 1.3 - 07JUN2021
 Adapt to to G2CRM version 0.4.564.3
 
+v 1.4 - 19OCT2026
+Read gzip/zstd compressed prn and csv files
+Per file progress is rate limited through utils.LogManager instead of print
+Added --profile option to report time and memory per stage and run
+Added --from_warehouse option to count raised/removed assets from a warehouse.py database
+Only the first column of AssetRaising/RemovedAssets is parsed to count rows
+Added --shard i/N option to summarize part of the runs on each node (see sharding.py)
+Split main into summarize_prn/summary_table reused by watch_runs.py
+
+v 1.5 - 19OCT2026
+Added run_iterations - number of iterations of the run folder of an output file,
+shared by life_loss_aggregation.py, convergence_diagnostics.py and top_damaged_assets.py
+
 """
 import argparse
 import utils
@@ -31,13 +44,36 @@ import re
 import os
 import traceback
 import sqlite3
+import instrumentation
+import warehouse
+import sharding
 from typing import List, Union
 
-def expected_elevations(path:str, iters:int):
+# values extracted from each prn file with parse_prn
+prn_data_types = [
+    'total_life_loss', 'upland_pvdamage', 'simulation_name', 'g2_start_time', 'iters' , 'seed', 'slc', 
+    'run_condition', 'interest_rate', 'duration', 'basis_time', 'start_time', 'slc_basis_year', 'cum_damage_removal',
+    'depreciation', 'asset_raising', 'calculate_life_loss', 'g2_version', 'run_time', 'plan_alt', 'g2_assets','number_of_storms']
+
+# values of each run in summarize_prn order
+summary_columns = ['total_life_loss_std', 'upland_pvdamage_std'] + prn_data_types + ["assets_elevated", "assets_removed", "damaged_structures"]
+
+# columns of the output file
+output_columns = ['file_name', 'file_path', 'folder_path', 'MA', 'simulation_name', 'g2_version', 'g2_start_time', 'run_time', 'run_time_hrs',
+    'slc', 'plan_alt', 'iters', 'g2_assets', 'number_of_storms',
+    'total_life_loss', 'total_life_loss_std', 'upland_pvdamage', 'upland_pvdamage_std', "assets_elevated", "assets_removed", "damaged_structures",      
+    'run_condition', 'seed', 'interest_rate', 'duration', 'basis_time', 'start_time', 'slc_basis_year', 
+    'cum_damage_removal', 'depreciation', 'asset_raising', 'calculate_life_loss']
+
+
+def expected_elevations(path:str, iters:int, from_warehouse:str=None):
     try:
+        if from_warehouse:
+            return warehouse.count_run_rows(from_warehouse, 'AssetRaising', path)/iters
         asset_raising_path = utils.full_paths_by_type(path, 'csv', 'AssetRaising')
         asset_raising_path = asset_raising_path[0]
-        data = pd.read_csv(asset_raising_path)
+        with utils.open_data(asset_raising_path) as f:
+            data = pd.read_csv(f, usecols=[0]) # only the row count is needed
         return len(data)/iters
     except:
         return "Error reading from AssetRaising csv file"
@@ -55,7 +91,7 @@ def damaged_structures(path:str):
     mapoutputs_size_threshold = 50*1000000 
 
     try:
-        mapoutputs_path = utils.full_paths_by_type(path, 'sqlite', 'MapOutputs')
+        mapoutputs_path = utils.full_paths_by_type(path, 'sqlite', 'MapOutputs', compressed=False)
         mapoutputs_path = mapoutputs_path[0]
 
         sql = """
@@ -96,11 +132,14 @@ def damaged_structures(path:str):
         return "Error reading from MapOutputs sqlite file"
 
 
-def expected_removals(path:str, iters:int):
+def expected_removals(path:str, iters:int, from_warehouse:str=None):
     try:
+        if from_warehouse:
+            return warehouse.count_run_rows(from_warehouse, 'RemovedAssets', path)/iters
         asset_removal_path = utils.full_paths_by_type(path, 'csv', 'RemovedAssets')
         asset_removal_path = asset_removal_path[0]
-        data = pd.read_csv(asset_removal_path)
+        with utils.open_data(asset_removal_path) as f:
+            data = pd.read_csv(f, usecols=[0]) # only the row count is needed
         return len(data)/iters
     except:
         return "Error reading from RemovedAssets csv file"
@@ -185,6 +224,23 @@ def parse_prn(tokens, data:str, mode = 'mean'):
         return int(tokens[index].split(': ')[1])
 
 
+def run_iterations(file: str) -> int:
+    """
+    Number of iterations from the prn file in the folder of file, None if
+    there is not exactly one prn file or the run is unfinished or unreadable
+    """
+    prn_files = utils.full_paths_by_type(utils.folder_path(file), "prn", [])
+    if len(prn_files) != 1:
+        return None
+    try:
+        with utils.open_data(prn_files[0], 'rt') as f:
+            iters = parse_prn(f.read().split('\n'), 'iters')
+    except Exception:
+        return None
+    # parse_prn returns 'Unfinished Run' for incomplete runs
+    return iters if isinstance(iters, int) else None
+
+
 def get_parser():
     parser = argparse.ArgumentParser(description="Generate summary statistics for all runs")
     parser.add_argument(
@@ -202,69 +258,89 @@ def get_parser():
         '--contains', 
         nargs='+', 
         help='Unique str identifier e.g. FWOP, S1, Intermediate, etc.')
+    parser.add_argument(
+        '--from_warehouse',
+        help='Path to warehouse.py sqlite file - count raised/removed assets from it')
+    instrumentation.add_profile_argument(parser)
+    sharding.add_shard_argument(parser)
     return parser
 
 
-def main(input_folder: str, output_file: str, contains:Union[List[str],str]):
+def summarize_prn(file: str, profiler: instrumentation.Profiler = None, from_warehouse: str = None) -> list:
+    """Values of one run (summary_columns order) from its prn file and run folder"""
+    profiler = profiler or instrumentation.Profiler()
+    run_path = utils.folder_path(file)
+    with profiler.stage("parse_prn", file) as record:
+        with utils.open_data(file, 'rt') as f:
+            read_data = f.read()
+        tokens = read_data.split('\n')
+        iters = parse_prn(tokens, 'iters')
+        extracted_data = [parse_prn(tokens, 'total_life_loss', 'std'), parse_prn(tokens, 'upland_pvdamage', 'std')] + (
+            [parse_prn(tokens, data_type) for data_type in prn_data_types])
+        record["rows"] = len(tokens)
+    with profiler.stage("asset_raising", file):
+        extracted_data.append(expected_elevations(run_path, iters, from_warehouse))
+    with profiler.stage("removed_assets", file):
+        extracted_data.append(expected_removals(run_path, iters, from_warehouse))
+    with profiler.stage("damaged_structures", file):
+        extracted_data.append(damaged_structures(run_path))
+    return extracted_data
+
+
+def summary_table(data: pd.DataFrame, file_list: List[str]) -> pd.DataFrame:
+    """Output table from summarize_prn rows (summary_columns) of the runs in file_list"""
+    data.index = list(map(utils.remove_path, file_list))
+    data.index.name = 'file_name'
+
+    data = data.reset_index()
+    data['file_path'] = file_list
+    data['folder_path'] = list(map(utils.folder_path, file_list))
+
+    data['MA'] = data['file_path'].apply(lambda x: utils.derive_ma_code(x))
+
+    data['run_time_hrs'] = data['run_time'].apply(lambda x: x / (60*60) if isinstance(x, float) else x)
 
-    file_list = utils.full_paths_by_type(input_folder, 'prn', 'prn' if not contains else contains, print_log=True)
-    existed_files_without_path = list(map(utils.remove_path, file_list))
-    paths = list(map(utils.folder_path, file_list))
-    no_files = len(paths)
+    return data[output_columns]
 
-    data_types = [
-        'total_life_loss', 'upland_pvdamage', 'simulation_name', 'g2_start_time', 'iters' , 'seed', 'slc', 
-        'run_condition', 'interest_rate', 'duration', 'basis_time', 'start_time', 'slc_basis_year', 'cum_damage_removal',
-        'depreciation', 'asset_raising', 'calculate_life_loss', 'g2_version', 'run_time', 'plan_alt', 'g2_assets','number_of_storms']
 
-    col_index = ['total_life_loss_std', 'upland_pvdamage_std'] + data_types + ["assets_elevated", "assets_removed", "damaged_structures"]
+def main(input_folder: str, output_file: str, contains:Union[List[str],str], profiler: instrumentation.Profiler = None,
+    from_warehouse: str = None, shard: tuple = None):
 
-    data = pd.DataFrame([], columns=col_index)
+    profiler = profiler or instrumentation.Profiler()
+    with profiler.stage("discover") as record:
+        file_list = utils.full_paths_by_type(input_folder, 'prn', 'prn' if not contains else contains, print_log=True)
+        total_files = len(file_list)
+        selected = sharding.select_files(file_list, shard, sharding.relative_key(input_folder))
+        file_list = [file for position, file in selected]
+        record["rows"] = len(file_list)
+    no_files = len(file_list)
+
+    data = pd.DataFrame([], columns=summary_columns)
 
     print("File list generated. Parsing data...")
-    logger = utils.LogManager(os.path.join(utils.folder_path(output_file), "summarize_runs.log"))
+    logger = utils.LogManager(sharding.shard_path(os.path.join(utils.folder_path(output_file), "summarize_runs.log"), shard))
 
     for i, file in enumerate(file_list):
-        print(f'Reading from {file}')
-        print(f'{i+1}/{no_files}', end='\r')
+        logger.log_progress(f'{i+1}/{no_files} - Reading from {file}', force=(i+1 == no_files))
         try:
-            run_path = utils.folder_path(file)
-            with open(file) as f:
-                read_data = f.read()
-                tokens = read_data.split('\n')
-                iters = parse_prn(tokens, 'iters')
-                extracted_data = [parse_prn(tokens, 'total_life_loss', 'std'), parse_prn(tokens, 'upland_pvdamage', 'std')] + (
-                    [parse_prn(tokens, data_type) for data_type in  data_types]) + [expected_elevations(run_path, iters), expected_removals(run_path, iters), damaged_structures(run_path)]
-                
+            extracted_data = summarize_prn(file, profiler, from_warehouse)
         except Exception as e:
             logger.log_info(f'Error encountered while parsing {file}')
             # logger.log_info(f'Dumping tokenized file')
             # logger.log_info(tokens)
             logger.log_error(e)
-            extracted_data  = ['Script Error'] * (len(data_types)+5)
+            extracted_data  = ['Script Error'] * (len(prn_data_types)+5)
 
-        extracted_series = pd.Series(extracted_data, index=col_index)
+        extracted_series = pd.Series(extracted_data, index=summary_columns)
         data = data.append([extracted_series], ignore_index=True)
 
     try:
-        data.index = existed_files_without_path
-        data.index.name = 'file_name'
-
-        data = data.reset_index()
-        data['file_path'] = file_list
-        data['folder_path'] = paths
-
-        data['MA'] = data['file_path'].apply(lambda x: utils.derive_ma_code(x))
-
-        data['run_time_hrs'] = data['run_time'].apply(lambda x: x / (60*60) if isinstance(x, float) else x)
-
-        data = data[['file_name', 'file_path', 'folder_path', 'MA', 'simulation_name', 'g2_version', 'g2_start_time', 'run_time', 'run_time_hrs',
-            'slc', 'plan_alt', 'iters', 'g2_assets', 'number_of_storms',
-            'total_life_loss', 'total_life_loss_std', 'upland_pvdamage', 'upland_pvdamage_std', "assets_elevated", "assets_removed", "damaged_structures",      
-            'run_condition', 'seed', 'interest_rate', 'duration', 'basis_time', 'start_time', 'slc_basis_year', 
-            'cum_damage_removal', 'depreciation', 'asset_raising', 'calculate_life_loss']]
+        data = summary_table(data, file_list)
 
-        data.to_csv(output_file, index=False)
+        with profiler.stage("write") as record:
+            data.to_csv(sharding.shard_path(output_file, shard), index=False)
+            sharding.write_shard_index(output_file, shard, total_files, [(position, 1) for position, file in selected])
+            record["rows"] = len(data)
     
     except Exception as e:
         logger.log_info(f'Error encountered during post processing')
@@ -275,4 +351,6 @@ def main(input_folder: str, output_file: str, contains:Union[List[str],str]):
 
 if __name__ == "__main__":
     args, random = get_parser().parse_known_args()
-    main(args.input_folder[0], args.output_file[0], args.contains)
+    profiler = instrumentation.Profiler(args.profile)
+    main(args.input_folder[0], args.output_file[0], args.contains, profiler, args.from_warehouse, args.shard)
+    profiler.write_report(sharding.shard_path(args.output_file[0], args.shard))
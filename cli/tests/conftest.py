@@ -0,0 +1,25 @@
+import os
+import sys
+import pytest
+
+# the cli tools import each other as top level modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils
+import generate_synthetic_outputs
+
+
+@pytest.fixture(autouse=True)
+def native_paths(monkeypatch):
+    """The tools split paths on '\\' (Windows), split on os.sep elsewhere"""
+    if os.sep != "\\":
+        monkeypatch.setattr(utils, "remove_path", os.path.basename)
+        monkeypatch.setattr(utils, "folder_path", os.path.dirname)
+
+
+@pytest.fixture
+def study(tmp_path):
+    """Tiny synthetic study - <tmp_path>/study/<SLC>/<ALT>/<MA>/"""
+    folder = str(tmp_path / "study")
+    generate_synthetic_outputs.main(folder, "tiny")
+    return folder
@@ -0,0 +1,33 @@
+import os
+import sqlite3
+import pandas as pd
+import utils
+import discount_by_structure
+
+
+def test_working_calcs_saved_by_default(study, tmp_path):
+    source = utils.full_paths_by_type(study, "csv", "AssetDamageDetail")[0]
+    output_file = str(tmp_path / "Discounted.csv")
+    working_calcs = discount_by_structure.working_calcs_path(source, str(tmp_path))
+
+    discount_by_structure.main(source, output_file, 2.5, "20300101")
+    assert os.path.exists(working_calcs)
+
+    os.remove(working_calcs)
+    discount_by_structure.main(source, output_file, 2.5, "20300101", working_calcs=False)
+    assert os.path.exists(output_file) and not os.path.exists(working_calcs)
+
+    discount_by_structure.main(source, output_file, 2.5, "20300101", sample_iterations=5)
+    assert not os.path.exists(working_calcs)
+
+
+def test_sqlite_read_with_csv_dtypes(study, tmp_path):
+    source = utils.full_paths_by_type(study, "csv", "AssetDamageDetail")[0]
+    database = str(tmp_path / "Outputs_Intermediate_MA01_FWOP.sqlite")
+    conn = sqlite3.connect(database)
+    pd.read_csv(source).to_sql(discount_by_structure.sqlite_table, conn, index=False)
+    conn.close()
+
+    from_csv = discount_by_structure.read_asset_damage_detail(source, columns=discount_by_structure.input_columns)
+    from_sqlite = discount_by_structure.read_asset_damage_detail(database, columns=discount_by_structure.input_columns)
+    pd.testing.assert_series_equal(from_sqlite.dtypes.sort_index(), from_csv.dtypes.sort_index())
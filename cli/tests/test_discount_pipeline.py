@@ -0,0 +1,24 @@
+import os
+import shutil
+import pandas as pd
+import utils
+import discount_pipeline
+
+
+def test_duplicated_run_folder_is_discounted_once(study, tmp_path):
+    single = str(tmp_path / "single.csv")
+    discount_pipeline.main(study, single, 2.5, "20300101")
+
+    # the same AssetDamageDetail file in a second run folder
+    source = utils.full_paths_by_type(study, "csv", "AssetDamageDetail")[0]
+    copy_folder = os.path.join(study, "rerun")
+    os.makedirs(copy_folder)
+    shutil.copy(source, copy_folder)
+    # and a combined file, which copy_files_to_folder never copies
+    shutil.copy(source, os.path.join(copy_folder, "AssetDamageDetail_Combined_Intermediate_MA01_FWOP.csv"))
+    duplicated = str(tmp_path / "duplicated.csv")
+    discount_pipeline.main(study, duplicated, 2.5, "20300101")
+
+    expected, result = pd.read_csv(single), pd.read_csv(duplicated)
+    assert len(result) == len(expected)
+    assert result["TotalLossPV"].sum() == expected["TotalLossPV"].sum()
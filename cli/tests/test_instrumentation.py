@@ -0,0 +1,16 @@
+import instrumentation
+
+
+def test_nested_stage_keeps_outer_peak():
+    profiler = instrumentation.Profiler(enabled=True)
+    with profiler.stage("outer"):
+        buffer = bytearray(20_000_000)
+        del buffer
+        with profiler.stage("inner"):
+            small = bytearray(1_000_000)
+            del small
+    inner, outer = profiler.records
+    assert inner["stage"] == "inner" and outer["stage"] == "outer"
+    assert inner["peak_traced_mb"] < 10
+    assert outer["peak_traced_mb"] >= 20
+    assert set(instrumentation.report_columns) <= set(outer)
@@ -0,0 +1,33 @@
+import os
+import utils
+import summarize_runs
+import life_loss_aggregation
+import convergence_diagnostics
+import top_damaged_assets
+
+
+def unfinish_runs(study):
+    """Cut every prn before its results, as G2CRM leaves it while running"""
+    for prn in utils.full_paths_by_type(study, "prn", []):
+        with open(prn) as f:
+            head = f.read().split("\n")[:3]
+        with open(prn, "w") as f:
+            f.write("\n".join(head))
+
+
+def test_finished_prn_gives_iterations(study):
+    file = utils.full_paths_by_type(study, "csv", ["AssetDamageDetail"])[0]
+    assert isinstance(summarize_runs.run_iterations(file), int)
+
+
+def test_unfinished_prn_falls_back_to_file(study, tmp_path):
+    unfinish_runs(study)
+    file = utils.full_paths_by_type(study, "csv", ["AssetDamageDetail"])[0]
+    assert summarize_runs.run_iterations(file) is None
+
+    life_loss_aggregation.main(study, str(tmp_path / "life_loss.csv"))
+    convergence_diagnostics.main(study, str(tmp_path / "convergence.csv"))
+    top_damaged_assets.main(study, str(tmp_path / "top.csv"), ["AssetDamageDetail"])
+    assert os.path.exists(tmp_path / "life_loss.csv")
+    assert os.path.exists(tmp_path / "convergence.csv")
+    assert os.path.exists(tmp_path / "top.csv")
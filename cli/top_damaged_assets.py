@@ -0,0 +1,153 @@
+"""
+v1.2
+
+Top-K damaged structures of a whole study, without aggregating every
+AssetDamageDetail file first.
+
+Files found with utils.full_paths_by_type are grouped by Alternative, SLC and
+ModelArea (utils.derive_*) and streamed in chunks. Per-asset totals of
+value_column (default TotalLossPV) are folded chunk by chunk. Each file is
+divided by its own number of iterations - the 'Number of Iterations' of the
+finished prn file in its run folder, else the last iteration in the file (what
+discount_by_structure divides by). When a group has several files (reruns or
+copies of a run) their totals and iterations are pooled, so the result is the
+mean damage per iteration over all of them and is not double counted. Only
+the totals of the group being read are kept - a bounded heap (heapq) keeps
+the top-K assets of each group and of each Alternative/SLC over all model
+areas. Results are exact.
+
+Output columns:
+    Alternative, SLC, ModelArea ("All" for all model areas), Rank,
+    AssetExternalReference, <value_column>, Share (of the group total)
+
+python top_damaged_assets.py --help
+python top_damaged_assets.py --input_folder "C:/Runs" --output_file "C:/TopAssets.csv" --top 20
+
+Changelog:
+
+19OCT2026 v1.0
+19OCT2026 v1.1 - Groups with several files are averaged over the iterations of every file instead of summed
+19OCT2026 v1.2 - Says when a file is divided by its last iteration because its prn is missing or unfinished
+"""
+import argparse
+import heapq
+from typing import Dict, List, Tuple
+import pandas as pd
+import utils
+import instrumentation
+import summarize_runs
+
+# rows per chunk while streaming csv files
+chunksize = 200000
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description="Top-K damaged structures by model area and alternative")
+    parser.add_argument(
+        '-i',
+        '--input_folder',
+        help='Path to input folder containing AssetDamageDetail files')
+    parser.add_argument(
+        '-o',
+        '--output_file',
+        help='Path to output file')
+    parser.add_argument(
+        '-c',
+        '--contains',
+        nargs='+',
+        default=[],
+        help='Unique str identifier e.g. FWOP, S1, Intermediate, etc.')
+    parser.add_argument(
+        '-k',
+        '--top',
+        type=int,
+        default=20,
+        help='Number of assets kept per model area and alternative')
+    parser.add_argument(
+        '-v',
+        '--value_column',
+        default='TotalLossPV',
+        help='Damage column used to rank assets')
+    instrumentation.add_profile_argument(parser)
+    return parser
+
+
+class TopK:
+    """Bounded min-heap of the k largest (value, asset)"""
+
+    def __init__(self, k: int):
+        self.k = k
+        self.heap = []
+        self.total = 0.0
+
+    def push(self, value: float, asset: str):
+        self.total += value
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, (value, asset))
+        elif value > self.heap[0][0]:
+            heapq.heapreplace(self.heap, (value, asset))
+
+    def ranked(self) -> List[Tuple[float, str]]:
+        return sorted(self.heap, reverse=True)
+
+
+def asset_means(files: List[str], value_column: str) -> pd.Series:
+    """Mean value_column per iteration by asset, pooled over files each with its own number of iterations"""
+    totals = pd.Series(dtype="float64")
+    no_iters = 0
+    columns = ["Iteration", "AssetExternalReference", value_column]
+    for file in files:
+        last_iteration = 0
+        with utils.open_data(file) as f:
+            for chunk in pd.read_csv(f, chunksize=chunksize, **utils.csv_read_args(file, columns)):
+                totals = totals.add(chunk.groupby("AssetExternalReference")[value_column].sum(), fill_value=0)
+                last_iteration = max(last_iteration, int(chunk["Iteration"].max()) if len(chunk) else 0)
+        file_iterations = summarize_runs.run_iterations(file)
+        if file_iterations is None:
+            print(f"No finished prn file next to {utils.remove_path(file)}, divided by its last iteration {last_iteration}")
+        no_iters += file_iterations or last_iteration
+    return totals / no_iters if no_iters else totals
+
+
+def main(input_folder: str, output_file: str, contains: List[str] = [], top: int = 20, value_column: str = "TotalLossPV",
+    profiler: instrumentation.Profiler = None):
+
+    profiler = profiler or instrumentation.Profiler()
+    with profiler.stage("discover") as record:
+        files = utils.full_paths_by_type(input_folder, "csv", ["AssetDamageDetail"] + list(contains))
+        record["rows"] = len(files)
+
+    # (Alternative, SLC, ModelArea) -> files
+    groups: Dict[Tuple[str, str, str], List[str]] = {}
+    for file in files:
+        groups.setdefault((utils.derive_alt(file), utils.derive_slc(file), utils.derive_ma_code(file)), []).append(file)
+
+    heaps: Dict[Tuple[str, str, str], TopK] = {}
+    for i, (key, group_files) in enumerate(sorted(groups.items())):
+        print(f"{str(i+1).zfill(2)}/{len(groups)} - Streaming {', '.join(utils.remove_path(x) for x in group_files)}")
+        with profiler.stage("fold", group_files[0]) as record:
+            means = asset_means(group_files, value_column)
+            record["rows"] = len(means)
+        group_heap = heaps.setdefault(key, TopK(top))
+        overall_heap = heaps.setdefault((key[0], key[1], "All"), TopK(top))
+        for asset, value in means.items():
+            group_heap.push(value, asset)
+            overall_heap.push(value, asset)
+
+    rows = []
+    for (alt, slc, ma), heap in sorted(heaps.items()):
+        for rank, (value, asset) in enumerate(heap.ranked(), 1):
+            rows.append([alt, slc, ma, rank, asset, value, value / heap.total if heap.total else None])
+
+    with profiler.stage("write") as record:
+        data = pd.DataFrame(rows, columns=["Alternative", "SLC", "ModelArea", "Rank", "AssetExternalReference", value_column, "Share"])
+        data.to_csv(output_file, index=False)
+        record["rows"] = len(data)
+    print(f"Saved top {top} assets of {len(groups)} model area/alternative groups to {output_file}")
+
+
+if __name__ == "__main__":
+    args, random = get_parser().parse_known_args()
+    profiler = instrumentation.Profiler(args.profile)
+    main(args.input_folder, args.output_file, args.contains, args.top, args.value_column, profiler)
+    profiler.write_report(args.output_file)
@@ -1,5 +1,5 @@
 """
-v1.8
+v1.18
 
 General utils to support CSRM simulation.
 
@@ -16,45 +16,208 @@ Fixed filter to work with str 'filename_contains' in full_paths_by_type
 
 04MAR2021 v1.8
 Add arg to hide logging in full_paths_by_type
+
+19OCT2026 v1.9
+full_paths_by_type also returns gzip/zstd compressed variants (*.csv.gz, 
+*.csv.zst). Added open_data to stream plain or compressed files.
+
+19OCT2026 v1.10
+LogManager writes through a queue on a background thread, does not add
+duplicate handlers for the same log file and has a rate-limited log_progress.
+
+19OCT2026 v1.11
+Added schemas registry and csv_read_args for usecols/dtype pushdown.
+
+19OCT2026 v1.12
+Added sample_iterations and sample_standard_error for quick-look runs.
+
+19OCT2026 v1.13
+derive_prefix knows ModeledAreaStormDetail_ and StormDamages_, and no longer
+mistakes StormEvent_ files for Event_ files.
+
+19OCT2026 v1.14
+Added IterationYear_ schema.
+
+19OCT2026 v1.15
+Added AssetLifeLoss_ schema.
+
+19OCT2026 v1.16
+Added DiscountedIterations_ prefix and schema.
+
+19OCT2026 v1.17
+LogManager uses one logger per log file so each file only gets its own records.
+
+19OCT2026 v1.18
+sample_standard_error uses the (1 - n/N) finite population correction that goes
+with the ddof=1 sample variance.
 """
 
 import glob
 import os
+import io
+import gzip
 import shutil
 from typing import List, Union
 import re
 import datetime
 import logging
+import logging.handlers
+import queue
+import random
+import atexit
+import time
 import sys
 import datetime
 
+try:
+    import zstandard # optional - only needed for *.zst files
+except ImportError:
+    zstandard = None
+
+# compressed file extension -> compression name
+compression_extensions = {"gz": "gzip", "zst": "zstd"}
+
+# Known columns and compact dtypes of G2CRM csv outputs by file prefix (see
+# derive_prefix). "datetime" columns are parsed with parse_dates.
+asset_event_schema = {
+    "Iteration": "int32",
+    "Time": "datetime",
+    "AssetID": "int32",
+    "AssetExternalReference": "str"}
+
+asset_damage_detail_schema = {
+    "Iteration": "int32",
+    "StormID": "int32",
+    "Time": "datetime",
+    "AssetID": "int32",
+    "AssetExternalReference": "str",
+    "MaxStormStage": "float64",
+    "ValueLossStructure": "float64",
+    "ValueLossContents": "float64",
+    "TotalLoss": "float64",
+    "DiscountFactor": "float64",
+    "ValueLossStructurePV": "float64",
+    "ValueLossContentsPV": "float64",
+    "TotalLossPV": "float64"}
+
+schemas = {
+    "AssetDamageDetail": asset_damage_detail_schema,
+    "AssetRaising": asset_event_schema,
+    "RemovedAssets": asset_event_schema,
+    "ModeledAreaStormDetail": {
+        "Iteration": "int32",
+        "StormID": "int32",
+        "DaysFromStartOfIteration": "float64",
+        "Time": "datetime",
+        "ModeledAreaID": "int32",
+        "MaxStageInterior": "float64",
+        "MaxStageExterior": "float64",
+        "StormSurge": "float64",
+        "Tide": "float64",
+        "TotalDamage": "float64"},
+    "WorkingCalculations": dict(asset_damage_detail_schema, **{
+        "DiscountFactor_Script": "float64",
+        "ValueLossStructurePV_Script": "float64",
+        "ValueLossContentsPV_Script": "float64",
+        "TotalLossPV_Script": "float64"}),
+    "AssetLifeLoss": {
+        "Iteration": "int32",
+        "StormID": "int32",
+        "Time": "datetime",
+        "AssetID": "int32",
+        "AssetExternalReference": "str",
+        "LifeLossUnder65": "float64",
+        "LifeLossOver65": "float64",
+        "TotalLifeLoss": "float64"},
+    "IterationYear": {
+        "Iteration": "int32",
+        "Year": "int32",
+        "NumberOfStorms": "int32",
+        "ValueLossStructure": "float64",
+        "ValueLossContents": "float64",
+        "TotalLoss": "float64",
+        "TotalLossPV": "float64"},
+    "DiscountedDamages": {
+        "AssetExternalReference": "str",
+        "ValueLossStructurePV": "float64",
+        "ValueLossContentsPV": "float64",
+        "TotalLossPV": "float64"},
+    "DiscountedIterations": {
+        "AssetExternalReference": "str",
+        "Iteration": "int32",
+        "ValueLossStructurePV": "float64",
+        "ValueLossContentsPV": "float64",
+        "TotalLossPV": "float64"},
+}
+
+# normal quantile of the 95% confidence intervals reported for sampled estimates
+confidence_z = 1.96
+
 
 class LogManager:
-    """Cookie cutter logging manager - writes to console and file"""
-    logger = logging.getLogger(__name__)
+    """
+    Cookie cutter logging manager - writes to console and file.
+    Records are queued and written by a background QueueListener thread so
+    slow (network) log files never block processing. Creating several
+    LogManagers with the same file path does not duplicate handlers. Each log
+    file has its own logger and only receives the records of that logger.
+    """
+    log_queue = None
+    listener = None
+    # log file path -> logger
+    loggers = {}
 
-    def __init__(self, filePath):
-        self.setupLogger(filePath)
+    def __init__(self, filePath, progress_interval: float = 1.0):
+        self.logger = self.setupLogger(filePath)
         self.logger.setLevel(logging.DEBUG)
+        # min seconds between two progress messages
+        self.progress_interval = progress_interval
+        self.last_progress = 0.0
 
     def setupLogger(self, filePath):
-        """Set up console and file handlers"""
-        # console handler
-        cHandler = logging.StreamHandler(sys.stdout)
-        cHandler.setLevel(logging.INFO)
-        # file handler
+        """Set up console and file handlers behind a shared queue"""
+        cls = LogManager
+        if cls.listener is None:
+            # console handler
+            cHandler = logging.StreamHandler(sys.stdout)
+            cHandler.setLevel(logging.INFO)
+            cHandler.setFormatter(logging.Formatter('%(message)s'))
+
+            cls.log_queue = queue.SimpleQueue()
+            cls.listener = logging.handlers.QueueListener(cls.log_queue, cHandler, respect_handler_level=True)
+            cls.listener.start()
+            atexit.register(cls.stop)
+
+        filePath = os.path.abspath(filePath)
+        if filePath in cls.loggers:
+            return cls.loggers[filePath]
+        logger = logging.getLogger(f"{__name__}.LogManager[{len(cls.loggers)}]")
+        logger.propagate = False
+        logger.addHandler(logging.handlers.QueueHandler(cls.log_queue))
+        # file handler - only records of its own logger, progress messages are console only
         fHandler = logging.FileHandler(filePath, mode='a') 
         fHandler.setLevel(logging.INFO)
-
-        cFormatter = logging.Formatter(
-            '%(message)s')
-        fFormatter = logging.Formatter(
-            '%(asctime)s - %(levelname)s - %(message)s', '%m/%d/%Y %H:%M:%S')
-        
-        cHandler.setFormatter(cFormatter)
-        fHandler.setFormatter(fFormatter)
-        self.logger.addHandler(cHandler)
-        self.logger.addHandler(fHandler)
+        fHandler.setFormatter(logging.Formatter(
+            '%(asctime)s - %(levelname)s - %(message)s', '%m/%d/%Y %H:%M:%S'))
+        fHandler.addFilter(lambda record, name=logger.name: record.name == name and not getattr(record, 'progress', False))
+        cls.listener.handlers = cls.listener.handlers + (fHandler,)
+        cls.loggers[filePath] = logger
+        return logger
+
+    @classmethod
+    def stop(cls):
+        """Flush queued records and close handlers"""
+        if cls.listener is None:
+            return
+        cls.listener.stop()
+        for handler in cls.listener.handlers:
+            handler.close()
+        for logger in cls.loggers.values():
+            for handler in list(logger.handlers):
+                if isinstance(handler, logging.handlers.QueueHandler):
+                    logger.removeHandler(handler)
+        cls.listener = None
+        cls.loggers = {}
 
     def log_error(self, exception):
         self.logger.error(exception, exc_info=True)
@@ -65,13 +228,26 @@ class LogManager:
     def log_info(self, msg):
         self.logger.info(msg)
 
+    def log_progress(self, msg, force: bool = False):
+        """Console only progress message, dropped if sent within progress_interval of the last one"""
+        now = time.monotonic()
+        if not force and now - self.last_progress < self.progress_interval:
+            return
+        self.last_progress = now
+        self.logger.info(msg, extra={'progress': True})
+
 
-def full_paths_by_type(directory: str, extension: str, filename_contains: Union[List[str],str], print_log:bool=False):
-    """Generate a list of filepaths based on extension and substr contained in filename"""
-    extension = "*." + extension
+def full_paths_by_type(directory: str, extension: str, filename_contains: Union[List[str],str], print_log:bool=False, compressed:bool=True):
+    """
+    Generate a list of filepaths based on extension and substr contained in filename.
+    Compressed variants (e.g. *.csv.gz) are included unless compressed=False
+    """
+    extensions = ["*." + extension]
+    if compressed:
+        extensions += ["*." + extension + "." + x for x in compression_extensions]
     if print_log:
-        print(f"Retrieving {extension} file list containing '{filename_contains}' from {directory}")
-    all_files = [file for path, subdir, files in os.walk(directory) for file in glob.glob(os.path.join(path, extension))]
+        print(f"Retrieving {extensions[0]} file list containing '{filename_contains}' from {directory}")
+    all_files = [file for path, subdir, files in os.walk(directory) for ext in extensions for file in glob.glob(os.path.join(path, ext))]
     
     filename_contains = [filename_contains] if isinstance(filename_contains, str) else filename_contains
 
@@ -152,6 +328,7 @@ def derive_prefix(path: str) -> str:
         "AssetStormDetail_",
         "CsvOutputs_",
         "DeploymentEvent_",
+        "StormEvent_", # before Event_ which it contains
         "Event_",
         "FloodBarrierPSEDetail_",
         "Iteration_",
@@ -160,9 +337,9 @@ def derive_prefix(path: str) -> str:
         "MapOutputs_",
         "MessageFile_",
         "ModeledAreaStorm_",
+        "ModeledAreaStormDetail_",
         "ProtectiveSystemElementStorm_",
         "RemovedAssets_",
-        "StormEvent_",
         "Tide_",
         "Timing_",
         "WaveCalculation_",
@@ -204,7 +381,9 @@ def derive_prefix(path: str) -> str:
         "WaterMA_",
         "WetlandMA_",
         "WorkingCalculations_",
-        "DiscountedDamages_"]
+        "DiscountedDamages_",
+        "DiscountedIterations_",
+        "StormDamages_"]
     for prefix in prefixes:
         if re.search(prefix, remove_path(path)):
             break
@@ -218,7 +397,60 @@ def derive_prefix(path: str) -> str:
 
 
 def derive_extension(path:str) -> str:
-    return path.split(".")[-1]
+    """File extension ignoring compression e.g. csv for *.csv.gz"""
+    extensions = path.split(".")
+    if derive_compression(path) and len(extensions) > 2:
+        return extensions[-2]
+    return extensions[-1]
+
+
+def csv_read_args(path: str, columns: List[str] = None) -> dict:
+    """
+    pd.read_csv keyword arguments for a G2CRM csv output based on its prefix.
+    Only 'columns' are read (all if None) with the compact dtypes of the
+    schemas registry. Columns not in the registry keep pandas defaults and
+    datetime columns are only parsed when requested in 'columns'.
+    Usage:
+        data = pd.read_csv(f, **csv_read_args(path, ["Iteration", "TotalLossPV"]))
+    """
+    schema = schemas.get(remove_path(path).split("_")[0], {}) # file names start with the prefix
+    if columns is None:
+        return {"dtype": {col: dtype for col, dtype in schema.items() if dtype != "datetime"}}
+    return {
+        "usecols": list(columns),
+        "dtype": {col: schema[col] for col in columns if col in schema and schema[col] != "datetime"},
+        "parse_dates": [col for col in columns if schema.get(col) == "datetime"] or None}
+
+
+def derive_compression(path: str) -> Union[str, None]:
+    """Compression name (gzip, zstd) based on file extension, None if not compressed"""
+    return compression_extensions.get(path.split(".")[-1].lower())
+
+
+def open_data(path: str, mode: str = "rb", compression: str = "infer"):
+    """
+    Open a plain, gzip or zstd file. Compressed data is (de)compressed in a
+    streaming fashion. Compression is inferred from the extension unless given.
+    Usage:
+        with open_data("AssetDamageDetail_High_MA01_FWOP.csv.gz") as f:
+            data = pd.read_csv(f)
+    """
+    if compression == "infer":
+        compression = derive_compression(path)
+    if compression is None:
+        return open(path, mode)
+    if compression == "gzip":
+        return gzip.open(path, mode)
+    if compression == "zstd":
+        if zstandard is None:
+            raise Exception(f"zstandard package is required to open {path}")
+        raw = open(path, mode.replace("t", "") + ("" if "b" in mode else "b"))
+        if "r" in mode:
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        else:
+            stream = zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+        return io.TextIOWrapper(stream) if "t" in mode else stream
+    raise Exception(f"Unknown compression {compression}")
 
 
 def derive_ma_code(path: str):
@@ -248,6 +480,35 @@ def derive_ma_code(path: str):
     return ma
 
 
+def sample_iterations(iterations, sample_size: int, seed: int = 0) -> List[int]:
+    """
+    Sorted random sample of sample_size iterations, the same for the same seed
+    (all iterations if sample_size is not smaller than their number)
+    Usage:
+        sample_iterations(range(1, 10001), 100, seed=0)
+    """
+    iterations = sorted(iterations)
+    if sample_size >= len(iterations):
+        return iterations
+    return sorted(random.Random(seed).sample(iterations, sample_size))
+
+
+def sample_standard_error(sums, sum_squares, sample_size: int, population_size: int):
+    """
+    Standard error of the mean of sample_size values drawn without replacement
+    from population_size values, given the sum and sum of squares of the sample.
+    Works with numbers, numpy arrays and pandas objects.
+    """
+    if sample_size < 2:
+        raise Exception("At least 2 sampled iterations are needed to estimate a standard error")
+    mean = sums / sample_size
+    variance = (sum_squares - sample_size * mean**2) / (sample_size - 1)
+    variance = variance * (variance > 0) # rounding can make a zero variance negative
+    # finite population correction of the ddof=1 sample variance
+    correction = 1 - sample_size / population_size if population_size else 0
+    return (variance * correction / sample_size) ** 0.5
+
+
 def filter_data_files():
     raise NotImplementedError
 
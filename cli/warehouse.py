@@ -0,0 +1,255 @@
+"""
+v1.1
+
+Indexed SQLite results warehouse for post processing queries.
+
+Loads AssetDamageDetail, AssetRaising and RemovedAssets csv files and the prn
+run summaries of many runs into one local SQLite database. Every row is
+tagged with ModelArea, SLC and Alternative (utils.derive_*), its run folder
+and source file. Indexes on (Alternative, SLC, ModelArea, AssetExternalReference,
+Iteration) let the tools answer with indexed queries (--from_warehouse)
+instead of scanning csv files:
+
+    discount_by_structure, multiple_discount_by_structure,
+    calculate_cumulative_damage_by_storm_stage, summarize_runs
+
+Files are ingested incrementally - unchanged files (same size and mtime) are
+skipped and changed files are replaced.
+
+python warehouse.py --help
+python warehouse.py --input_folder "C:/Runs" --warehouse "C:/warehouse.sqlite"
+
+Changelog:
+
+19OCT2026 v1.0
+19OCT2026 v1.1 - query_file reads the rows of one ingested source file, query_file
+and count_run_rows raise when no ingested file matches, prn summaries no longer
+fail on the duplicate slc column
+"""
+import argparse
+import os
+import sqlite3
+from typing import List
+import pandas as pd
+import utils
+
+# file prefix -> warehouse table
+tables = {
+    "AssetDamageDetail": "asset_damage_detail",
+    "AssetRaising": "asset_raising",
+    "RemovedAssets": "removed_assets",
+}
+summary_table = "run_summary"
+
+tag_columns = ["ModelArea", "SLC", "Alternative", "RunFolder", "SourceFile"]
+
+# table -> indexes (list of columns each)
+indexes = {
+    "asset_damage_detail": [["Alternative", "SLC", "ModelArea", "AssetExternalReference", "Iteration"], ["RunFolder"], ["SourceFile"]],
+    "asset_raising": [["Alternative", "SLC", "ModelArea", "AssetExternalReference", "Iteration"], ["RunFolder"], ["SourceFile"]],
+    "removed_assets": [["Alternative", "SLC", "ModelArea", "AssetExternalReference", "Iteration"], ["RunFolder"], ["SourceFile"]],
+    "run_summary": [["Alternative", "SLC", "ModelArea"], ["RunFolder"], ["SourceFile"]],
+}
+
+# rows per csv chunk while ingesting
+chunksize = 200000
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description="Ingest G2CRM outputs into an indexed SQLite warehouse")
+    parser.add_argument(
+        '-i',
+        '--input_folder',
+        nargs='+',
+        help='Path to input folder(s) containing run output folders')
+    parser.add_argument(
+        '-w',
+        '--warehouse',
+        help='Path to warehouse sqlite file (created if missing)')
+    parser.add_argument(
+        '-c',
+        '--contains',
+        nargs='+',
+        default=[],
+        help='Unique str identifier e.g. FWOP, S1, Intermediate, etc.')
+    return parser
+
+
+def connect(warehouse_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(warehouse_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ingested_files (
+            SourceFile TEXT PRIMARY KEY, TableName TEXT, Size INTEGER, MTime REAL)""")
+    return conn
+
+
+def file_tags(path: str) -> dict:
+    """Warehouse tag columns for a G2CRM output file"""
+    return {
+        "ModelArea": utils.derive_ma_code(path),
+        "SLC": utils.derive_slc(path),
+        "Alternative": utils.derive_alt(path),
+        "RunFolder": utils.folder_path(path),
+        "SourceFile": path}
+
+
+def table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')]
+
+
+def append_rows(conn: sqlite3.Connection, table: str, data: pd.DataFrame):
+    """Append data, adding columns missing from the table (e.g. newer G2CRM versions)"""
+    existing = table_columns(conn, table)
+    if existing:
+        for col in data.columns:
+            if col not in existing:
+                conn.execute(f'ALTER TABLE "{table}" ADD COLUMN "{col}"')
+    data.to_sql(table, conn, if_exists="append", index=False)
+
+
+def needs_ingest(conn: sqlite3.Connection, path: str, table: str) -> bool:
+    """False if file was ingested with the same size and mtime. Removes stale rows otherwise"""
+    stat = os.stat(path)
+    row = conn.execute("SELECT Size, MTime FROM ingested_files WHERE SourceFile = ?", (path,)).fetchone()
+    if row == (stat.st_size, stat.st_mtime):
+        return False
+    if row is not None and table_columns(conn, table):
+        conn.execute(f'DELETE FROM "{table}" WHERE SourceFile = ?', (path,))
+    return True
+
+
+def mark_ingested(conn: sqlite3.Connection, path: str, table: str):
+    stat = os.stat(path)
+    conn.execute("INSERT OR REPLACE INTO ingested_files VALUES (?, ?, ?, ?)", (path, table, stat.st_size, stat.st_mtime))
+
+
+def ingest_csv(conn: sqlite3.Connection, path: str, table: str) -> int:
+    """Load a csv file in chunks, returns number of rows"""
+    tags = file_tags(path)
+    rows = 0
+    with utils.open_data(path) as f:
+        for chunk in pd.read_csv(f, chunksize=chunksize, low_memory=False, **utils.csv_read_args(path)):
+            for col, value in tags.items():
+                chunk[col] = value
+            append_rows(conn, table, chunk)
+            rows += len(chunk)
+    return rows
+
+
+def ingest_prn(conn: sqlite3.Connection, path: str) -> int:
+    """Load the prn summary of a finished run, returns 1 if loaded"""
+    import summarize_runs # imported here as summarize_runs also uses this module
+    with utils.open_data(path, 'rt') as f:
+        tokens = f.read().split('\n')
+    if summarize_runs.parse_prn(tokens, 'iters') == 'Unfinished Run':
+        return 0
+    summary = {data_type: summarize_runs.parse_prn(tokens, data_type) for data_type in summarize_runs.prn_data_types}
+    summary['total_life_loss_std'] = summarize_runs.parse_prn(tokens, 'total_life_loss', 'std')
+    summary['upland_pvdamage_std'] = summarize_runs.parse_prn(tokens, 'upland_pvdamage', 'std')
+    tags = file_tags(path)
+    # sqlite column names are case insensitive, the tags replace prn values like 'slc'
+    summary = {key: value for key, value in summary.items() if key.lower() not in [x.lower() for x in tags]}
+    summary.update(tags)
+    append_rows(conn, summary_table, pd.DataFrame([summary]))
+    return 1
+
+
+def create_indexes(conn: sqlite3.Connection):
+    for table, table_indexes in indexes.items():
+        if not table_columns(conn, table):
+            continue
+        for columns in table_indexes:
+            name = f"idx_{table}_" + "_".join(columns)
+            conn.execute(f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" ({", ".join(columns)})')
+
+
+def source_file(warehouse_path: str, prefix: str, path: str) -> str:
+    """
+    Ingested source file for path - path itself if it was ingested, else the
+    only ingested file with the same name. Raises if none or several match
+    """
+    files = ingested_files(warehouse_path, prefix)
+    if path in files:
+        return path
+    matches = [x for x in files if utils.remove_path(x) == utils.remove_path(path)]
+    if not matches:
+        raise Exception(f"{path} was not ingested into {warehouse_path}")
+    if len(matches) > 1:
+        raise Exception(f"Several ingested files are named like {path}, use the full path: {', '.join(matches)}")
+    return matches[0]
+
+
+def query_file(warehouse_path: str, prefix: str, path: str, columns: List[str] = None, parse_dates: List[str] = None) -> pd.DataFrame:
+    """
+    Rows of the table for 'prefix' ingested from path (see source_file), e.g.
+    query_file(db, "AssetDamageDetail", "C:/Runs/MA01/AssetDamageDetail_High_MA01_FWOP.csv")
+    """
+    source = source_file(warehouse_path, prefix, path)
+    select = ", ".join(f'"{col}"' for col in columns) if columns else "*"
+    conn = connect(warehouse_path)
+    data = pd.read_sql(
+        f'SELECT {select} FROM "{tables[prefix]}" WHERE SourceFile = ?',
+        conn, params=(source,), parse_dates=parse_dates)
+    conn.close()
+    if columns is None:
+        data = data.drop(columns=tag_columns)
+    return data
+
+
+def count_run_rows(warehouse_path: str, prefix: str, run_folder: str) -> int:
+    """Number of rows of the table for 'prefix' that came from run_folder, raises if no file of run_folder was ingested"""
+    if not any(utils.folder_path(x) == run_folder for x in ingested_files(warehouse_path, prefix)):
+        raise Exception(f"No {prefix} file of {run_folder} was ingested into {warehouse_path}")
+    conn = connect(warehouse_path)
+    count = conn.execute(f'SELECT COUNT(*) FROM "{tables[prefix]}" WHERE RunFolder = ?', (run_folder,)).fetchone()[0]
+    conn.close()
+    return count
+
+
+def ingested_files(warehouse_path: str, prefix: str, folder: str = None) -> List[str]:
+    """Source files ingested for 'prefix', optionally only those under folder"""
+    conn = connect(warehouse_path)
+    files = [row[0] for row in conn.execute(
+        "SELECT SourceFile FROM ingested_files WHERE TableName = ? ORDER BY SourceFile", (tables[prefix],))]
+    conn.close()
+    return [x for x in files if folder is None or x.startswith(folder)]
+
+
+def main(input_folders: List[str], warehouse_path: str, contains: List[str] = []):
+
+    logger = utils.LogManager(os.path.join(utils.folder_path(os.path.abspath(warehouse_path)), "warehouse.log"))
+    conn = connect(warehouse_path)
+
+    jobs = []
+    for input_folder in input_folders:
+        for prefix, table in tables.items():
+            jobs += [(file, table) for file in utils.full_paths_by_type(input_folder, "csv", [prefix] + list(contains))]
+        jobs += [(file, summary_table) for file in utils.full_paths_by_type(input_folder, "prn", ["."] + list(contains))]
+
+    skip_count = 0
+    for i, (file, table) in enumerate(jobs):
+        if not needs_ingest(conn, file, table):
+            skip_count += 1
+            continue
+        logger.log_progress(f"{str(i+1).zfill(2)}/{len(jobs)} - Ingesting {utils.remove_path(file)}")
+        try:
+            rows = ingest_prn(conn, file) if table == summary_table else ingest_csv(conn, file, table)
+            mark_ingested(conn, file, table)
+            conn.commit()
+            logger.log_info(f"Ingested {rows} rows from {file} into {table}")
+        except Exception as e:
+            conn.rollback()
+            logger.log_info(f"Error encountered while ingesting {file}")
+            logger.log_error(e)
+
+    logger.log_info("Creating indexes")
+    create_indexes(conn)
+    conn.commit()
+    conn.close()
+    logger.log_info(f"Ingested {len(jobs) - skip_count} files - skipped {skip_count} unchanged files - warehouse {warehouse_path}")
+
+
+if __name__ == "__main__":
+    args, random = get_parser().parse_known_args()
+    main(args.input_folder, args.warehouse, args.contains)
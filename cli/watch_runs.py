@@ -0,0 +1,246 @@
+"""
+v1.1
+
+Watch a folder tree and post process G2CRM runs as soon as they finish,
+instead of waiting for all runs and batch processing them.
+
+Every --interval seconds the tree is polled with os.scandir. Directory
+mtimes are cached so only directories with new or removed entries are listed
+again. A run is finished when its prn file passes the summarize_runs.parse_prn
+'Unfinished Run' check - unfinished prn files are checked again when their
+size or mtime changes. prn files that cannot be read yet (locked while G2CRM
+writes them on Windows) or parsed (partially written) are treated as
+unfinished. For each finished run:
+
+    - its summarize_runs row is added to (or replaced in) output_file
+    - with --discounted_folder, its AssetDamageDetail files are discounted with
+      multiple_discount_by_structure into that folder
+
+Processed runs (prn size and mtime) are saved in watch_runs_state.json next to
+output_file, so a restarted watcher only processes new or re-run runs.
+
+python watch_runs.py --help
+python watch_runs.py --input_folder "C:/Runs" --output_file "C:/summary.csv" --interval 60
+    --discounted_folder "C:/Discounted" --discount_rate 2.5 --base_timestamp 20300101
+
+Changelog:
+
+19OCT2026 v1.0
+19OCT2026 v1.1 - Locked or partially written prn files no longer stop the watcher
+"""
+import argparse
+import io
+import json
+import os
+import time
+from typing import Dict, List, Tuple
+import pandas as pd
+import utils
+import summarize_runs
+import multiple_discount_by_structure
+
+state_file_name = "watch_runs_state.json"
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description="Post process G2CRM runs as they finish")
+    parser.add_argument(
+        '-i',
+        '--input_folder',
+        help='Path to master folder containing run output folders')
+    parser.add_argument(
+        '-o',
+        '--output_file',
+        help='Path to summary csv file, updated after each finished run')
+    parser.add_argument(
+        '-c',
+        '--contains',
+        nargs='+',
+        default=[],
+        help='Unique str identifier of the prn files e.g. FWOP, S1, Intermediate, etc.')
+    parser.add_argument(
+        '-n',
+        '--interval',
+        type=float,
+        default=60,
+        help='Seconds between polls of the input folder')
+    parser.add_argument(
+        '--once',
+        action='store_true',
+        help='Poll once, process finished runs and exit')
+    parser.add_argument(
+        '--discounted_folder',
+        help='Optional - discount AssetDamageDetail files of each finished run into this folder')
+    parser.add_argument(
+        '-r',
+        '--discount_rate',
+        type=float,
+        help='Discount rate in percentage, with --discounted_folder')
+    parser.add_argument(
+        '-b',
+        '--base_timestamp',
+        help='Base timestamp in format YYYYMMDD, with --discounted_folder')
+    return parser
+
+
+class TreeScanner:
+    """
+    Lists prn files under root with os.scandir. Each poll only stats the known
+    directories - a directory is listed again only when its mtime changed.
+    """
+
+    def __init__(self, root: str, contains: List[str] = []):
+        self.root = root
+        self.contains = list(contains)
+        self.extensions = [".prn"] + [".prn." + x for x in utils.compression_extensions]
+        # directory -> (mtime, subdirectories, prn files)
+        self.dirs: Dict[str, Tuple[float, List[str], List[str]]] = {}
+
+    def list_dir(self, path: str, mtime: float) -> Tuple[float, List[str], List[str]]:
+        subdirs, files = [], []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.name.endswith(tuple(self.extensions)) and all(x in entry.name for x in self.contains):
+                    files.append(entry.path)
+        return mtime, sorted(subdirs), sorted(files)
+
+    def scan(self) -> List[str]:
+        prn_files = []
+        seen = set()
+        stack = [self.root]
+        while stack:
+            path = stack.pop()
+            try:
+                mtime = os.stat(path).st_mtime
+                cached = self.dirs.get(path)
+                if cached is None or cached[0] != mtime:
+                    cached = self.dirs[path] = self.list_dir(path, mtime)
+            except FileNotFoundError:
+                continue
+            seen.add(path)
+            stack.extend(reversed(cached[1]))
+            prn_files.extend(cached[2])
+        # forget removed directories
+        for path in set(self.dirs) - seen:
+            del self.dirs[path]
+        return prn_files
+
+
+def run_finished(prn_file: str) -> bool:
+    with utils.open_data(prn_file, 'rt') as f:
+        tokens = f.read().split('\n')
+    return summarize_runs.parse_prn(tokens, 'iters') != 'Unfinished Run'
+
+
+def load_state(state_path: str) -> dict:
+    """prn file -> [size, mtime] of processed runs"""
+    if not os.path.exists(state_path):
+        return {}
+    with open(state_path) as f:
+        return json.load(f)
+
+
+def save_state(state_path: str, state: dict):
+    """Write state through a temp file so it is never left half written"""
+    with open(state_path + ".part", "w") as f:
+        json.dump(state, f, indent=1)
+    os.replace(state_path + ".part", state_path)
+
+
+def update_summary(output_file: str, prn_file: str, logger: utils.LogManager, replace: bool = False):
+    """Add the summarize_runs row of prn_file to output_file, replacing an older row of the same run"""
+    try:
+        extracted_data = summarize_runs.summarize_prn(prn_file)
+    except Exception as e:
+        logger.log_info(f'Error encountered while parsing {prn_file}')
+        logger.log_error(e)
+        extracted_data = ['Script Error'] * (len(summarize_runs.prn_data_types)+5)
+    row = summarize_runs.summary_table(pd.DataFrame([pd.Series(extracted_data, index=summarize_runs.summary_columns)]), [prn_file])
+
+    if replace and os.path.exists(output_file):
+        data = pd.read_csv(output_file, dtype=str, keep_default_na=False)
+        data = data[data['file_path'] != prn_file]
+        # round trip the new row through csv text so existing rows are written back unchanged
+        row = pd.read_csv(io.StringIO(row.to_csv(index=False)), dtype=str, keep_default_na=False)
+        pd.concat([data, row], ignore_index=True).to_csv(output_file, index=False)
+    else:
+        row.to_csv(output_file, mode='a', header=not os.path.exists(output_file), index=False)
+
+
+def process_run(prn_file: str, output_file: str, logger: utils.LogManager, replace: bool = False,
+    discounted_folder: str = None, discount_rate: float = None, base_timestamp: str = None):
+    run_folder = utils.folder_path(prn_file)
+    update_summary(output_file, prn_file, logger, replace)
+    if discounted_folder:
+        try:
+            multiple_discount_by_structure.main(run_folder, discounted_folder, discount_rate, base_timestamp)
+        except Exception as e:
+            logger.log_info(f'Error encountered while discounting {run_folder}')
+            logger.log_error(e)
+    logger.log_info(f"Processed finished run {run_folder}")
+
+
+def poll(scanner: TreeScanner, state: dict, pending: dict, state_path: str, output_file: str, logger: utils.LogManager,
+    **post_processing) -> int:
+    """Process runs finished since the last poll, returns their number"""
+    processed = 0
+    for prn_file in scanner.scan():
+        try:
+            stat = os.stat(prn_file)
+        except FileNotFoundError:
+            continue
+        signature = [stat.st_size, stat.st_mtime]
+        if state.get(prn_file) == signature or pending.get(prn_file) == signature:
+            continue
+        try:
+            finished = run_finished(prn_file)
+        except OSError:
+            # locked by the running model, checked again next poll
+            continue
+        except Exception:
+            # partially written, checked again when it changes
+            finished = False
+        if not finished:
+            pending[prn_file] = signature
+            continue
+        pending.pop(prn_file, None)
+        process_run(prn_file, output_file, logger, replace=prn_file in state, **post_processing)
+        state[prn_file] = signature
+        save_state(state_path, state)
+        processed += 1
+    return processed
+
+
+def main(input_folder: str, output_file: str, contains: List[str] = [], interval: float = 60, once: bool = False,
+    discounted_folder: str = None, discount_rate: float = None, base_timestamp: str = None):
+
+    if discounted_folder and (discount_rate is None or base_timestamp is None):
+        raise Exception("--discount_rate and --base_timestamp are required with --discounted_folder")
+
+    output_folder = utils.folder_path(output_file)
+    logger = utils.LogManager(os.path.join(output_folder, "watch_runs.log"))
+    state_path = os.path.join(output_folder, state_file_name)
+    state = load_state(state_path)
+    pending = {}
+    scanner = TreeScanner(input_folder, contains)
+    post_processing = {"discounted_folder": discounted_folder, "discount_rate": discount_rate, "base_timestamp": base_timestamp}
+
+    logger.log_info(f"Watching {input_folder} - {len(state)} runs already processed")
+    try:
+        while True:
+            processed = poll(scanner, state, pending, state_path, output_file, logger, **post_processing)
+            logger.log_progress(f"{processed} runs processed - {len(state)} finished, {len(pending)} unfinished runs",
+                force=processed > 0 or once)
+            if once:
+                break
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        logger.log_info("Stopped watching")
+
+
+if __name__ == "__main__":
+    args, random = get_parser().parse_known_args()
+    main(args.input_folder, args.output_file, args.contains, args.interval, args.once,
+        args.discounted_folder, args.discount_rate, args.base_timestamp)
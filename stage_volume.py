@@ -1,5 +1,5 @@
 """
-Stage Volume Input Generator v1.2
+Stage Volume Input Generator v1.4
 
 Generate stage volume inputs required by G2CRM using ArcMap. Requires 
 setting up 5 input params. Variable names do not matter, but they
@@ -35,11 +35,24 @@ Added param ma_field to input model area field specifier name
 v1.2 9/24/2020
 Generate output xlsx instead of csv
     Requires openpyxl package - might not be a standard ArcMap package
+
+v1.3
+Added content-hash cache (stage_volume_cache.json in the output folder).
+An MA is only recalculated when the DEM, its boundary geometry, depth_max
+or start_depth changed since its workbook was written. Entries for MAs
+that no longer exist or whose workbook was deleted are evicted.
+
+v1.4
+A DEM stored in a file geodatabase is fingerprinted by the names, sizes and
+modification times of the .gdb folder files, so edits to it are detected. DEMs
+that are not stored in files (e.g. enterprise geodatabases) are not cached.
 """
 
 import arcpy
 import pandas as pd
 import os
+import hashlib
+import json
 
 ################################
 #   Inputs
@@ -58,6 +71,10 @@ depth_field_name = 'Flood_Model'
 flag_debugging = False # set True to debug - will only run 1 specific MA
 debug_ma = 'MA01a' # specify MA for debug mode
 
+# cache - set False to force recalculation of every MA
+flag_use_cache = True
+cache_file_name = 'stage_volume_cache.json'
+
 ################################
 #   Code Implementation
 ################################
@@ -85,7 +102,92 @@ def move_layer_to_group(mxd, df, layer_name, group_name):
             arcpy.mapping.RemoveLayer(df, lyr)
 
 
-with arcpy.da.SearchCursor(ma_shape_layer, [ma_field], 
+def geodatabase_folder(path):
+    """.gdb folder containing path, None if path is not in a file geodatabase"""
+    while path and os.path.dirname(path) != path:
+        if path.lower().endswith('.gdb') and os.path.isdir(path):
+            return path
+        path = os.path.dirname(path)
+    return None
+
+
+def hash_dem(dem_layer):
+    """
+    Hash of the DEM extent, cell size and raster content, None if the raster
+    is not stored in files. Content is hashed from the files backing the
+    raster (a single file or all files of a grid folder) in 1mb blocks. For a
+    raster inside a file geodatabase the names, sizes and modification times
+    of the .gdb folder files are hashed instead.
+    """
+    desc = arcpy.Describe(dem_layer)
+    md5 = hashlib.md5()
+    extent = desc.extent
+    md5.update(repr((extent.XMin, extent.YMin, extent.XMax, extent.YMax,
+        desc.meanCellWidth, desc.meanCellHeight)).encode('utf-8'))
+    source = desc.catalogPath
+    if os.path.isdir(source):
+        source_files = sorted(os.path.join(path, f) for path, subdir, files in os.walk(source) for f in files)
+    elif os.path.isfile(source):
+        source_files = [source]
+    elif geodatabase_folder(source):
+        gdb = geodatabase_folder(source)
+        md5.update(source.encode('utf-8'))
+        for path, subdir, files in sorted(os.walk(gdb)):
+            for f in sorted(files):
+                if f.lower().endswith('.lock'):
+                    continue # ArcMap lock files change with every session
+                stat = os.stat(os.path.join(path, f))
+                md5.update(repr((os.path.relpath(os.path.join(path, f), gdb), stat.st_size, stat.st_mtime)).encode('utf-8'))
+        source_files = []
+    else:
+        return None
+    for source_file in source_files:
+        with open(source_file, 'rb') as f:
+            for block in iter(lambda: f.read(1024*1024), b''):
+                md5.update(block)
+    return md5.hexdigest()
+
+
+def ma_cache_key(dem_hash, geometry_wkb):
+    """Cache key of a MA - DEM hash, boundary geometry and depth range"""
+    md5 = hashlib.md5()
+    md5.update(dem_hash.encode('utf-8'))
+    md5.update(bytes(geometry_wkb))
+    md5.update(repr((depth_max, start_depth)).encode('utf-8'))
+    return md5.hexdigest()
+
+
+def load_cache(cache_path):
+    if not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path) as f:
+            return json.load(f)
+    except ValueError:
+        arcpy.AddWarning('Unable to read cache ' + cache_path + ' - recalculating all MAs')
+        return {}
+
+
+def save_cache(cache_path, cache):
+    # write to temp file first so an interrupted run never corrupts the cache
+    temp_path = cache_path + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    if os.path.exists(cache_path):
+        os.remove(cache_path)
+    os.rename(temp_path, cache_path)
+
+
+cache_path = os.path.join(output_folder, cache_file_name)
+cache = load_cache(cache_path) if flag_use_cache else {}
+dem_hash = hash_dem(dem_layer) if flag_use_cache else None
+if flag_use_cache and dem_hash is None:
+    arcpy.AddMessage('DEM is not stored in files - cache disabled')
+    flag_use_cache = False
+seen_mas = []
+skip_count = 0
+
+with arcpy.da.SearchCursor(ma_shape_layer, [ma_field, 'SHAPE@WKB'], 
     where_clause=(ma_field + " = \'" + debug_ma + "'" if flag_debugging else None)) as cur: # debugging
 # with arcpy.da.SearchCursor(ma_shape_layer, ['MA', 'Plan_Areas'], where_clause="") as cur: # debugging
 # with arcpy.da.SearchCursor(ma_shape_layer, ['MA', 'Plan_Areas']) as cur:
@@ -95,6 +197,19 @@ with arcpy.da.SearchCursor(ma_shape_layer, [ma_field],
         arcpy.AddMessage('-----------')
         arcpy.AddMessage(str(i+1) + '/' + (str(1) if flag_debugging else str(len_ma)) + ' Working on ' + ma)
 
+        csv_file_name = 'VolumeStageFunction_' + ma + '.xlsx'
+        save_path = os.path.join(output_folder, csv_file_name)
+        seen_mas.append(ma)
+
+        # skip MAs with unchanged inputs and an existing workbook
+        if flag_use_cache:
+            key = ma_cache_key(dem_hash, row[1])
+            cached = cache.get(ma)
+            if cached and cached['key'] == key and os.path.exists(save_path):
+                arcpy.AddMessage('Inputs unchanged - using cached ' + csv_file_name)
+                skip_count += 1
+                continue
+
         # create boundary layers
         boundary_layer_name = 'Boundary_' + ma
         arcpy.analysis.Select(ma_shape_layer, boundary_layer_name, "MA = '" + ma + "'")
@@ -134,9 +249,7 @@ with arcpy.da.SearchCursor(ma_shape_layer, [ma_field],
         # move_layer_to_group(mxd, df, dem_by_mask_var_name, mask_group_name)
 
         # Populate G2CRM Stage Volume Excel Spreadsheet
-        csv_file_name = 'VolumeStageFunction_' + ma + '.xlsx'
         working_df = pd.DataFrame(working_depth_volume_pair, columns=['X', 'Y'])
-        save_path = os.path.join(output_folder, csv_file_name)
         arcpy.AddMessage('Calculations for model area saved.')
 
         # populating function meta sheet
@@ -152,6 +265,21 @@ with arcpy.da.SearchCursor(ma_shape_layer, [ma_field],
             vsf_df.to_excel(writer, sheet_name='VolumeStageFunction', index=False)
             working_df.to_excel(writer, sheet_name='Base', index=False)
 
+        # record only after the workbook is written so interrupted MAs are redone
+        if flag_use_cache:
+            cache[ma] = {'key': key, 'file': csv_file_name}
+            save_cache(cache_path, cache)
+
+# evict stale entries - removed MAs and deleted workbooks
+if flag_use_cache:
+    for cached_ma in list(cache.keys()):
+        removed_ma = cached_ma not in seen_mas and not flag_debugging
+        if removed_ma or not os.path.exists(os.path.join(output_folder, cache[cached_ma]['file'])):
+            del cache[cached_ma]
+    save_cache(cache_path, cache)
+    arcpy.AddMessage('-----------')
+    arcpy.AddMessage(str(skip_count) + ' MAs unchanged and skipped')
+
 arcpy.env.overwriteOutput = False
 
 arcpy.AddMessage('-----------')